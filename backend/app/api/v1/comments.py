@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.comment import (
     CommentCreate,
     CommentResponse,
+    CommentPage,
     CommentUpdate,
 )
 from app.schemas.base import MessageResponse
 from app.services.comment_service import CommentService
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, get_current_user_async
+from app.dependencies.etag import (
+    CONDITIONAL_GET_RESPONSES,
+    ETAG_HEADER,
+    comment_list_etag,
+)
 from app.dependencies.rate_limit import (
     comment_rate_limiter
 )
@@ -50,17 +57,50 @@ def create_comment(
 
 @router.get(
     "/thread/{thread_id}",
-    response_model=list[CommentResponse]
+    response_model=list[CommentResponse],
+    responses={
+        **CONDITIONAL_GET_RESPONSES,
+        200: {
+            "headers": {
+                "ETag": ETAG_HEADER,
+                "X-Next-Cursor": {
+                    "description": "Cursor for the next keyset page",
+                    "schema": {"type": "string"},
+                },
+            },
+        },
+    },
+    dependencies=[Depends(comment_list_etag)]
 )
-def list_comments(
+async def list_comments(
     thread_id: int,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    cursor: str | None = Query(
+        None,
+        description="Keyset cursor; pass an empty value for the first page",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
 
-    return CommentService.list_thread_comments(
+    # Any cursor (even empty, for the first page) switches to keyset
+    # pagination; the next cursor travels in X-Next-Cursor so the
+    # list response shape stays unchanged.
+    if cursor is not None:
+        result = await CommentService.list_thread_comments_page(
+            db,
+            thread_id,
+            size=size,
+            cursor=cursor,
+            user_id=user.id,
+        )
+        if result["next_cursor"]:
+            response.headers["X-Next-Cursor"] = result["next_cursor"]
+        return result["items"]
+
+    return await CommentService.list_thread_comments(
         db,
         thread_id,
         page=page,
@@ -69,6 +109,83 @@ def list_comments(
     )
 
 
+# ==============================
+# Root Comments / Replies
+# ==============================
+
+@router.get(
+    "/thread/{thread_id}/roots",
+    response_model=CommentPage,
+    responses=CONDITIONAL_GET_RESPONSES,
+    dependencies=[Depends(comment_list_etag)]
+)
+async def list_root_comments(
+    thread_id: int,
+    size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+
+    return await CommentService.list_root_comments(
+        db,
+        thread_id,
+        size=size,
+        cursor=cursor,
+        user_id=user.id,
+    )
+
+
+@router.get(
+    "/{comment_id}/replies",
+    response_model=CommentPage
+)
+async def list_replies(
+    comment_id: int,
+    size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+
+    return await CommentService.list_replies(
+        db,
+        comment_id,
+        size=size,
+        cursor=cursor,
+        user_id=user.id,
+    )
+
+
+# ==============================
+# Thread Comment Tree
+# ==============================
+
+@router.get(
+    "/thread/{thread_id}/tree",
+    response_model=CommentPage,
+    responses=CONDITIONAL_GET_RESPONSES,
+    dependencies=[Depends(comment_list_etag)]
+)
+async def list_comment_tree(
+    thread_id: int,
+    size: int = Query(50, ge=1, le=200),
+    max_depth: int | None = Query(None, ge=0),
+    cursor: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+
+    return await CommentService.list_comment_tree(
+        db,
+        thread_id,
+        size=size,
+        max_depth=max_depth,
+        cursor=cursor,
+        user_id=user.id,
+    )
+
+
 # ==============================
 # Update Comment
 # ==============================
@@ -1,14 +1,18 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.like import (
     LikeCreate,
-    LikeResponse,
+    LikedStateRequest,
+    LikedStateResponse,
+    LikeStateResponse,
+    LikeToggle,
 )
 from app.schemas.base import MessageResponse
 from app.services.like_service import LikeService
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, get_current_user_async
 from app.models.user import User
 
 
@@ -24,7 +28,7 @@ router = APIRouter(
 
 @router.post(
     "",
-    response_model=LikeResponse
+    response_model=LikeStateResponse
 )
 def add_like(
     payload: LikeCreate,
@@ -60,3 +64,46 @@ def remove_like(
     )
 
     return {"message": "Like removed"}
+
+
+# ==============================
+# Set Like (idempotent)
+# ==============================
+
+@router.put(
+    "/toggle",
+    response_model=LikeStateResponse,
+)
+def set_like(
+    payload: LikeToggle,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+
+    return LikeService.set_like(
+        db,
+        payload,
+        user.id
+    )
+
+
+# ==============================
+# Liked State (bulk)
+# ==============================
+
+@router.post(
+    "/state",
+    response_model=LikedStateResponse,
+)
+async def get_liked_state(
+    payload: LikedStateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+
+    return await LikeService.get_liked_state(
+        db,
+        user.id,
+        payload.thread_ids,
+        payload.comment_ids,
+    )
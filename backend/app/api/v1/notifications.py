@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.notification import (
     NotificationListResponse,
     NotificationMarkAllReadResponse,
@@ -11,7 +12,7 @@ from app.schemas.notification import (
 from app.services.notification_service import (
     NotificationService,
 )
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_user, get_current_user_async
 from app.models.user import User
 
 
@@ -29,18 +30,22 @@ router = APIRouter(
     "",
     response_model=NotificationListResponse
 )
-def get_notifications(
+async def get_notifications(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    before: str | None = Query(None),
+    unread_only: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
 
-    return NotificationService.get_user_notifications(
+    return await NotificationService.get_user_notifications(
         db,
         user.id,
         page=page,
         size=size,
+        before=before,
+        unread_only=unread_only,
     )
 
 
@@ -84,11 +89,11 @@ def mark_all_notifications_read(
     "/unread-count",
     response_model=NotificationUnreadCountResponse,
 )
-def get_unread_count(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+async def get_unread_count(
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
-    unread_count = NotificationService.get_unread_count(
+    unread_count = await NotificationService.get_unread_count(
         db,
         user.id,
     )
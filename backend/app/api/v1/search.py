@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
+from app.dependencies.auth import get_optional_user
+from app.models.user import User
 from app.schemas.search import (
     CommentSearchResponse,
     ThreadSearchResponse,
@@ -32,6 +34,7 @@ def search_threads(
     searchIn: str = Query("all", pattern="^(all|title|content|tags)$"),
     sortBy: str = Query("relevance", pattern="^(relevance|recent|popular)$"),
     db: Session = Depends(get_db),
+    user: User | None = Depends(get_optional_user),
 ):
 
     return SearchService.search_threads(
@@ -41,6 +44,7 @@ def search_threads(
         size=size,
         search_in=searchIn,
         sort_by=sortBy,
+        user_id=user.id if user else None,
     )
 
 
@@ -53,10 +57,12 @@ def search_comments(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
+    user: User | None = Depends(get_optional_user),
 ):
     return SearchService.search_comments(
         db,
         q,
         page=page,
         size=size,
+        user_id=user.id if user else None,
     )
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.schemas.thread import (
     ThreadCreate,
     ThreadListResponse,
@@ -9,8 +10,12 @@ from app.schemas.thread import (
     ThreadUpdate,
 )
 from app.schemas.base import MessageResponse
+from app.schemas.comment import ThreadViewResponse
+from app.services.comment_service import CommentService
 from app.services.thread_service import ThreadService
-from app.dependencies.auth import get_current_user
+from app.services.view_count_service import ViewCountService
+from app.dependencies.auth import get_current_user, get_current_user_async
+from app.dependencies.etag import CONDITIONAL_GET_RESPONSES, thread_list_etag
 from app.models.user import User
 
 
@@ -47,19 +52,25 @@ def create_thread(
 
 @router.get(
     "",
-    response_model=ThreadListResponse
+    response_model=ThreadListResponse,
+    responses=CONDITIONAL_GET_RESPONSES,
+    dependencies=[Depends(thread_list_etag)]
 )
-def list_threads(
+async def list_threads(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    cursor: str | None = Query(None),
+    sort: str = Query("recent", pattern="^(recent|trending)$"),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
-    return ThreadService.list_threads(
+    return await ThreadService.list_threads(
         db,
         page=page,
         size=size,
         user_id=user.id,
+        cursor=cursor,
+        sort=sort,
     )
 
 
@@ -71,16 +82,46 @@ def list_threads(
     "/{thread_id}",
     response_model=ThreadResponse
 )
-def get_thread(
+async def get_thread(
     thread_id: int,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
+):
+    thread = await ThreadService.get_thread(
+        db,
+        thread_id,
+        user_id=user.id,
+    )
+    await ViewCountService.record_view(thread_id, user.id)
+    thread["unique_viewers"] = await ViewCountService.unique_viewers(thread_id)
+    return thread
+
+
+# ==============================
+# Thread View
+# ==============================
+
+@router.get(
+    "/{thread_id}/view",
+    response_model=ThreadViewResponse
+)
+async def get_thread_view(
+    thread_id: int,
+    size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user_async),
 ):
-    return ThreadService.get_thread(
+    view = await CommentService.get_thread_view(
         db,
         thread_id,
         user_id=user.id,
+        size=size,
+    )
+    await ViewCountService.record_view(thread_id, user.id)
+    view["thread"]["unique_viewers"] = await ViewCountService.unique_viewers(
+        thread_id
     )
+    return view
 
 
 # ==============================
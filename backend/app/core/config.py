@@ -8,6 +8,11 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     SQL_ECHO: bool = False
     REDIS_URL: str = "redis://localhost:6379"
+    TRACK_UNIQUE_THREAD_VIEWERS: bool = False
+    LIKE_WRITE_BEHIND: bool = False
+    LIKE_BROADCAST_WINDOW_MS: int = 250
+    NOTIFICATION_QUEUE: bool = False
+    NOTIFICATION_WORKER_IN_PROCESS: bool = True
     BOOTSTRAP_ADMIN_EMAIL: str = "admin@discussionforum.com"
     BOOTSTRAP_ADMIN_PASSWORD: str = "Admin@12345"
     BOOTSTRAP_ADMIN_NAME: str = "Bootstrap Admin"
@@ -10,3 +10,4 @@ class RedisChannels:
     NOTIFICATIONS = "notifications_channel"
     USERS = "users_channel"
     MODERATION = "moderation_channel"
+    CACHE_INVALIDATION = "cache_invalidation_channel"
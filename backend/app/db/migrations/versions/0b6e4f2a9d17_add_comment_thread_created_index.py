@@ -0,0 +1,32 @@
+"""add comment thread created index
+
+Revision ID: 0b6e4f2a9d17
+Revises: f3a8d1b5c260
+Create Date: 2026-10-17 16:21:55.048193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4f2a9d17'
+down_revision: Union[str, Sequence[str], None] = 'f3a8d1b5c260'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_comment_thread_created",
+        "comments",
+        ["thread_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_comment_thread_created", table_name="comments")
@@ -0,0 +1,43 @@
+"""add outbox events
+
+Revision ID: 1c5e9a7d3f20
+Revises: 0b6e4f2a9d17
+Create Date: 2026-10-17 17:05:12.431806
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c5e9a7d3f20'
+down_revision: Union[str, Sequence[str], None] = '0b6e4f2a9d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("channel", sa.String(length=100), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_outbox_events_id"),
+        "outbox_events",
+        ["id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_outbox_events_id"), table_name="outbox_events")
+    op.drop_table("outbox_events")
@@ -0,0 +1,55 @@
+"""add notification inbox indexes
+
+Revision ID: 2d8f4b6c1e53
+Revises: 1c5e9a7d3f20
+Create Date: 2026-10-17 18:42:10.517093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d8f4b6c1e53'
+down_revision: Union[str, Sequence[str], None] = '1c5e9a7d3f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_notification_user_created",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "idx_notification_user_unread",
+        "notifications",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_read = false"),
+    )
+    # A prefix of idx_notification_user_created now.
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        "ix_notifications_user_id",
+        "notifications",
+        ["user_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "idx_notification_user_unread",
+        table_name="notifications",
+    )
+    op.drop_index(
+        "idx_notification_user_created",
+        table_name="notifications",
+    )
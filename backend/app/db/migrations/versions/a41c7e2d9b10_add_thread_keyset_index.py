@@ -0,0 +1,37 @@
+"""add thread keyset index
+
+Revision ID: a41c7e2d9b10
+Revises: ff04f9f90f51
+Create Date: 2026-10-17 09:12:44.201356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e2d9b10'
+down_revision: Union[str, Sequence[str], None] = 'ff04f9f90f51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_thread_active_created_id",
+        "threads",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+        postgresql_where=sa.text("is_deleted = false"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "idx_thread_active_created_id",
+        table_name="threads",
+    )
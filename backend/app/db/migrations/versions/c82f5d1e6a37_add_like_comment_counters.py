@@ -0,0 +1,69 @@
+"""add like and comment counters
+
+Revision ID: c82f5d1e6a37
+Revises: a41c7e2d9b10
+Create Date: 2026-10-17 10:05:13.874120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c82f5d1e6a37'
+down_revision: Union[str, Sequence[str], None] = 'a41c7e2d9b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "threads",
+        sa.Column("like_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "threads",
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "comments",
+        sa.Column("like_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    op.execute(
+        """
+        UPDATE threads
+        SET
+            like_count = (
+                SELECT COUNT(*)
+                FROM likes
+                WHERE likes.thread_id = threads.id
+            ),
+            comment_count = (
+                SELECT COUNT(*)
+                FROM comments
+                WHERE comments.thread_id = threads.id
+                  AND COALESCE(comments.is_deleted, false) = false
+            )
+        """
+    )
+    op.execute(
+        """
+        UPDATE comments
+        SET like_count = (
+            SELECT COUNT(*)
+            FROM likes
+            WHERE likes.comment_id = comments.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("comments", "like_count")
+    op.drop_column("threads", "comment_count")
+    op.drop_column("threads", "like_count")
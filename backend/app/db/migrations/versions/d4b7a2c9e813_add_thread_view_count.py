@@ -0,0 +1,31 @@
+"""add thread view count
+
+Revision ID: d4b7a2c9e813
+Revises: c82f5d1e6a37
+Create Date: 2026-10-17 14:20:41.503318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b7a2c9e813'
+down_revision: Union[str, Sequence[str], None] = 'c82f5d1e6a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "threads",
+        sa.Column("view_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("threads", "view_count")
@@ -0,0 +1,85 @@
+"""add comment materialized path
+
+Revision ID: e19f3c6b7a42
+Revises: d4b7a2c9e813
+Create Date: 2026-10-17 15:02:17.226904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e19f3c6b7a42'
+down_revision: Union[str, Sequence[str], None] = 'd4b7a2c9e813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PATH_SEGMENT_WIDTH = 10
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("comments", sa.Column("path", sa.Text(), nullable=True))
+    op.add_column(
+        "comments",
+        sa.Column("depth", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "comments",
+        sa.Column("reply_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    # Backfill in id order: a parent is always created before its replies.
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text(
+            "SELECT id, parent_comment_id FROM comments ORDER BY id"
+        )
+    ).all()
+    paths: dict[int, tuple[str, int]] = {}
+    reply_counts: dict[int, int] = {}
+    for comment_id, parent_id in rows:
+        segment = str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+        if parent_id in paths:
+            parent_path, parent_depth = paths[parent_id]
+            paths[comment_id] = (f"{parent_path}.{segment}", parent_depth + 1)
+            reply_counts[parent_id] = reply_counts.get(parent_id, 0) + 1
+        else:
+            paths[comment_id] = (segment, 0)
+
+    if paths:
+        bind.execute(
+            sa.text(
+                "UPDATE comments SET path = :path, depth = :depth WHERE id = :id"
+            ),
+            [
+                {"id": comment_id, "path": path, "depth": depth}
+                for comment_id, (path, depth) in paths.items()
+            ],
+        )
+    if reply_counts:
+        bind.execute(
+            sa.text("UPDATE comments SET reply_count = :count WHERE id = :id"),
+            [
+                {"id": comment_id, "count": count}
+                for comment_id, count in reply_counts.items()
+            ],
+        )
+
+    op.create_index(
+        "idx_comment_thread_path",
+        "comments",
+        ["thread_id", "path"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_comment_thread_path", table_name="comments")
+    op.drop_column("comments", "reply_count")
+    op.drop_column("comments", "depth")
+    op.drop_column("comments", "path")
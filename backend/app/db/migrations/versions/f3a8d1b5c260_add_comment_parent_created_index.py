@@ -0,0 +1,32 @@
+"""add comment parent created index
+
+Revision ID: f3a8d1b5c260
+Revises: e19f3c6b7a42
+Create Date: 2026-10-17 15:48:09.617231
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8d1b5c260'
+down_revision: Union[str, Sequence[str], None] = 'e19f3c6b7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "idx_comment_parent_created",
+        "comments",
+        ["parent_comment_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_comment_parent_created", table_name="comments")
@@ -1,4 +1,9 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
@@ -16,6 +21,32 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Async drivers for the same DATABASE_URL, used by the async read endpoints.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str):
+    url = make_url(database_url)
+    return url.set(
+        drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    )
+
+
+async_engine = create_async_engine(
+    to_async_url(settings.DATABASE_URL),
+    echo=settings.SQL_ECHO,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 # Dependency / context manager
 def get_db():
@@ -24,3 +55,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
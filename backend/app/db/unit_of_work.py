@@ -0,0 +1,110 @@
+import logging
+from contextlib import contextmanager
+from functools import partial
+
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+_SESSION_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """
+    One transaction spanning several repository writes.
+
+    While a unit of work is active on a session, repositories flush
+    instead of committing, and side effects registered with
+    `after_commit` (broadcasts, cache invalidation) are queued until the
+    single commit succeeds. On failure everything is rolled back and the
+    queue is dropped.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._callbacks = []
+        self._batches = {}
+
+    def after_commit(self, callback, *args, **kwargs) -> None:
+        self._callbacks.append(partial(callback, *args, **kwargs))
+
+    def after_commit_batch(self, callback, item) -> None:
+        items = self._batches.get(callback)
+        if items is None:
+            items = self._batches[callback] = []
+            self.after_commit(callback, items)
+        items.append(item)
+
+    def run_callbacks(self) -> None:
+        callbacks, self._callbacks = self._callbacks, []
+        self._batches = {}
+        for callback in callbacks:
+            _run_side_effect(callback)
+
+
+def _run_side_effect(callback) -> None:
+    try:
+        callback()
+    except Exception:
+        # The data is already committed; side effects are best-effort.
+        logger.warning("Post-commit side effect failed", exc_info=True)
+
+
+def active_unit_of_work(db: Session) -> UnitOfWork | None:
+    return db.info.get(_SESSION_KEY)
+
+
+def commit_or_flush(db: Session) -> None:
+    """
+    Repository commit point: a flush inside a unit of work, else a commit.
+    """
+    if active_unit_of_work(db) is not None:
+        db.flush()
+    else:
+        db.commit()
+
+
+def after_commit(db: Session, callback, *args, **kwargs) -> None:
+    """
+    Queue a side effect until the active unit of work commits, or run it
+    now when there is none.
+    """
+    unit = active_unit_of_work(db)
+    if unit is not None:
+        unit.after_commit(callback, *args, **kwargs)
+    else:
+        _run_side_effect(partial(callback, *args, **kwargs))
+
+
+def after_commit_batch(db: Session, callback, item) -> None:
+    """
+    Like `after_commit`, but items queued for the same callback in one
+    transaction are handed to a single `callback(items)` call.
+    """
+    unit = active_unit_of_work(db)
+    if unit is not None:
+        unit.after_commit_batch(callback, item)
+    else:
+        _run_side_effect(partial(callback, [item]))
+
+
+@contextmanager
+def unit_of_work(db: Session):
+    outer = active_unit_of_work(db)
+    if outer is not None:
+        # Nested use joins the enclosing transaction.
+        yield outer
+        return
+
+    unit = UnitOfWork(db)
+    db.info[_SESSION_KEY] = unit
+    try:
+        yield unit
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop(_SESSION_KEY, None)
+    unit.run_callbacks()
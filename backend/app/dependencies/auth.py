@@ -1,24 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 from app.core.security import decode_token, is_token_type
 
 
 security = HTTPBearer()
+# Public endpoints that personalise their answer for a signed-in viewer.
+optional_security = HTTPBearer(auto_error=False)
 
 
-# ==============================
-# Get Current User
-# ==============================
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-
+def _token_user_id(credentials: HTTPAuthorizationCredentials) -> int:
     token = credentials.credentials
 
     payload = decode_token(token)
@@ -40,11 +36,10 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
+    return int(user_id)
 
-    user = db.query(User).filter(
-        User.id == int(user_id)
-    ).first()
 
+def _ensure_active(user: User | None) -> User:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,3 +52,53 @@ def get_current_user(
         )
 
     return user
+
+
+# ==============================
+# Get Current User
+# ==============================
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+
+    user_id = _token_user_id(credentials)
+
+    user = db.query(User).filter(
+        User.id == user_id
+    ).first()
+
+    return _ensure_active(user)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """
+    AsyncSession variant for async endpoints; avoids a threadpool hop
+    and a second (sync) session per request.
+    """
+    user_id = _token_user_id(credentials)
+
+    user = await db.scalar(
+        select(User).where(User.id == user_id)
+    )
+
+    return _ensure_active(user)
+
+
+def get_optional_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(
+        optional_security
+    ),
+    db: Session = Depends(get_db),
+) -> User | None:
+    """
+    The signed-in user, or None for anonymous requests. A token that is
+    sent but invalid is still rejected.
+    """
+    if credentials is None:
+        return None
+    return get_current_user(credentials, db)
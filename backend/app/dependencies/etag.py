@@ -0,0 +1,85 @@
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.dependencies.auth import _token_user_id, security
+from app.utils.etag import (
+    THREADS_VERSION_KEY,
+    comments_version_key,
+    etag_matches,
+    read_version,
+    weak_etag,
+)
+
+
+async def _conditional_get(
+    request: Request,
+    response: Response,
+    version_key: str,
+    *parts,
+) -> str | None:
+    version = await read_version(version_key)
+    if version is None:
+        # Redis unavailable: serve a normal, untagged response.
+        return None
+
+    etag = weak_etag(*parts, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag},
+        )
+    response.headers["ETag"] = etag
+    return etag
+
+
+# Documents the conditional GET contract on routes using the dependencies
+# below; the tag is absent while Redis is unavailable.
+ETAG_HEADER = {
+    "description": "Weak validator to send back in If-None-Match",
+    "schema": {"type": "string"},
+}
+
+CONDITIONAL_GET_RESPONSES = {
+    200: {"headers": {"ETag": ETAG_HEADER}},
+    304: {
+        "description": "Not Modified: If-None-Match still matches",
+        "headers": {"ETag": ETAG_HEADER},
+    },
+}
+
+
+# ==============================
+# Conditional GET dependencies
+# ==============================
+# Declared before the DB/auth dependencies so a matching tag answers 304
+# from the token and one Redis GET, without opening a DB connection.
+# Responses carry viewer liked-state, so the user id is part of the tag.
+
+async def thread_list_etag(
+    request: Request,
+    response: Response,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    return await _conditional_get(
+        request,
+        response,
+        THREADS_VERSION_KEY,
+        "threads",
+        _token_user_id(credentials),
+    )
+
+
+async def comment_list_etag(
+    thread_id: int,
+    request: Request,
+    response: Response,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    return await _conditional_get(
+        request,
+        response,
+        comments_version_key(thread_id),
+        "comments",
+        thread_id,
+        _token_user_id(credentials),
+    )
@@ -11,9 +11,17 @@ from app.core.exceptions import (
     AppException,
     app_exception_handler,
 )
+from app.websocket.handlers import like_coalescer
 from app.websocket.manager import manager
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, async_engine
 from app.services.bootstrap_service import BootstrapService
+from app.services.like_service import LikeService
+from app.services.notification_service import NotificationService
+from app.services.outbox_service import OutboxService
+from app.services.trending_service import TrendingService
+from app.services.unread_counter_service import UnreadCounterService
+from app.services.view_count_service import ViewCountService
+from app.utils.cache import listen_for_invalidations, local_cache_stats
 
 from app.core.logging import setup_logging
 
@@ -39,14 +47,28 @@ async def start_redis_listener():
     finally:
         db.close()
 
-    return [
+    tasks = [
         asyncio.create_task(manager.listen_to_channel(RedisChannels.COMMENTS)),
         asyncio.create_task(manager.listen_to_channel(RedisChannels.THREADS)),
-        asyncio.create_task(manager.listen_to_channel(RedisChannels.LIKES)),
+        asyncio.create_task(
+            manager.listen_to_channel(
+                RedisChannels.LIKES,
+                broadcast=like_coalescer.submit,
+            )
+        ),
         asyncio.create_task(manager.listen_to_channel(RedisChannels.NOTIFICATIONS)),
         asyncio.create_task(manager.listen_to_channel(RedisChannels.USERS)),
         asyncio.create_task(manager.listen_to_channel(RedisChannels.MODERATION)),
+        asyncio.create_task(listen_for_invalidations()),
+        asyncio.create_task(TrendingService.refresh_forever()),
+        asyncio.create_task(ViewCountService.flush_forever()),
+        asyncio.create_task(OutboxService.relay_forever()),
+        asyncio.create_task(LikeService.flush_forever()),
+        asyncio.create_task(UnreadCounterService.reconcile_forever()),
     ]
+    if settings.NOTIFICATION_QUEUE and settings.NOTIFICATION_WORKER_IN_PROCESS:
+        tasks.append(asyncio.create_task(NotificationService.consume_forever()))
+    return tasks
 
 
 @asynccontextmanager
@@ -58,6 +80,7 @@ async def lifespan(_app: FastAPI):
         for task in tasks:
             task.cancel()
         await asyncio.gather(*tasks, return_exceptions=True)
+        await async_engine.dispose()
 
 
 app = FastAPI(
@@ -81,6 +104,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.add_exception_handler(
@@ -99,3 +123,9 @@ app.include_router(
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/caches")
+def cache_health():
+    # Per-worker L1 cache counters (size, hits, misses, evictions).
+    return local_cache_stats()
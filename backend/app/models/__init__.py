@@ -3,6 +3,7 @@ from .like import Like
 from .mention import Mention
 from .moderation import ModerationReview
 from .notification import Notification
+from .outbox import OutboxEvent
 from .role import Role, user_roles
 from .tag import Tag
 from .thread import Thread
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Text, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel, SoftDeleteMixin
@@ -28,6 +28,38 @@ class Comment(BaseModel, SoftDeleteMixin):
         nullable=True
     )
 
+    # Denormalized counter maintained alongside like writes.
+    like_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
+    # Materialized path: zero-padded ancestor ids joined by ".", ending
+    # with this comment's id. Sorting by path yields depth-first order.
+    path = Column(Text, nullable=True)
+    depth = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    # Direct replies, soft-deleted ones included: they are still listed.
+    reply_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
+    PATH_SEGMENT_WIDTH = 10
+
+    @classmethod
+    def build_path(cls, parent_path: str | None, comment_id: int) -> str:
+        segment = str(comment_id).zfill(cls.PATH_SEGMENT_WIDTH)
+        return f"{parent_path}.{segment}" if parent_path else segment
+
     # Relationships
 
     thread = relationship(
@@ -61,3 +93,18 @@ class Comment(BaseModel, SoftDeleteMixin):
         "Mention",
         back_populates="comment"
     )
+
+
+Index("idx_comment_thread_path", Comment.thread_id, Comment.path)
+Index(
+    "idx_comment_thread_created",
+    Comment.thread_id,
+    Comment.created_at,
+    Comment.id,
+)
+Index(
+    "idx_comment_parent_created",
+    Comment.parent_comment_id,
+    Comment.created_at,
+    Comment.id,
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel
@@ -11,9 +11,23 @@ class Notification(BaseModel):
 
     __tablename__ = "notifications"
     __table_args__ = (
-        Index("ix_notifications_user_id", "user_id"),
         Index("ix_notifications_is_read", "is_read"),
         Index("ix_notifications_created_at", "created_at"),
+        # Inbox pages, newest first; also covers lookups by user_id alone.
+        Index(
+            "idx_notification_user_created",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+        # Unread counts and unread-only pages touch unread rows only.
+        Index(
+            "idx_notification_user_unread",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+            postgresql_where=text("is_read = false"),
+        ),
     )
 
     user_id = Column(
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Text
+
+from app.models.base import BaseModel
+
+
+class OutboxEvent(BaseModel):
+    """
+    Realtime event written in the same transaction as the change it
+    announces; the outbox relay publishes it and deletes the row.
+    """
+
+    __tablename__ = "outbox_events"
+
+    channel = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)
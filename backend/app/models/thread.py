@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Index, String, Text
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.models.base import BaseModel, SoftDeleteMixin
@@ -19,6 +19,27 @@ class Thread(BaseModel, SoftDeleteMixin):
         nullable=False
     )
 
+    # Denormalized counters maintained alongside like/comment writes.
+    like_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    comment_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+    # Flushed in batches from Redis by ViewCountService.
+    view_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
     # Relationships
 
     author = relationship(
@@ -50,3 +71,9 @@ class Thread(BaseModel, SoftDeleteMixin):
 
 Index("idx_thread_title", Thread.title)
 Index("idx_thread_description", Thread.description)
+Index(
+    "idx_thread_active_created_id",
+    Thread.created_at.desc(),
+    Thread.id.desc(),
+    postgresql_where=text("is_deleted = false"),
+)
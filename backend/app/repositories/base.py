@@ -1,9 +1,11 @@
 from typing import Type, Generic, TypeVar, Optional, List
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
 from app.db.base import Base
+from app.db.unit_of_work import commit_or_flush
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -20,7 +22,7 @@ class BaseRepository(Generic[ModelType]):
     def create(self, db: Session, obj_data: dict) -> ModelType:
         obj = self.model(**obj_data)
         db.add(obj)
-        db.commit()
+        commit_or_flush(db)
         db.refresh(obj)
         return obj
 
@@ -45,11 +47,62 @@ class BaseRepository(Generic[ModelType]):
         for field, value in update_data.items():
             setattr(db_obj, field, value)
 
-        db.commit()
+        commit_or_flush(db)
         db.refresh(db_obj)
         return db_obj
 
     # DELETE (Soft or Hard depending on model)
     def delete(self, db: Session, db_obj: ModelType) -> None:
         db.delete(db_obj)
-        db.commit()
+        commit_or_flush(db)
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """
+    Async counterpart of BaseRepository for AsyncSession read paths.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    # CREATE
+    async def create(self, db: AsyncSession, obj_data: dict) -> ModelType:
+        obj = self.model(**obj_data)
+        db.add(obj)
+        await db.commit()
+        await db.refresh(obj)
+        return obj
+
+    # GET BY ID
+    async def get_by_id(
+        self,
+        db: AsyncSession,
+        obj_id: int,
+    ) -> Optional[ModelType]:
+        stmt = select(self.model).where(self.model.id == obj_id)
+        return await db.scalar(stmt)
+
+    # LIST ALL
+    async def list_all(self, db: AsyncSession) -> List[ModelType]:
+        stmt = select(self.model)
+        return list((await db.scalars(stmt)).all())
+
+    # UPDATE
+    async def update(
+        self,
+        db: AsyncSession,
+        db_obj: ModelType,
+        update_data: dict
+    ) -> ModelType:
+
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    # DELETE (Soft or Hard depending on model)
+    async def delete(self, db: AsyncSession, db_obj: ModelType) -> None:
+        await db.delete(db_obj)
+        await db.commit()
@@ -1,8 +1,13 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select, update
 
+from app.db.unit_of_work import commit_or_flush
 from app.models.comment import Comment
-from app.repositories.base import BaseRepository
+from app.models.thread import Thread
+from app.repositories.base import AsyncBaseRepository, BaseRepository
 
 
 class CommentRepository(BaseRepository[Comment]):
@@ -11,42 +16,88 @@ class CommentRepository(BaseRepository[Comment]):
         super().__init__(Comment)
 
     # ==============================
-    # Get thread comments
+    # Create comment
     # ==============================
-    def get_thread_comments(
+    def create(
         self,
         db: Session,
-        thread_id: int,
-        page: int = 1,
-        size: int = 100,
-    ):
-        offset = (page - 1) * size
+        obj_data: dict,
+        parent: Comment | None = None,
+    ) -> Comment:
+        comment = Comment(**obj_data)
+        if parent is None and comment.parent_comment_id is not None:
+            parent = db.get(Comment, comment.parent_comment_id)
+        db.add(comment)
+        # The path embeds the comment's own id, so assign it after the flush.
+        db.flush()
+        comment.path = Comment.build_path(
+            parent.path if parent is not None else None,
+            comment.id,
+        )
+        comment.depth = parent.depth + 1 if parent is not None else 0
+        if parent is not None:
+            self._adjust_reply_count(db, parent.id, 1)
+        self._adjust_thread_comment_count(db, comment.thread_id, 1)
+        commit_or_flush(db)
+        db.refresh(comment)
+        return comment
 
-        stmt = select(Comment).where(
-            Comment.thread_id == thread_id
-        ).options(
-            selectinload(Comment.author),
-            selectinload(Comment.likes),
-        ).order_by(
-            Comment.created_at.asc()
-        ).offset(
-            offset
-        ).limit(
-            size
+    @staticmethod
+    def _adjust_reply_count(
+        db: Session,
+        comment_id: int,
+        delta: int,
+    ) -> None:
+        db.execute(
+            update(Comment)
+            .where(Comment.id == comment_id)
+            .values(
+                reply_count=Comment.reply_count + delta,
+                # A counter change is not an edit.
+                updated_at=Comment.updated_at,
+            )
         )
 
-        return list(db.scalars(stmt).all())
+    @staticmethod
+    def _adjust_thread_comment_count(
+        db: Session,
+        thread_id: int,
+        delta: int,
+    ) -> None:
+        db.execute(
+            update(Thread)
+            .where(Thread.id == thread_id)
+            .values(
+                comment_count=Thread.comment_count + delta,
+                updated_at=Thread.updated_at,
+            )
+        )
 
     def soft_delete(
         self,
         db: Session,
         comment: Comment
     ) -> Comment:
-        comment.is_deleted = True
-        db.commit()
+        if not comment.is_deleted:
+            comment.is_deleted = True
+            self._adjust_thread_comment_count(db, comment.thread_id, -1)
+            # reply_count is left alone: a deleted reply stays listed (as a
+            # tombstone that keeps its own replies reachable).
+        commit_or_flush(db)
         db.refresh(comment)
         return comment
 
+    def get_commented_thread_ids(
+        self,
+        db: Session,
+        author_id: int,
+    ) -> list[int]:
+        return list(db.scalars(
+            select(Comment.thread_id)
+            .where(Comment.author_id == author_id)
+            .distinct()
+        ).all())
+
     def search_comments(
         self,
         db: Session,
@@ -60,8 +111,138 @@ class CommentRepository(BaseRepository[Comment]):
             )
             .options(
                 selectinload(Comment.author),
-                selectinload(Comment.likes),
             )
             .order_by(Comment.created_at.desc())
         )
         return list(db.scalars(stmt).all())
+
+
+class AsyncCommentRepository(AsyncBaseRepository[Comment]):
+    """
+    Comment reads for the async thread endpoints.
+    """
+
+    def __init__(self):
+        super().__init__(Comment)
+
+    # ==============================
+    # Get thread comments
+    # ==============================
+    async def get_thread_comments(
+        self,
+        db: AsyncSession,
+        thread_id: int,
+        page: int = 1,
+        size: int = 100,
+    ):
+        offset = (page - 1) * size
+
+        stmt = select(Comment).where(
+            Comment.thread_id == thread_id
+        ).options(
+            selectinload(Comment.author),
+        ).order_by(
+            Comment.created_at.asc(),
+            Comment.id.asc(),
+        ).offset(
+            offset
+        ).limit(
+            size
+        )
+
+        return list((await db.scalars(stmt)).all())
+
+    @staticmethod
+    def _keyset_page_stmt(
+        limit: int,
+        after: tuple[datetime, int] | None,
+        *criteria,
+    ):
+        # Keyset page in reading order, (created_at, id) ascending.
+        stmt = select(Comment).where(
+            *criteria
+        ).options(
+            selectinload(Comment.author),
+        )
+        if after is not None:
+            created_at, comment_id = after
+            stmt = stmt.where(
+                or_(
+                    Comment.created_at > created_at,
+                    and_(
+                        Comment.created_at == created_at,
+                        Comment.id > comment_id,
+                    ),
+                )
+            )
+        return stmt.order_by(
+            Comment.created_at.asc(),
+            Comment.id.asc(),
+        ).limit(limit)
+
+    async def get_thread_comments_page(
+        self,
+        db: AsyncSession,
+        thread_id: int,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Comment]:
+        # Served by idx_comment_thread_created; cost does not grow with depth.
+        stmt = self._keyset_page_stmt(
+            limit,
+            after,
+            Comment.thread_id == thread_id,
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def get_root_comments_page(
+        self,
+        db: AsyncSession,
+        thread_id: int,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Comment]:
+        stmt = self._keyset_page_stmt(
+            limit,
+            after,
+            Comment.thread_id == thread_id,
+            Comment.parent_comment_id.is_(None),
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def get_replies_page(
+        self,
+        db: AsyncSession,
+        parent_comment_id: int,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+    ) -> list[Comment]:
+        # Served by idx_comment_parent_created.
+        stmt = self._keyset_page_stmt(
+            limit,
+            after,
+            Comment.parent_comment_id == parent_comment_id,
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def get_thread_tree_page(
+        self,
+        db: AsyncSession,
+        thread_id: int,
+        limit: int,
+        max_depth: int | None = None,
+        after_path: str | None = None,
+    ) -> list[Comment]:
+        # Depth-first order is path order, so a page is one range scan on
+        # idx_comment_thread_path and replies follow their parents.
+        stmt = select(Comment).where(
+            Comment.thread_id == thread_id
+        ).options(
+            selectinload(Comment.author),
+        )
+        if max_depth is not None:
+            stmt = stmt.where(Comment.depth <= max_depth)
+        if after_path is not None:
+            stmt = stmt.where(Comment.path > after_path)
+        stmt = stmt.order_by(Comment.path.asc()).limit(limit)
+        return list((await db.scalars(stmt)).all())
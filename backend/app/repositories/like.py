@@ -1,8 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import delete, func, insert, or_, select, tuple_, update
 
+from app.db.unit_of_work import commit_or_flush
+from app.models.comment import Comment
 from app.models.like import Like
-from app.repositories.base import BaseRepository
+from app.models.thread import Thread
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+
+
+def _liked_ids_stmt(user_id: int, thread_ids: list[int], comment_ids: list[int]):
+    # Each branch is served by a (user_id, target) unique index.
+    conditions = []
+    if thread_ids:
+        conditions.append(Like.thread_id.in_(thread_ids))
+    if comment_ids:
+        conditions.append(Like.comment_id.in_(comment_ids))
+    return select(Like.thread_id, Like.comment_id).where(
+        Like.user_id == user_id,
+        or_(*conditions),
+    )
+
+
+def _split_liked_ids(rows) -> tuple[set[int], set[int]]:
+    thread_ids, comment_ids = set(), set()
+    for thread_id, comment_id in rows:
+        if comment_id is not None:
+            comment_ids.add(int(comment_id))
+        elif thread_id is not None:
+            thread_ids.add(int(thread_id))
+    return thread_ids, comment_ids
 
 
 class LikeRepository(BaseRepository[Like]):
@@ -11,63 +42,246 @@ class LikeRepository(BaseRepository[Like]):
         super().__init__(Like)
 
     # ==============================
-    # Check existing like
+    # Like / unlike
     # ==============================
-    def get_user_like(
+    def set_like(
         self,
         db: Session,
         user_id: int,
         thread_id=None,
-        comment_id=None
-    ):
+        comment_id=None,
+        liked: bool = True,
+    ) -> tuple[bool, int] | None:
+        """
+        Idempotently like or unlike a target.
 
-        stmt = select(Like).where(
-            Like.user_id == user_id,
-            Like.thread_id == thread_id,
-            Like.comment_id == comment_id
-        )
+        Returns (changed, like_count), or None when the target does not
+        exist. A duplicate like is skipped by ON CONFLICT DO NOTHING
+        instead of failing on the unique constraint. On PostgreSQL the
+        row change and the counter update run as one statement (a
+        data-modifying CTE); elsewhere as two. The counter update keeps
+        the target's updated_at: a like is not an edit.
+        """
+        if thread_id is not None:
+            model, column, target_id = Thread, Like.thread_id, thread_id
+        else:
+            model, column, target_id = Comment, Like.comment_id, comment_id
+
+        postgres = db.get_bind().dialect.name == "postgresql"
+        if liked:
+            now = datetime.now(timezone.utc)
+            change = (
+                (pg_insert if postgres else sqlite_insert)(Like)
+                .values(
+                    user_id=user_id,
+                    thread_id=thread_id,
+                    comment_id=comment_id,
+                    created_at=now,
+                    updated_at=now,
+                )
+                .on_conflict_do_nothing()
+            )
+        else:
+            change = delete(Like).where(
+                Like.user_id == user_id,
+                column == target_id,
+            )
+        change = change.returning(Like.id)
+        sign = 1 if liked else -1
 
-        return db.scalar(stmt)
+        if postgres:
+            changed_rows = change.cte("changed_like")
+            changed = (
+                select(func.count())
+                .select_from(changed_rows)
+                .scalar_subquery()
+            )
+            row = db.execute(
+                update(model)
+                .where(model.id == target_id)
+                .values(
+                    like_count=model.like_count + sign * changed,
+                    updated_at=model.updated_at,
+                )
+                .returning(model.like_count, changed)
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
+            if row is None:
+                return None
+            like_count, changed = row
+        else:
+            changed = len(
+                db.execute(
+                    change.execution_options(synchronize_session=False)
+                ).all()
+            )
+            like_count = db.scalar(
+                update(model)
+                .where(model.id == target_id)
+                .values(
+                    like_count=model.like_count + sign * changed,
+                    updated_at=model.updated_at,
+                )
+                .returning(model.like_count)
+                .execution_options(synchronize_session=False)
+            )
+            if like_count is None:
+                return None
+        commit_or_flush(db)
+        return bool(changed), int(like_count or 0)
 
     # ==============================
-    # Count likes
+    # Viewer state
     # ==============================
-    def count_thread_likes(
+    def get_liked_ids(
         self,
         db: Session,
-        thread_id: int
-    ):
-        return db.query(Like).filter(
-            Like.thread_id == thread_id
-        ).count()
+        user_id: int,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[set[int], set[int]]:
+        """
+        Which of these threads and comments the user liked, in one query.
+        """
+        if not thread_ids and not comment_ids:
+            return set(), set()
+        return _split_liked_ids(
+            db.execute(_liked_ids_stmt(user_id, thread_ids, comment_ids)).all()
+        )
 
-    def count_comment_likes(
+    # ==============================
+    # Write-behind persistence
+    # ==============================
+    def get_liker_ids(
         self,
         db: Session,
-        comment_id: int
-    ):
-        return db.query(Like).filter(
-            Like.comment_id == comment_id
-        ).count()
+        thread_id=None,
+        comment_id=None,
+    ) -> list[int]:
+        column = Like.thread_id if thread_id is not None else Like.comment_id
+        stmt = select(Like.user_id).where(
+            column == (thread_id if thread_id is not None else comment_id)
+        )
+        return [int(user_id) for user_id in db.scalars(stmt).all()]
 
-    def get_liked_thread_ids(
+    def apply_like_changes(
         self,
         db: Session,
-        user_id: int,
-    ) -> set[int]:
-        stmt = select(Like.thread_id).where(
-            Like.user_id == user_id,
-            Like.thread_id.is_not(None),
-        )
-        return {
-            int(thread_id)
-            for thread_id in db.scalars(stmt).all()
-            if thread_id is not None
-        }
+        added: list[dict],
+        removed: list[dict],
+    ) -> list[dict]:
+        """
+        Persist buffered likes in bulk. Rows already in the requested
+        state are skipped, so a retried batch is harmless; returns the
+        rows actually inserted.
+        """
+        inserted = []
+        for column in (Like.thread_id, Like.comment_id):
+            target = column.key
+            pair = tuple_(Like.user_id, column)
+            gone = [
+                (row["user_id"], row[target])
+                for row in removed
+                if row[target] is not None
+            ]
+            if gone:
+                db.execute(
+                    delete(Like)
+                    .where(pair.in_(gone))
+                    .execution_options(synchronize_session=False)
+                )
+            wanted = [row for row in added if row[target] is not None]
+            if wanted:
+                existing = set(
+                    db.execute(
+                        select(Like.user_id, column).where(
+                            pair.in_([
+                                (row["user_id"], row[target])
+                                for row in wanted
+                            ])
+                        )
+                    ).all()
+                )
+                rows = [
+                    row for row in wanted
+                    if (row["user_id"], row[target]) not in existing
+                ]
+                if rows:
+                    db.execute(insert(Like), rows)
+                    inserted.extend(rows)
+        commit_or_flush(db)
+        return inserted
 
-    def remove_like(
+    def sync_like_counts(
         self,
         db: Session,
-        like: Like
-    ) -> None:
-        self.delete(db, like)
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[dict[int, int], dict[int, tuple[int, int]]]:
+        """
+        Recount like_count for the given targets from the likes table.
+
+        Returns ({thread_id: count}, {comment_id: (count, thread_id)}).
+        """
+        for model, column, target_ids in (
+            (Thread, Like.thread_id, thread_ids),
+            (Comment, Like.comment_id, comment_ids),
+        ):
+            if not target_ids:
+                continue
+            counted = (
+                select(func.count(Like.id))
+                .where(column == model.id)
+                .scalar_subquery()
+            )
+            db.execute(
+                update(model)
+                .where(model.id.in_(target_ids))
+                .values(like_count=counted, updated_at=model.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        commit_or_flush(db)
+
+        thread_counts = {}
+        if thread_ids:
+            thread_counts = {
+                int(thread_id): int(count or 0)
+                for thread_id, count in db.execute(
+                    select(Thread.id, Thread.like_count)
+                    .where(Thread.id.in_(thread_ids))
+                ).all()
+            }
+        comment_counts = {}
+        if comment_ids:
+            comment_counts = {
+                int(comment_id): (int(count or 0), int(thread_id))
+                for comment_id, count, thread_id in db.execute(
+                    select(Comment.id, Comment.like_count, Comment.thread_id)
+                    .where(Comment.id.in_(comment_ids))
+                ).all()
+            }
+        return thread_counts, comment_counts
+
+
+class AsyncLikeRepository(AsyncBaseRepository[Like]):
+    """
+    Viewer like lookups for the async read endpoints.
+    """
+
+    def __init__(self):
+        super().__init__(Like)
+
+    async def get_liked_ids(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[set[int], set[int]]:
+        if not thread_ids and not comment_ids:
+            return set(), set()
+        return _split_liked_ids(
+            (await db.execute(
+                _liked_ids_stmt(user_id, thread_ids, comment_ids)
+            )).all()
+        )
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func, select
 
+from app.db.unit_of_work import commit_or_flush
 from app.models.mention import Mention
 from app.repositories.base import BaseRepository
 
@@ -23,7 +24,7 @@ class MentionRepository(BaseRepository[Mention]):
         ]
 
         db.add_all(mentions)
-        db.commit()
+        commit_or_flush(db)
 
     def list_user_mentions(
         self,
@@ -1,9 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, select, update, and_
+from sqlalchemy import desc, func, insert, or_, select, tuple_, update, and_
 from datetime import datetime, timedelta, timezone
 
+from app.db.unit_of_work import commit_or_flush
 from app.models.notification import Notification
-from app.repositories.base import BaseRepository
+from app.repositories.base import AsyncBaseRepository, BaseRepository
 
 
 class NotificationRepository(BaseRepository[Notification]):
@@ -11,53 +13,6 @@ class NotificationRepository(BaseRepository[Notification]):
     def __init__(self):
         super().__init__(Notification)
 
-    # ==============================
-    # Get user notifications
-    # ==============================
-    def get_user_notifications(
-        self,
-        db: Session,
-        user_id: int,
-        page: int = 1,
-        size: int = 20,
-    ):
-        offset = (page - 1) * size
-
-        stmt = (
-            select(Notification)
-            .where(Notification.user_id == user_id)
-            .order_by(Notification.created_at.desc())
-            .offset(offset)
-            .limit(size)
-        )
-
-        return list(db.scalars(stmt).all())
-
-    def count_user_notifications(
-        self,
-        db: Session,
-        user_id: int,
-    ) -> int:
-        stmt = (
-            select(func.count(Notification.id))
-            .where(Notification.user_id == user_id)
-        )
-        return int(db.scalar(stmt) or 0)
-
-    def get_unread_count(
-        self,
-        db: Session,
-        user_id: int,
-    ) -> int:
-        stmt = (
-            select(func.count(Notification.id))
-            .where(
-                Notification.user_id == user_id,
-                Notification.is_read.is_(False),
-            )
-        )
-        return int(db.scalar(stmt) or 0)
-
     def get_user_notification_by_id(
         self,
         db: Session,
@@ -84,18 +39,29 @@ class NotificationRepository(BaseRepository[Notification]):
             .values(is_read=True)
         )
         result = db.execute(stmt)
-        db.commit()
+        commit_or_flush(db)
         return int(result.rowcount or 0)
 
     def mark_as_read(
         self,
         db: Session,
         notification: Notification
-    ) -> Notification:
-        notification.is_read = True
-        db.commit()
+    ) -> bool:
+        """
+        Returns False when it was already read, so concurrent requests
+        change the unread count once.
+        """
+        result = db.execute(
+            update(Notification)
+            .where(
+                Notification.id == notification.id,
+                Notification.is_read.is_(False),
+            )
+            .values(is_read=True)
+        )
+        commit_or_flush(db)
         db.refresh(notification)
-        return notification
+        return bool(result.rowcount)
 
     def find_recent_duplicate(
         self,
@@ -131,3 +97,164 @@ class NotificationRepository(BaseRepository[Notification]):
             .limit(1)
         )
         return db.scalar(stmt)
+
+    def find_recent_duplicate_keys(
+        self,
+        db: Session,
+        jobs: list[dict],
+        window_seconds: int = 30,
+    ) -> set[tuple]:
+        """
+        Batch form of `find_recent_duplicate`: the (user_id, actor_id,
+        type, entity_type, entity_id) keys of these jobs that already
+        have a recent unread notification.
+        """
+        if not jobs:
+            return set()
+        since = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+        targets = {
+            (job["user_id"], job["type"], job["entity_type"], job["entity_id"])
+            for job in jobs
+        }
+        stmt = select(
+            Notification.user_id,
+            Notification.actor_id,
+            Notification.type,
+            Notification.entity_type,
+            Notification.entity_id,
+        ).where(
+            tuple_(
+                Notification.user_id,
+                Notification.type,
+                Notification.entity_type,
+                Notification.entity_id,
+            ).in_(targets),
+            Notification.is_read.is_(False),
+            Notification.created_at >= since,
+        )
+        return {tuple(row) for row in db.execute(stmt).all()}
+
+    def create_many(
+        self,
+        db: Session,
+        rows: list[dict],
+    ) -> list[Notification]:
+        if not rows:
+            return []
+        notifications = list(
+            db.scalars(insert(Notification).returning(Notification), rows)
+        )
+        commit_or_flush(db)
+        return notifications
+
+
+class AsyncNotificationRepository(AsyncBaseRepository[Notification]):
+    """
+    Inbox reads for the async notification endpoints.
+    """
+
+    def __init__(self):
+        super().__init__(Notification)
+
+    # ==============================
+    # Get user notifications
+    # ==============================
+    @staticmethod
+    def _inbox_stmt(user_id: int, unread_only: bool = False):
+        stmt = select(Notification).where(Notification.user_id == user_id)
+        if unread_only:
+            stmt = stmt.where(Notification.is_read.is_(False))
+        return stmt.order_by(
+            desc(Notification.created_at),
+            desc(Notification.id),
+        )
+
+    async def get_user_notifications(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        page: int = 1,
+        size: int = 20,
+        unread_only: bool = False,
+    ):
+        offset = (page - 1) * size
+
+        stmt = (
+            self._inbox_stmt(user_id, unread_only)
+            .offset(offset)
+            .limit(size)
+        )
+
+        return list((await db.scalars(stmt)).all())
+
+    async def get_user_notifications_page(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+        unread_only: bool = False,
+    ) -> list[Notification]:
+        # Keyset page on (created_at, id) descending, served by
+        # idx_notification_user_created (or its unread-only partial twin).
+        stmt = self._inbox_stmt(user_id, unread_only)
+        if before is not None:
+            created_at, notification_id = before
+            stmt = stmt.where(
+                or_(
+                    Notification.created_at < created_at,
+                    and_(
+                        Notification.created_at == created_at,
+                        Notification.id < notification_id,
+                    ),
+                )
+            )
+        return list((await db.scalars(stmt.limit(limit))).all())
+
+    async def count_user_notifications(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        unread_only: bool = False,
+    ) -> int:
+        if unread_only:
+            return await self.get_unread_count(db, user_id)
+        stmt = (
+            select(func.count(Notification.id))
+            .where(Notification.user_id == user_id)
+        )
+        return int(await db.scalar(stmt) or 0)
+
+    async def get_unread_count(
+        self,
+        db: AsyncSession,
+        user_id: int,
+    ) -> int:
+        stmt = (
+            select(func.count(Notification.id))
+            .where(
+                Notification.user_id == user_id,
+                Notification.is_read.is_(False),
+            )
+        )
+        return int(await db.scalar(stmt) or 0)
+
+    async def get_unread_counts(
+        self,
+        db: AsyncSession,
+        user_ids: list[int],
+    ) -> dict[int, int]:
+        if not user_ids:
+            return {}
+        stmt = (
+            select(Notification.user_id, func.count(Notification.id))
+            .where(
+                Notification.user_id.in_(user_ids),
+                Notification.is_read.is_(False),
+            )
+            .group_by(Notification.user_id)
+        )
+        return {
+            int(user_id): int(count)
+            for user_id, count in (await db.execute(stmt)).all()
+        }
@@ -0,0 +1,72 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.unit_of_work import commit_or_flush
+from app.models.outbox import OutboxEvent
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+
+
+class OutboxRepository(BaseRepository[OutboxEvent]):
+
+    def __init__(self):
+        super().__init__(OutboxEvent)
+
+    def add(
+        self,
+        db: Session,
+        channel: str,
+        payload: str,
+    ) -> None:
+        # No refresh: the relay is the only reader of these rows.
+        db.add(OutboxEvent(channel=channel, payload=payload))
+        commit_or_flush(db)
+
+    def add_many(
+        self,
+        db: Session,
+        channel: str,
+        payloads: list[str],
+    ) -> None:
+        if not payloads:
+            return
+        db.execute(
+            insert(OutboxEvent),
+            [{"channel": channel, "payload": payload} for payload in payloads],
+        )
+        commit_or_flush(db)
+
+
+class AsyncOutboxRepository(AsyncBaseRepository[OutboxEvent]):
+    """
+    Outbox reads and deletes for the relay task.
+    """
+
+    def __init__(self):
+        super().__init__(OutboxEvent)
+
+    async def claim_batch(
+        self,
+        db: AsyncSession,
+        limit: int,
+    ) -> list[OutboxEvent]:
+        # Oldest first; SKIP LOCKED lets relays on several workers share
+        # the table without publishing the same row concurrently.
+        stmt = (
+            select(OutboxEvent)
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def delete_ids(
+        self,
+        db: AsyncSession,
+        event_ids: list[int],
+    ) -> None:
+        if not event_ids:
+            return
+        await db.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(event_ids))
+        )
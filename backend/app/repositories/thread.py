@@ -1,9 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import desc, func, or_, select
+from sqlalchemy import and_, bindparam, desc, func, or_, select, update
 
+from app.db.unit_of_work import commit_or_flush
 from app.models.thread import Thread
 from app.models.tag import Tag
-from app.repositories.base import BaseRepository
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+
+
+def _thread_by_id_stmt(thread_id: int):
+    return (
+        select(Thread)
+        .options(
+            selectinload(Thread.author),
+            selectinload(Thread.tags),
+        )
+        .where(Thread.id == thread_id)
+    )
 
 
 class ThreadRepository(BaseRepository[Thread]):
@@ -11,45 +26,12 @@ class ThreadRepository(BaseRepository[Thread]):
     def __init__(self):
         super().__init__(Thread)
 
-    # Custom query
-    def get_active_threads(self, db: Session):
-        stmt = (
-            select(Thread)
-            .options(
-                selectinload(Thread.author),
-                selectinload(Thread.tags),
-                selectinload(Thread.likes),
-                selectinload(Thread.comments),
-            )
-            .where(
-            Thread.is_deleted == False
-            )
-            .order_by(desc(Thread.created_at))
-        )
-        return list(db.scalars(stmt).all())
-
     def get_by_id(
         self,
         db: Session,
         obj_id: int
     ) -> Thread | None:
-        stmt = (
-            select(Thread)
-            .options(
-                selectinload(Thread.author),
-                selectinload(Thread.tags),
-                selectinload(Thread.likes),
-                selectinload(Thread.comments),
-            )
-            .where(Thread.id == obj_id)
-        )
-        return db.scalar(stmt)
-
-    def count_active_threads(self, db: Session) -> int:
-        stmt = select(func.count()).select_from(Thread).where(
-            Thread.is_deleted == False
-        )
-        return int(db.scalar(stmt) or 0)
+        return db.scalar(_thread_by_id_stmt(obj_id))
 
     def search_threads(
         self,
@@ -88,8 +70,6 @@ class ThreadRepository(BaseRepository[Thread]):
             .options(
                 selectinload(Thread.author),
                 selectinload(Thread.tags),
-                selectinload(Thread.likes),
-                selectinload(Thread.comments),
             )
             .where(
                 Thread.is_deleted == False,
@@ -101,12 +81,191 @@ class ThreadRepository(BaseRepository[Thread]):
 
         return results
 
+    def get_author_thread_ids(
+        self,
+        db: Session,
+        author_id: int,
+    ) -> list[int]:
+        return list(db.scalars(
+            select(Thread.id).where(
+                Thread.author_id == author_id,
+                Thread.is_deleted.is_(False),
+            )
+        ).all())
+
     def soft_delete(
         self,
         db: Session,
         thread: Thread
     ) -> Thread:
         thread.is_deleted = True
-        db.commit()
+        commit_or_flush(db)
         db.refresh(thread)
         return thread
+
+
+class AsyncThreadRepository(AsyncBaseRepository[Thread]):
+    """
+    Thread reads for the async list/detail endpoints.
+    """
+
+    def __init__(self):
+        super().__init__(Thread)
+
+    async def get_by_id(
+        self,
+        db: AsyncSession,
+        obj_id: int
+    ) -> Thread | None:
+        return await db.scalar(_thread_by_id_stmt(obj_id))
+
+    async def get_active_threads(
+        self,
+        db: AsyncSession,
+        offset: int | None = None,
+        limit: int | None = None,
+    ):
+        stmt = (
+            select(Thread)
+            .options(
+                selectinload(Thread.author),
+                selectinload(Thread.tags),
+            )
+            .where(
+            Thread.is_deleted == False
+            )
+            .order_by(desc(Thread.created_at), desc(Thread.id))
+            .offset(offset)
+            .limit(limit)
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def get_active_thread_keys(
+        self,
+        db: AsyncSession,
+        since: datetime | None = None,
+    ) -> list[tuple[int, datetime]]:
+        stmt = (
+            select(Thread.id, Thread.created_at)
+            .where(Thread.is_deleted == False)
+            .order_by(desc(Thread.created_at), desc(Thread.id))
+        )
+        if since is not None:
+            stmt = stmt.where(Thread.created_at >= since)
+        return [
+            (int(thread_id), created_at)
+            for thread_id, created_at in (await db.execute(stmt)).all()
+        ]
+
+    async def get_by_ids(
+        self,
+        db: AsyncSession,
+        thread_ids: list[int],
+    ) -> list[Thread]:
+        if not thread_ids:
+            return []
+        stmt = (
+            select(Thread)
+            .options(
+                selectinload(Thread.author),
+                selectinload(Thread.tags),
+            )
+            .where(
+                Thread.id.in_(thread_ids),
+                Thread.is_deleted == False,
+            )
+        )
+        return list((await db.scalars(stmt)).all())
+
+    async def get_active_threads_page(
+        self,
+        db: AsyncSession,
+        limit: int,
+        before: tuple[datetime, int] | None = None,
+    ) -> list[Thread]:
+        # Keyset page ordered by (created_at, id) descending; served by
+        # idx_thread_active_created_id so cost does not grow with depth.
+        stmt = (
+            select(Thread)
+            .options(
+                selectinload(Thread.author),
+                selectinload(Thread.tags),
+            )
+            .where(
+                Thread.is_deleted == False
+            )
+        )
+        if before is not None:
+            created_at, thread_id = before
+            stmt = stmt.where(
+                or_(
+                    Thread.created_at < created_at,
+                    and_(
+                        Thread.created_at == created_at,
+                        Thread.id < thread_id,
+                    ),
+                )
+            )
+        stmt = stmt.order_by(
+            desc(Thread.created_at),
+            desc(Thread.id),
+        ).limit(limit)
+        return list((await db.scalars(stmt)).all())
+
+    async def count_active_threads(self, db: AsyncSession) -> int:
+        stmt = select(func.count()).select_from(Thread).where(
+            Thread.is_deleted == False
+        )
+        return int(await db.scalar(stmt) or 0)
+
+    async def get_trending_candidates(
+        self,
+        db: AsyncSession,
+        since: datetime,
+    ) -> list[tuple[int, datetime, int, int]]:
+        stmt = (
+            select(
+                Thread.id,
+                Thread.created_at,
+                Thread.like_count,
+                Thread.comment_count,
+            )
+            .where(
+                Thread.is_deleted == False,
+                Thread.created_at >= since,
+            )
+        )
+        return [
+            (int(thread_id), created_at, int(likes or 0), int(comments or 0))
+            for thread_id, created_at, likes, comments
+            in (await db.execute(stmt)).all()
+        ]
+
+    async def add_view_counts(
+        self,
+        db: AsyncSession,
+        deltas: dict[int, int],
+    ) -> None:
+        """
+        Apply buffered view deltas in one executemany UPDATE; the caller
+        commits.
+        """
+        if not deltas:
+            return
+        threads = Thread.__table__
+        stmt = (
+            update(threads)
+            .where(threads.c.id == bindparam("b_thread_id"))
+            .values(
+                view_count=threads.c.view_count + bindparam("b_delta"),
+                # Being viewed is not an edit.
+                updated_at=threads.c.updated_at,
+            )
+        )
+        await db.execute(
+            stmt,
+            [
+                {"b_thread_id": thread_id, "b_delta": delta}
+                for thread_id, delta in deltas.items()
+            ],
+        )
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc, func, or_, select
 from sqlalchemy.orm import selectinload
 
+from app.db.unit_of_work import commit_or_flush
 from app.models.user import User
 from app.models.thread import Thread
 from app.models.comment import Comment
@@ -65,7 +66,7 @@ class UserRepository(BaseRepository[User]):
             user.roles.append(role)
 
         db.add(user)
-        db.commit()
+        commit_or_flush(db)
         db.refresh(user)
         return user
 
@@ -273,8 +274,6 @@ class UserRepository(BaseRepository[User]):
             select(Thread)
             .options(
                 selectinload(Thread.tags),
-                selectinload(Thread.likes),
-                selectinload(Thread.comments),
             )
             .where(
                 Thread.author_id == target_user_id,
@@ -292,16 +291,13 @@ class UserRepository(BaseRepository[User]):
                 "updated_at": thread.updated_at,
                 "title": thread.title,
                 "tags": [t.name for t in (thread.tags or [])],
-                "like_count": len(list(thread.likes or [])),
-                "comment_count": sum(1 for c in (thread.comments or []) if not c.is_deleted),
+                "like_count": thread.like_count or 0,
+                "comment_count": thread.comment_count or 0,
             })
 
         comment_rows = db.execute(
             select(Comment, Thread.title)
             .join(Thread, Thread.id == Comment.thread_id)
-            .options(
-                selectinload(Comment.likes),
-            )
             .where(
                 Comment.author_id == target_user_id,
                 Comment.is_deleted.is_(False),
@@ -319,7 +315,7 @@ class UserRepository(BaseRepository[User]):
                 "content": comment.content,
                 "thread_id": comment.thread_id,
                 "thread_title": thread_title,
-                "like_count": len(list(comment.likes or [])),
+                "like_count": comment.like_count or 0,
             })
 
         likes = list(db.scalars(
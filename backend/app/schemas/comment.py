@@ -3,7 +3,7 @@ from typing import Optional, List
 from pydantic import BaseModel
 
 from app.schemas.base import TimestampSchema
-from app.schemas.thread import ThreadAuthor
+from app.schemas.thread import ThreadAuthor, ThreadResponse
 
 
 # ==============================
@@ -34,6 +34,28 @@ class CommentResponse(TimestampSchema):
     author_id: int
     author: Optional[ThreadAuthor] = None
     parent_comment_id: Optional[int]
+    depth: int = 0
+    reply_count: int = 0
     like_count: int = 0
     user_has_liked: bool = False
     is_deleted: bool
+
+
+# ==============================
+# Comment Page
+# ==============================
+
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
+
+
+# ==============================
+# Thread View Response
+# ==============================
+
+class ThreadViewResponse(BaseModel):
+    thread: ThreadResponse
+    comments: List[CommentResponse]
+    comment_count: int
+    next_cursor: Optional[str] = None
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.schemas.base import TimestampSchema
 
@@ -14,6 +14,15 @@ class LikeCreate(BaseModel):
     comment_id: Optional[int] = None
 
 
+class LikeToggle(LikeCreate):
+    liked: bool
+
+
+class LikedStateRequest(BaseModel):
+    thread_ids: list[int] = Field(default_factory=list, max_length=200)
+    comment_ids: list[int] = Field(default_factory=list, max_length=200)
+
+
 # ==============================
 # Like Response
 # ==============================
@@ -22,3 +31,19 @@ class LikeResponse(TimestampSchema):
     user_id: int
     thread_id: Optional[int]
     comment_id: Optional[int]
+
+
+# ==============================
+# Like State Response
+# ==============================
+
+class LikeStateResponse(BaseModel):
+    thread_id: Optional[int] = None
+    comment_id: Optional[int] = None
+    liked: bool
+    like_count: int
+
+
+class LikedStateResponse(BaseModel):
+    liked_thread_ids: list[int]
+    liked_comment_ids: list[int]
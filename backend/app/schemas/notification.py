@@ -16,9 +16,10 @@ class NotificationResponse(TimestampSchema):
 
 class NotificationListResponse(BaseModel):
     items: list[NotificationResponse]
-    total: int
-    page: int
+    total: int | None = None
+    page: int | None = None
     size: int
+    next_cursor: str | None = None
 
 
 class NotificationUnreadCountResponse(BaseModel):
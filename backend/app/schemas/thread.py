@@ -46,13 +46,16 @@ class ThreadResponse(TimestampSchema):
     author: Optional[ThreadAuthor] = None
     comment_count: int = 0
     like_count: int = 0
+    view_count: int = 0
+    unique_viewers: Optional[int] = None
     user_has_liked: bool = False
     is_deleted: bool
 
 
 class ThreadListResponse(BaseModel):
     items: list[ThreadResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
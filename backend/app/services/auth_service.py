@@ -2,7 +2,6 @@ import logging
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from anyio import from_thread
 
 from app.schemas.user import UserCreate
 from app.core.security import (
@@ -13,10 +12,12 @@ from app.core.security import (
     decode_token,
     is_token_type,
 )
-from app.core.constants import Roles
+from app.core.constants import RedisChannels, Roles
+from app.db.unit_of_work import unit_of_work
 from app.repositories.user import UserRepository
 from app.repositories.role import RoleRepository
-from app.websocket.handlers import broadcast_new_user
+from app.services.outbox_service import OutboxService
+from app.websocket.handlers import build_user_message
 
 
 class AuthService:
@@ -64,22 +65,16 @@ class AuthService:
         )
 
         roles = [member_role] if member_role else []
-        user = AuthService.user_repo.create_with_roles(
-            db,
-            user_data,
-            roles,
-        )
-        try:
-            from_thread.run(
-                broadcast_new_user,
-                user,
+        with unit_of_work(db):
+            user = AuthService.user_repo.create_with_roles(
+                db,
+                user_data,
+                roles,
             )
-        except Exception:
-            # Realtime delivery is best-effort.
-            AuthService.logger.warning(
-                "Failed to broadcast new user event for user_id=%s",
-                user.id,
-                exc_info=True,
+            OutboxService.publish(
+                db,
+                RedisChannels.USERS,
+                build_user_message(user),
             )
 
         return user
@@ -1,19 +1,31 @@
+import re
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from anyio import from_thread
 
-from app.core.constants import Roles
+from app.core.constants import RedisChannels, Roles
 from app.schemas.comment import (
     CommentCreate,
     CommentUpdate,
 )
+from app.db.unit_of_work import after_commit, unit_of_work
 from app.models.user import User
-from app.repositories.comment import CommentRepository
+from app.repositories.comment import (
+    AsyncCommentRepository,
+    CommentRepository,
+)
 from app.repositories.thread import ThreadRepository
 from app.repositories.user import UserRepository
-from app.websocket.handlers import broadcast_new_comment
+from app.websocket.handlers import build_comment_message
+from app.services.like_state_service import LikeStateService
 from app.services.moderation_service import ModerationService
+from app.services.outbox_service import OutboxService
+from app.utils.cache import CacheAside
+from app.utils.etag import bump_version, comments_version_key, read_version
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.services.thread_service import ThreadService
+from app.services.trending_service import TrendingService
 from app.services.notification_service import (
     NotificationService
 )
@@ -28,6 +40,11 @@ class CommentService:
     repo = CommentRepository()
     thread_repo = ThreadRepository()
     user_repo = UserRepository()
+    async_repo = AsyncCommentRepository()
+    # Serialized comment pages, keyed by thread, comments version and
+    # page variant; superseded versions simply age out.
+    _page_cache_prefix = "comments:page:"
+    _page_cache = CacheAside(ttl_seconds=600)
 
     @staticmethod
     def _is_moderator_or_admin(user: User) -> bool:
@@ -37,8 +54,7 @@ class CommentService:
         )
 
     @staticmethod
-    def _serialize_comment(comment, user_id: int | None = None) -> dict:
-        likes = list(comment.likes or [])
+    def _serialize_comment(comment, user_has_liked: bool = False) -> dict:
         return {
             "id": comment.id,
             "created_at": comment.created_at,
@@ -57,10 +73,10 @@ class CommentService:
                 else None
             ),
             "parent_comment_id": comment.parent_comment_id,
-            "like_count": len(likes),
-            "user_has_liked": any(
-                like.user_id == user_id for like in likes
-            ) if user_id is not None else False,
+            "depth": comment.depth or 0,
+            "reply_count": comment.reply_count or 0,
+            "like_count": comment.like_count or 0,
+            "user_has_liked": bool(user_has_liked),
             "is_deleted": comment.is_deleted,
         }
 
@@ -101,115 +117,395 @@ class CommentService:
         data = payload.model_dump()
         data["author_id"] = user_id
 
-        comment = cls.repo.create(db, data)
-
-        actor = cls.user_repo.get_by_id(db, user_id)
-        if actor is None or not cls._is_moderator_or_admin(actor):
-            ModerationService.create_review(
-                db,
-                ModerationCreate(
-                    content_type="COMMENT",
-                    thread_id=comment.thread_id,
-                    comment_id=comment.id,
-                ),
-            )
+        # One transaction for the comment, review, mentions and
+        # notifications; side effects run once it has committed.
+        with unit_of_work(db):
+            comment = cls.repo.create(db, data, parent=parent)
 
-        mentioned_users = MentionService.process_mentions(
-            db,
-            payload.content,
-            thread_id=comment.thread_id,
-            comment_id=comment.id,
-        )
-        notified_user_ids: set[int] = set()
-
-        actor_label = (
-            (actor.name or "").strip()
-            or actor.email
-            or "Someone"
-        )
-        for user in mentioned_users:
-            if user.id == user_id:
-                continue
+            actor = cls.user_repo.get_by_id(db, user_id)
+            if actor is None or not cls._is_moderator_or_admin(actor):
+                ModerationService.create_review(
+                    db,
+                    ModerationCreate(
+                        content_type="COMMENT",
+                        thread_id=comment.thread_id,
+                        comment_id=comment.id,
+                    ),
+                )
 
-            NotificationService.create_notification(
+            mentioned_users = MentionService.process_mentions(
                 db,
-                user_id=user.id,
-                actor_id=user_id,
-                type="MENTION",
-                title="Mentioned in a comment",
-                message=f"{actor_label} mentioned you in a comment.",
-                entity_type="comment",
-                entity_id=comment.id,
+                payload.content,
+                thread_id=comment.thread_id,
+                comment_id=comment.id,
             )
-            notified_user_ids.add(user.id)
+            notified_user_ids: set[int] = set()
 
-        thread_author_id = thread.author_id
-        if (
-            thread_author_id != user_id
-            and thread_author_id not in notified_user_ids
-        ):
-            NotificationService.create_notification(
-                db,
-                user_id=thread_author_id,
-                actor_id=user_id,
-                type="THREAD_COMMENT",
-                title="New comment on your thread",
-                message="Someone commented on your thread.",
-                entity_type="thread",
-                entity_id=comment.thread_id,
+            actor_label = (
+                (actor.name or "").strip()
+                or actor.email
+                or "Someone"
             )
-            notified_user_ids.add(thread_author_id)
+            for user in mentioned_users:
+                if user.id == user_id:
+                    continue
 
-        if parent is not None:
-            if (
-                parent.author_id != user_id
-                and parent.author_id not in notified_user_ids
-            ):
                 NotificationService.create_notification(
                     db,
-                    user_id=parent.author_id,
+                    user_id=user.id,
                     actor_id=user_id,
-                    type="REPLY",
-                    title="New reply to your comment",
-                    message="Someone replied to your comment.",
+                    type="MENTION",
+                    title="Mentioned in a comment",
+                    message=f"{actor_label} mentioned you in a comment.",
                     entity_type="comment",
                     entity_id=comment.id,
                 )
-        try:
-            ThreadService._invalidate_threads_cache()
-        except Exception:
-            pass
+                notified_user_ids.add(user.id)
 
-        try:
-            from_thread.run(broadcast_new_comment, comment)
-        except Exception:
-            # Realtime broadcast is best-effort; comment is already persisted.
-            pass
+            thread_author_id = thread.author_id
+            if (
+                thread_author_id != user_id
+                and thread_author_id not in notified_user_ids
+            ):
+                NotificationService.create_notification(
+                    db,
+                    user_id=thread_author_id,
+                    actor_id=user_id,
+                    type="THREAD_COMMENT",
+                    title="New comment on your thread",
+                    message="Someone commented on your thread.",
+                    entity_type="thread",
+                    entity_id=comment.thread_id,
+                )
+                notified_user_ids.add(thread_author_id)
+
+            if parent is not None:
+                if (
+                    parent.author_id != user_id
+                    and parent.author_id not in notified_user_ids
+                ):
+                    NotificationService.create_notification(
+                        db,
+                        user_id=parent.author_id,
+                        actor_id=user_id,
+                        type="REPLY",
+                        title="New reply to your comment",
+                        message="Someone replied to your comment.",
+                        entity_type="comment",
+                        entity_id=comment.id,
+                    )
+
+            OutboxService.publish(
+                db,
+                RedisChannels.COMMENTS,
+                build_comment_message(comment),
+            )
 
-        return cls._serialize_comment(comment, user_id)
+            # Caches and counters only see committed state.
+            thread_id = comment.thread_id
+            after_commit(db, bump_version, comments_version_key(thread_id))
+            after_commit(
+                db,
+                ThreadService._patch_thread_card,
+                thread_id,
+                comment_delta=1,
+            )
+            after_commit(
+                db,
+                TrendingService.record_engagement,
+                thread_id,
+                comment_delta=1,
+            )
+
+        return cls._serialize_comment(comment)
+
+    # ==============================
+    # Comment page cache
+    # ==============================
+    @classmethod
+    async def _cached_page(cls, thread_id: int, variant: str, loader):
+        """
+        Viewer-agnostic page payload, cached per thread. The key embeds
+        the thread's comments version (bumped on every comment or comment
+        like write), so a write retires all of that thread's pages at once
+        and a page loaded before the write can never be served after it.
+        """
+        version = await read_version(comments_version_key(thread_id))
+        if version is None:
+            return await loader()
+        return await cls._page_cache.get_or_load(
+            f"{cls._page_cache_prefix}{thread_id}:{version}:{variant}",
+            loader,
+        )
+
+    @classmethod
+    async def _overlay_liked(
+        cls,
+        db: AsyncSession,
+        items: list[dict],
+        user_id: int | None,
+    ) -> list[dict]:
+        _, items = await LikeStateService.overlay(db, user_id, comments=items)
+        return items
 
     # ==============================
     # Get Thread Comments
     # ==============================
     @classmethod
-    def list_thread_comments(
+    async def list_thread_comments(
         cls,
-        db: Session,
+        db: AsyncSession,
         thread_id: int,
         page: int = 1,
         size: int = 100,
         user_id: int | None = None,
     ):
-        comments = cls.repo.get_thread_comments(
+        async def load():
+            comments = await cls.async_repo.get_thread_comments(
+                db,
+                thread_id,
+                page=page,
+                size=size,
+            )
+            return {
+                "items": [
+                    cls._serialize_comment(comment)
+                    for comment in comments
+                ],
+            }
+
+        cached = await cls._cached_page(thread_id, f"offset:{page}:{size}", load)
+        return await cls._overlay_liked(db, cached["items"], user_id)
+
+    # ==============================
+    # Root Comments / Replies (keyset)
+    # ==============================
+    @staticmethod
+    def _decode_cursor(cursor: str | None):
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor"
+            ) from None
+
+    @staticmethod
+    def _created_cursor(comment) -> str:
+        return encode_cursor(comment.created_at, comment.id)
+
+    @classmethod
+    def _serialize_page(cls, comments: list, size: int, cursor_of=None):
+        # Callers fetch size + 1 rows to learn whether another page exists.
+        has_more = len(comments) > size
+        comments = comments[:size]
+        return {
+            "items": [
+                cls._serialize_comment(comment)
+                for comment in comments
+            ],
+            "next_cursor": (
+                (cursor_of or cls._created_cursor)(comments[-1])
+                if has_more
+                else None
+            ),
+        }
+
+    @classmethod
+    async def _keyset_page(
+        cls,
+        db: AsyncSession,
+        thread_id: int,
+        variant: str,
+        fetch,
+        size: int,
+        user_id: int | None,
+        cursor_of=None,
+    ):
+        async def load():
+            return cls._serialize_page(await fetch(), size, cursor_of)
+
+        cached = await cls._cached_page(thread_id, variant, load)
+        return {
+            "items": await cls._overlay_liked(db, cached["items"], user_id),
+            "next_cursor": cached["next_cursor"],
+        }
+
+    @classmethod
+    async def list_root_comments(
+        cls,
+        db: AsyncSession,
+        thread_id: int,
+        size: int = 20,
+        cursor: str | None = None,
+        user_id: int | None = None,
+    ):
+        """
+        Top-level comments; each carries reply_count so clients can
+        expand branches on demand.
+        """
+        after = cls._decode_cursor(cursor)
+        return await cls._keyset_page(
+            db,
+            thread_id,
+            f"roots:{cursor or ''}:{size}",
+            lambda: cls.async_repo.get_root_comments_page(
+                db,
+                thread_id,
+                limit=size + 1,
+                after=after,
+            ),
+            size,
+            user_id,
+        )
+
+    @classmethod
+    async def list_replies(
+        cls,
+        db: AsyncSession,
+        comment_id: int,
+        size: int = 20,
+        cursor: str | None = None,
+        user_id: int | None = None,
+    ):
+        after = cls._decode_cursor(cursor)
+        parent = await cls.async_repo.get_by_id(db, comment_id)
+        if not parent:
+            raise HTTPException(404, "Comment not found")
+
+        return await cls._keyset_page(
+            db,
+            parent.thread_id,
+            f"replies:{parent.id}:{cursor or ''}:{size}",
+            lambda: cls.async_repo.get_replies_page(
+                db,
+                parent.id,
+                limit=size + 1,
+                after=after,
+            ),
+            size,
+            user_id,
+        )
+
+    @classmethod
+    async def list_thread_comments_page(
+        cls,
+        db: AsyncSession,
+        thread_id: int,
+        size: int = 100,
+        cursor: str | None = None,
+        user_id: int | None = None,
+    ):
+        """
+        Keyset variant of list_thread_comments: flat, in reading order.
+        """
+        after = cls._decode_cursor(cursor or None)
+        return await cls._keyset_page(
+            db,
+            thread_id,
+            f"flat:{cursor or ''}:{size}",
+            lambda: cls.async_repo.get_thread_comments_page(
+                db,
+                thread_id,
+                limit=size + 1,
+                after=after,
+            ),
+            size,
+            user_id,
+        )
+
+    # ==============================
+    # Comment Tree
+    # ==============================
+    _path_cursor_pattern = re.compile(r"^\d+(\.\d+)*$")
+
+    @classmethod
+    async def list_comment_tree(
+        cls,
+        db: AsyncSession,
+        thread_id: int,
+        size: int = 50,
+        max_depth: int | None = None,
+        cursor: str | None = None,
+        user_id: int | None = None,
+    ):
+        """
+        One page of the thread's comment tree in depth-first order; the
+        cursor is the last node's materialized path.
+        """
+        if cursor is not None and not cls._path_cursor_pattern.match(cursor):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid cursor"
+            )
+
+        return await cls._keyset_page(
             db,
             thread_id,
-            page=page,
-            size=size,
+            f"tree:{max_depth}:{cursor or ''}:{size}",
+            lambda: cls.async_repo.get_thread_tree_page(
+                db,
+                thread_id,
+                limit=size + 1,
+                max_depth=max_depth,
+                after_path=cursor,
+            ),
+            size,
+            user_id,
+            cursor_of=lambda comment: comment.path,
         )
-        return [
-            cls._serialize_comment(comment, user_id)
-            for comment in comments
-        ]
+
+    # ==============================
+    # Thread View (thread + first comment page)
+    # ==============================
+    @classmethod
+    async def get_thread_view(
+        cls,
+        db: AsyncSession,
+        thread_id: int,
+        user_id: int | None = None,
+        size: int = 20,
+    ):
+        """
+        Everything the thread page needs on open, in a fixed number of
+        queries: thread, first keyset page of comments, viewer likes.
+        """
+        thread = await ThreadService.async_repo.get_by_id(db, thread_id)
+
+        if not thread or thread.is_deleted:
+            raise HTTPException(
+                status_code=404,
+                detail="Thread not found"
+            )
+
+        # Fetch one extra row to learn whether another page exists.
+        comments = await cls.async_repo.get_thread_comments_page(
+            db,
+            thread.id,
+            limit=size + 1,
+        )
+        has_more = len(comments) > size
+        comments = comments[:size]
+
+        (thread_item,), comment_items = await LikeStateService.overlay(
+            db,
+            user_id,
+            threads=[ThreadService._serialize_thread(thread)],
+            comments=[cls._serialize_comment(comment) for comment in comments],
+        )
+
+        return {
+            "thread": thread_item,
+            "comments": comment_items,
+            "comment_count": thread.comment_count or 0,
+            "next_cursor": (
+                encode_cursor(comments[-1].created_at, comments[-1].id)
+                if has_more
+                else None
+            ),
+        }
 
     # ==============================
     # Update Comment
@@ -240,7 +536,13 @@ class CommentService:
             comment,
             payload.model_dump()
         )
-        return cls._serialize_comment(updated, user_id)
+        bump_version(comments_version_key(updated.thread_id))
+        _, (item,) = LikeStateService.overlay_sync(
+            db,
+            user_id,
+            comments=[cls._serialize_comment(updated)],
+        )
+        return item
 
     # ==============================
     # Delete Comment
@@ -269,7 +571,12 @@ class CommentService:
             db,
             comment,
         )
-        try:
-            ThreadService._invalidate_threads_cache()
-        except Exception:
-            pass
+        bump_version(comments_version_key(comment.thread_id))
+        ThreadService._patch_thread_card(
+            comment.thread_id,
+            comment_delta=-1,
+        )
+        TrendingService.record_engagement(
+            comment.thread_id,
+            comment_delta=-1,
+        )
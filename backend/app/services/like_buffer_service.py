@@ -0,0 +1,223 @@
+from app.integrations.redis_client import redis_client
+from app.utils.cache import CacheAside, run_redis_call
+
+
+class LikeBufferService:
+    """
+    Write-behind like state kept in Redis (`LIKE_WRITE_BEHIND`).
+
+    Each target has a members set and a counter that answer like/unlike
+    immediately. Every accepted change is also recorded in a pending hash
+    (the last change per user and target wins); `LikeService.flush_buffered`
+    swaps that hash out and persists it in bulk.
+    """
+
+    _prefix = "likes:"
+    _pending_key = "likes:pending"
+    _flushing_key = "likes:flushing"
+    # Refreshed on every change; far longer than a flush interval, so a
+    # target's state never expires while it still has pending changes.
+    _state_ttl_seconds = 24 * 3600
+    _flush_interval_seconds = 2
+    _flush_lock = CacheAside(
+        ttl_seconds=_flush_interval_seconds,
+        lock_ttl_seconds=30,
+    )
+    # Seeds members and counter from the DB unless another request
+    # already did; the counter doubles as the "seeded" marker because an
+    # empty set does not exist in Redis.
+    _seed_script = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+for i = 2, #ARGV do
+    redis.call('SADD', KEYS[1], ARGV[i])
+end
+redis.call('SET', KEYS[2], #ARGV - 1, 'EX', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+    # Returns {changed, like_count}, or {-1, 0} when the target is not
+    # seeded yet.
+    _toggle_script = """
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return {-1, 0}
+end
+local changed
+if ARGV[2] == '1' then
+    changed = redis.call('SADD', KEYS[1], ARGV[1])
+else
+    changed = redis.call('SREM', KEYS[1], ARGV[1])
+end
+local count
+if changed == 1 then
+    count = redis.call('INCRBY', KEYS[2], ARGV[2])
+    redis.call('HSET', KEYS[3], ARGV[3], ARGV[2])
+else
+    count = tonumber(redis.call('GET', KEYS[2]))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return {changed, count}
+"""
+
+    @staticmethod
+    def target_of(thread_id=None, comment_id=None) -> tuple[str, int]:
+        if thread_id:
+            return "thread", int(thread_id)
+        return "comment", int(comment_id)
+
+    @classmethod
+    def _members_key(cls, kind: str, target_id: int) -> str:
+        return f"{cls._prefix}{kind}:{target_id}:members"
+
+    @classmethod
+    def _count_key(cls, kind: str, target_id: int) -> str:
+        return f"{cls._prefix}{kind}:{target_id}:count"
+
+    # ==============================
+    # Request path (sync)
+    # ==============================
+    @classmethod
+    def toggle(
+        cls,
+        kind: str,
+        target_id: int,
+        user_id: int,
+        liked: bool,
+    ) -> tuple[bool, int] | None:
+        """
+        Apply one like/unlike. Returns (changed, like_count), or None
+        when the target has to be seeded first.
+        """
+        changed, count = run_redis_call(
+            redis_client.redis.eval,
+            cls._toggle_script,
+            3,
+            cls._members_key(kind, target_id),
+            cls._count_key(kind, target_id),
+            cls._pending_key,
+            str(user_id),
+            "1" if liked else "-1",
+            f"{kind}:{target_id}:{user_id}",
+            cls._state_ttl_seconds,
+        )
+        if int(changed) < 0:
+            return None
+        return bool(int(changed)), int(count)
+
+    @classmethod
+    def seed(cls, kind: str, target_id: int, user_ids: list[int]) -> None:
+        run_redis_call(
+            redis_client.redis.eval,
+            cls._seed_script,
+            2,
+            cls._members_key(kind, target_id),
+            cls._count_key(kind, target_id),
+            cls._state_ttl_seconds,
+            *[str(user_id) for user_id in user_ids],
+        )
+
+    @classmethod
+    def forget(cls, kind: str, target_id: int) -> None:
+        """
+        Drop a target's state after a write-through change; the next
+        buffered change reseeds it from the DB.
+        """
+        try:
+            run_redis_call(
+                redis_client.redis.delete,
+                cls._members_key(kind, target_id),
+                cls._count_key(kind, target_id),
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    def record(cls, kind: str, target_id: int, user_id: int, liked: bool) -> None:
+        """
+        Queue a change that was written through, so a stale buffered
+        change for the same like cannot overwrite it on a later flush.
+        """
+        try:
+            run_redis_call(
+                redis_client.redis.hset,
+                cls._pending_key,
+                f"{kind}:{target_id}:{user_id}",
+                "1" if liked else "-1",
+            )
+        except Exception:
+            pass
+
+    @classmethod
+    async def live_state(
+        cls,
+        user_id: int | None,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[dict[tuple[str, int], bool], dict[tuple[str, int], int]]:
+        """
+        What the buffer knows ahead of the DB, by (kind, target_id): the
+        user's like changes not yet flushed (a pending change wins over
+        one being flushed) and the counts of seeded targets.
+        """
+        targets = [("thread", thread_id) for thread_id in thread_ids]
+        targets += [("comment", comment_id) for comment_id in comment_ids]
+        if not targets:
+            return {}, {}
+        pipe = redis_client.redis.pipeline()
+        pipe.mget([cls._count_key(kind, target_id) for kind, target_id in targets])
+        if user_id is not None:
+            fields = [f"{kind}:{target_id}:{user_id}" for kind, target_id in targets]
+            pipe.hmget(cls._flushing_key, fields)
+            pipe.hmget(cls._pending_key, fields)
+        raw_counts, *ops = await pipe.execute()
+        counts = {
+            target: int(count)
+            for target, count in zip(targets, raw_counts, strict=True)
+            if count is not None
+        }
+        states = {}
+        if ops:
+            flushing, pending = ops
+            for target, older, newer in zip(targets, flushing, pending, strict=True):
+                op = newer if newer is not None else older
+                if op is not None:
+                    states[target] = op == "1"
+        return states, counts
+
+    # ==============================
+    # Flush
+    # ==============================
+    @classmethod
+    async def _take_pending(cls) -> dict[tuple[str, int, int], bool]:
+        # A batch left behind by a failed flush is retried first.
+        if not await redis_client.redis.exists(cls._flushing_key):
+            if not await redis_client.redis.exists(cls._pending_key):
+                return {}
+            await redis_client.redis.rename(cls._pending_key, cls._flushing_key)
+        raw = await redis_client.redis.hgetall(cls._flushing_key)
+        changes = {}
+        for field, op in raw.items():
+            kind, target_id, user_id = field.split(":")
+            changes[(kind, int(target_id), int(user_id))] = op == "1"
+        return changes
+
+    @classmethod
+    async def drain(cls, apply) -> int:
+        """
+        Hand the pending changes to `apply` (an async callable) under the
+        flush lock; they are dropped only once it succeeds.
+        """
+        token = await cls._flush_lock.try_acquire(cls._flushing_key)
+        if token is None:
+            return 0
+        try:
+            changes = await cls._take_pending()
+            if changes:
+                await apply(changes)
+            await redis_client.redis.delete(cls._flushing_key)
+        finally:
+            await cls._flush_lock.release(cls._flushing_key, token)
+        return len(changes)
@@ -1,134 +1,189 @@
+import asyncio
+import logging
+
+from anyio import to_thread
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from anyio import from_thread
 
-from app.schemas.like import LikeCreate
-from app.repositories.like import LikeRepository
+from app.core.config import settings
+from app.core.constants import RedisChannels
+from app.db.session import SessionLocal
+from app.db.unit_of_work import after_commit, unit_of_work
+from app.schemas.like import LikeCreate, LikeToggle
+from app.repositories.like import AsyncLikeRepository, LikeRepository
 from app.repositories.thread import ThreadRepository
 from app.repositories.comment import CommentRepository
 from app.repositories.user import UserRepository
-from app.websocket.handlers import broadcast_new_like
+from app.websocket.handlers import build_like_message
+from app.services.like_buffer_service import LikeBufferService
+from app.services.like_state_service import LikeStateService
 from app.services.thread_service import ThreadService
 from app.services.notification_service import NotificationService
+from app.services.outbox_service import OutboxService
+from app.services.trending_service import TrendingService
+from app.utils.etag import bump_version, comments_version_key
+
+
+logger = logging.getLogger(__name__)
 
 
 class LikeService:
 
     repo = LikeRepository()
+    async_repo = AsyncLikeRepository()
     thread_repo = ThreadRepository()
     comment_repo = CommentRepository()
     user_repo = UserRepository()
 
-    # ==============================
-    # Add Like
-    # ==============================
     @classmethod
-    def add_like(
+    def _notify_like(cls, db: Session, user_id: int, entity_type: str, target):
+        if target is None or target.author_id == user_id:
+            return
+        actor = cls.user_repo.get_by_id(db, user_id)
+        actor_label = (
+            actor.name
+            or actor.email
+            or f"User {user_id}"
+        ) if actor else f"User {user_id}"
+        NotificationService.create_notification(
+            db,
+            user_id=target.author_id,
+            actor_id=user_id,
+            type="LIKE",
+            title=f"New like on your {entity_type}",
+            message=f"{actor_label} liked your {entity_type}.",
+            entity_type=entity_type,
+            entity_id=target.id,
+        )
+
+    @staticmethod
+    def _like_state(payload: LikeCreate, liked: bool, like_count: int) -> dict:
+        return {
+            "thread_id": payload.thread_id,
+            "comment_id": payload.comment_id,
+            "liked": liked,
+            "like_count": like_count,
+        }
+
+    @classmethod
+    def _apply_like(
         cls,
         db: Session,
         payload: LikeCreate,
-        user_id: int
-    ):
-
+        user_id: int,
+        liked: bool,
+    ) -> tuple[bool, dict]:
+        """
+        Bring the viewer's like on one target to `liked`; returns
+        (changed, state). Side effects only run for an actual change.
+        """
         if not payload.thread_id and not payload.comment_id:
             raise HTTPException(
                 400,
                 "Target ID required"
             )
 
-        existing = cls.repo.get_user_like(
-            db,
-            user_id,
-            payload.thread_id,
-            payload.comment_id
-        )
-
-        if existing:
-            raise HTTPException(
-                400,
-                "Already liked"
-            )
-
-        data = payload.model_dump()
-        data["user_id"] = user_id
-
-        like = cls.repo.create(db, data)
+        if settings.LIKE_WRITE_BEHIND:
+            buffered = cls._buffer_like(db, payload, user_id, liked)
+            if buffered is not None:
+                return buffered
+            cls._persist_viewer_pending(payload, user_id)
 
-        recipient_id = None
-        entity_type = None
-        entity_id = None
-        actor = cls.user_repo.get_by_id(db, user_id)
-        actor_label = (
-            actor.name
-            or actor.email
-            or f"User {user_id}"
-        ) if actor else f"User {user_id}"
-        notification_title = "New like on your content"
-        notification_message = f"{actor_label} liked your content."
-
-        if payload.thread_id:
-            thread = cls.thread_repo.get_by_id(db, payload.thread_id)
-            if thread:
-                recipient_id = thread.author_id
-                entity_type = "thread"
-                entity_id = thread.id
-                notification_title = "New like on your thread"
-                notification_message = f"{actor_label} liked your thread."
-        elif payload.comment_id:
-            comment = cls.comment_repo.get_by_id(db, payload.comment_id)
-            if comment:
-                recipient_id = comment.author_id
-                entity_type = "comment"
-                entity_id = comment.id
-                notification_title = "New like on your comment"
-                notification_message = f"{actor_label} liked your comment."
-
-        if (
-            recipient_id is not None
-            and recipient_id != user_id
-            and entity_type is not None
-            and entity_id is not None
-        ):
-            NotificationService.create_notification(
-                db,
-                user_id=recipient_id,
-                actor_id=user_id,
-                type="LIKE",
-                title=notification_title,
-                message=notification_message,
-                entity_type=entity_type,
-                entity_id=entity_id,
-            )
+        # The like, its counter, notification and event commit together.
+        with unit_of_work(db):
+            try:
+                result = cls.repo.set_like(
+                    db,
+                    user_id,
+                    thread_id=payload.thread_id,
+                    comment_id=payload.comment_id,
+                    liked=liked,
+                )
+            except IntegrityError:
+                # The target's foreign key rejected the row.
+                result = None
+            if result is None:
+                raise HTTPException(404, "Target not found")
+            changed, like_count = result
+            if changed:
+                cls._like_changed(db, payload, user_id, liked, like_count)
+        return changed, cls._like_state(payload, liked, like_count)
 
-        like_count = None
+    @classmethod
+    def _like_changed(
+        cls,
+        db: Session,
+        payload: LikeCreate,
+        user_id: int,
+        liked: bool,
+        like_count: int,
+    ):
+        delta = 1 if liked else -1
         if payload.thread_id:
-            like_count = cls.repo.count_thread_likes(
+            if liked:
+                thread = cls.thread_repo.get_by_id(db, payload.thread_id)
+                cls._notify_like(db, user_id, "thread", thread)
+            after_commit(
                 db,
-                payload.thread_id
+                ThreadService._patch_thread_card,
+                payload.thread_id,
+                like_delta=delta,
             )
-            try:
-                ThreadService._invalidate_threads_cache()
-            except Exception:
-                pass
-        elif payload.comment_id:
-            like_count = cls.repo.count_comment_likes(
+            after_commit(
                 db,
-                payload.comment_id
+                TrendingService.record_engagement,
+                payload.thread_id,
+                like_delta=delta,
             )
+        else:
+            comment = cls.comment_repo.get_by_id(db, payload.comment_id)
+            if liked:
+                cls._notify_like(db, user_id, "comment", comment)
+            if comment:
+                after_commit(
+                    db,
+                    bump_version,
+                    comments_version_key(comment.thread_id),
+                )
 
-        try:
-            from_thread.run(
-                broadcast_new_like,
+        OutboxService.publish(
+            db,
+            RedisChannels.LIKES,
+            build_like_message(
                 payload.thread_id,
                 payload.comment_id,
                 like_count,
-                "created",
+                "created" if liked else "removed",
+            ),
+        )
+        if settings.LIKE_WRITE_BEHIND:
+            # Written through (Redis was unavailable): reseed later.
+            kind, target_id = LikeBufferService.target_of(
+                payload.thread_id,
+                payload.comment_id,
             )
-        except Exception:
-            # Realtime delivery failure should not rollback persisted like.
-            pass
+            after_commit(db, LikeBufferService.forget, kind, target_id)
+            after_commit(db, LikeBufferService.record, kind, target_id, user_id, liked)
 
-        return like
+    # ==============================
+    # Add Like
+    # ==============================
+    @classmethod
+    def add_like(
+        cls,
+        db: Session,
+        payload: LikeCreate,
+        user_id: int
+    ):
+        changed, state = cls._apply_like(db, payload, user_id, liked=True)
+        if not changed:
+            raise HTTPException(
+                400,
+                "Already liked"
+            )
+        return state
 
     # ==============================
     # Remove Like
@@ -140,45 +195,206 @@ class LikeService:
         payload: LikeCreate,
         user_id: int
     ):
+        changed, state = cls._apply_like(db, payload, user_id, liked=False)
+        if not changed:
+            raise HTTPException(404, "Like not found")
+        return state
+
+    # ==============================
+    # Set Like (idempotent toggle)
+    # ==============================
+    @classmethod
+    def set_like(
+        cls,
+        db: Session,
+        payload: LikeToggle,
+        user_id: int
+    ):
+        """
+        Idempotent like/unlike: repeating a request is a no-op that
+        still answers with the current state.
+        """
+        target = LikeCreate(
+            thread_id=payload.thread_id,
+            comment_id=payload.comment_id,
+        )
+        _changed, state = cls._apply_like(db, target, user_id, payload.liked)
+        return state
 
-        like = cls.repo.get_user_like(
+    # ==============================
+    # Viewer liked-state (bulk)
+    # ==============================
+    @classmethod
+    async def get_liked_state(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> dict:
+        """
+        Which of many threads and comments the viewer liked, unflushed
+        buffered likes included.
+        """
+        liked_threads, liked_comments = await LikeStateService.get_liked_ids(
             db,
             user_id,
+            sorted(set(thread_ids)),
+            sorted(set(comment_ids)),
+        )
+        return {
+            "liked_thread_ids": sorted(liked_threads),
+            "liked_comment_ids": sorted(liked_comments),
+        }
+
+    # ==============================
+    # Write-behind mode (LIKE_WRITE_BEHIND)
+    # ==============================
+    @classmethod
+    def _seed_buffer(cls, db: Session, kind: str, target_id: int):
+        repo = cls.thread_repo if kind == "thread" else cls.comment_repo
+        target = repo.get_by_id(db, target_id)
+        if target is None or target.is_deleted:
+            raise HTTPException(404, "Target not found")
+        LikeBufferService.seed(
+            kind,
+            target_id,
+            cls.repo.get_liker_ids(db, **{f"{kind}_id": target_id}),
+        )
+
+    @classmethod
+    def _buffer_like(
+        cls,
+        db: Session,
+        payload: LikeCreate,
+        user_id: int,
+        liked: bool,
+    ) -> tuple[bool, dict] | None:
+        """
+        Like/unlike against the Redis state only; the DB catches up on
+        the next flush. Returns None when Redis is unavailable so the
+        caller writes through instead.
+        """
+        kind, target_id = LikeBufferService.target_of(
             payload.thread_id,
-            payload.comment_id
+            payload.comment_id,
         )
+        try:
+            result = LikeBufferService.toggle(kind, target_id, user_id, liked)
+            if result is None:
+                cls._seed_buffer(db, kind, target_id)
+                result = LikeBufferService.toggle(kind, target_id, user_id, liked)
+        except HTTPException:
+            raise
+        except Exception:
+            logger.warning("Like buffer unavailable; writing through", exc_info=True)
+            return None
+        if result is None:
+            return None
 
-        if not like:
-            raise HTTPException(404, "Like not found")
+        changed, like_count = result
+        if changed and kind == "thread":
+            delta = 1 if liked else -1
+            ThreadService._patch_thread_card(target_id, like_delta=delta)
+            TrendingService.record_engagement(target_id, like_delta=delta)
 
-        thread_id = like.thread_id
-        comment_id = like.comment_id
-        cls.repo.remove_like(db, like)
+        return changed, cls._like_state(payload, liked, like_count)
 
-        like_count = None
-        if thread_id:
-            like_count = cls.repo.count_thread_likes(
-                db,
-                thread_id
-            )
-            try:
-                ThreadService._invalidate_threads_cache()
-            except Exception:
-                pass
-        elif comment_id:
-            like_count = cls.repo.count_comment_likes(
-                db,
-                comment_id
+    @classmethod
+    def _persist_viewer_pending(cls, payload: LikeCreate, user_id: int):
+        """
+        Before writing through, persist the viewer's unflushed change to
+        this target, so the DB agrees with what they were shown (e.g. an
+        unlike right after a buffered like is not answered with a 404).
+        """
+        kind, target_id = LikeBufferService.target_of(
+            payload.thread_id,
+            payload.comment_id,
+        )
+        pending, _counts = LikeStateService.live_state(
+            user_id,
+            [target_id] if kind == "thread" else [],
+            [target_id] if kind == "comment" else [],
+        )
+        if (kind, target_id) in pending:
+            cls._persist_buffered(
+                {(kind, target_id, user_id): pending[(kind, target_id)]}
             )
 
+    @classmethod
+    def _persist_buffered(cls, changes: dict[tuple[str, int, int], bool]):
+        """
+        Apply one drained batch in a single transaction: bulk insert and
+        delete likes, recount the touched targets, notify owners of new
+        likes and queue one like event per target. Only likes the batch
+        actually inserted notify, so an unlike and re-like within one
+        window (or a retried batch) does not notify again.
+        """
+        rows = {True: [], False: []}
+        for (kind, target_id, user_id), liked in changes.items():
+            rows[liked].append({
+                "user_id": user_id,
+                "thread_id": target_id if kind == "thread" else None,
+                "comment_id": target_id if kind == "comment" else None,
+            })
+        thread_ids = sorted({
+            target_id for kind, target_id, _user in changes if kind == "thread"
+        })
+        comment_ids = sorted({
+            target_id for kind, target_id, _user in changes if kind == "comment"
+        })
+
+        db = SessionLocal()
         try:
-            from_thread.run(
-                broadcast_new_like,
-                thread_id,
-                comment_id,
-                like_count,
-                "removed",
-            )
-        except Exception:
-            # Realtime delivery failure should not rollback persisted unlike.
-            pass
+            with unit_of_work(db):
+                inserted = cls.repo.apply_like_changes(db, rows[True], rows[False])
+                thread_counts, comment_counts = cls.repo.sync_like_counts(
+                    db,
+                    thread_ids,
+                    comment_ids,
+                )
+
+                targets = {}
+                for row in inserted:
+                    if row["thread_id"] is not None:
+                        kind, target_id = "thread", row["thread_id"]
+                    else:
+                        kind, target_id = "comment", row["comment_id"]
+                    if (kind, target_id) not in targets:
+                        repo = cls.thread_repo if kind == "thread" else cls.comment_repo
+                        targets[(kind, target_id)] = repo.get_by_id(db, target_id)
+                    cls._notify_like(db, row["user_id"], kind, targets[(kind, target_id)])
+
+                for thread_id, like_count in thread_counts.items():
+                    OutboxService.publish(
+                        db,
+                        RedisChannels.LIKES,
+                        build_like_message(thread_id, None, like_count),
+                    )
+                for comment_id, (like_count, thread_id) in comment_counts.items():
+                    OutboxService.publish(
+                        db,
+                        RedisChannels.LIKES,
+                        build_like_message(None, comment_id, like_count),
+                    )
+                    after_commit(db, bump_version, comments_version_key(thread_id))
+        finally:
+            db.close()
+
+    @classmethod
+    async def flush_buffered(cls) -> int:
+        return await LikeBufferService.drain(
+            lambda changes: to_thread.run_sync(cls._persist_buffered, changes)
+        )
+
+    @classmethod
+    async def flush_forever(cls):
+        """
+        Background task: persist buffered likes periodically.
+        """
+        while True:
+            await asyncio.sleep(LikeBufferService._flush_interval_seconds)
+            try:
+                await cls.flush_buffered()
+            except Exception:
+                logger.warning("Buffered like flush failed", exc_info=True)
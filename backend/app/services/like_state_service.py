@@ -0,0 +1,192 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.repositories.like import AsyncLikeRepository, LikeRepository
+from app.services.like_buffer_service import LikeBufferService
+from app.utils.cache import run_redis_call
+
+
+class LikeStateService:
+    """
+    The viewer's liked-state and like counts for pages of threads and
+    comments; every reader goes through here.
+
+    One indexed query answers which targets the viewer liked. With
+    `LIKE_WRITE_BEHIND` the DB trails the buffer by up to one flush, so
+    one Redis round trip lays the viewer's unflushed changes and the
+    buffered counters over that answer.
+    """
+
+    repo = LikeRepository()
+    async_repo = AsyncLikeRepository()
+
+    @staticmethod
+    def _overlay_pending(
+        liked_ids: tuple[set[int], set[int]],
+        pending: dict[tuple[str, int], bool],
+    ) -> tuple[set[int], set[int]]:
+        liked_threads, liked_comments = liked_ids
+        for (kind, target_id), liked in pending.items():
+            target_ids = liked_threads if kind == "thread" else liked_comments
+            if liked:
+                target_ids.add(target_id)
+            else:
+                target_ids.discard(target_id)
+        return liked_threads, liked_comments
+
+    @staticmethod
+    def _ids(items: list[dict]) -> list[int]:
+        return [int(item["id"]) for item in items if item.get("id") is not None]
+
+    @staticmethod
+    def _apply(
+        items: list[dict],
+        kind: str,
+        liked_ids: set[int],
+        counts: dict[tuple[str, int], int],
+    ) -> list[dict]:
+        # Items may be shared cached payloads; overlay on copies.
+        return [
+            {
+                **item,
+                "user_has_liked": item.get("id") in liked_ids,
+                "like_count": counts.get(
+                    (kind, item.get("id")),
+                    item.get("like_count", 0),
+                ),
+            }
+            for item in items
+        ]
+
+    # ==============================
+    # Sync read paths
+    # ==============================
+    @classmethod
+    def live_state(
+        cls,
+        user_id: int | None,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[dict[tuple[str, int], bool], dict[tuple[str, int], int]]:
+        if not settings.LIKE_WRITE_BEHIND:
+            return {}, {}
+        try:
+            return run_redis_call(
+                LikeBufferService.live_state,
+                user_id,
+                thread_ids,
+                comment_ids,
+            )
+        except Exception:
+            # The DB answer is at most one flush behind.
+            return {}, {}
+
+    @classmethod
+    def _resolve(cls, db: Session, user_id, thread_ids, comment_ids):
+        liked_ids = (
+            cls.repo.get_liked_ids(db, user_id, thread_ids, comment_ids)
+            if user_id is not None
+            else (set(), set())
+        )
+        pending, counts = cls.live_state(user_id, thread_ids, comment_ids)
+        return cls._overlay_pending(liked_ids, pending), counts
+
+    @classmethod
+    def liked_ids(
+        cls,
+        db: Session,
+        user_id: int,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[set[int], set[int]]:
+        liked_ids, _counts = cls._resolve(db, user_id, thread_ids, comment_ids)
+        return liked_ids
+
+    @classmethod
+    def overlay_sync(
+        cls,
+        db: Session,
+        user_id: int | None,
+        threads: list[dict] = (),
+        comments: list[dict] = (),
+    ) -> tuple[list[dict], list[dict]]:
+        (liked_threads, liked_comments), counts = cls._resolve(
+            db,
+            user_id,
+            cls._ids(threads),
+            cls._ids(comments),
+        )
+        return (
+            cls._apply(threads, "thread", liked_threads, counts),
+            cls._apply(comments, "comment", liked_comments, counts),
+        )
+
+    # ==============================
+    # Async read paths
+    # ==============================
+    @classmethod
+    async def _live_state_async(cls, user_id, thread_ids, comment_ids):
+        if not settings.LIKE_WRITE_BEHIND:
+            return {}, {}
+        try:
+            return await LikeBufferService.live_state(
+                user_id,
+                thread_ids,
+                comment_ids,
+            )
+        except Exception:
+            return {}, {}
+
+    @classmethod
+    async def _resolve_async(cls, db: AsyncSession, user_id, thread_ids, comment_ids):
+        liked_ids = (
+            await cls.async_repo.get_liked_ids(db, user_id, thread_ids, comment_ids)
+            if user_id is not None
+            else (set(), set())
+        )
+        pending, counts = await cls._live_state_async(
+            user_id,
+            thread_ids,
+            comment_ids,
+        )
+        return cls._overlay_pending(liked_ids, pending), counts
+
+    @classmethod
+    async def get_liked_ids(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        thread_ids: list[int],
+        comment_ids: list[int],
+    ) -> tuple[set[int], set[int]]:
+        liked_ids, _counts = await cls._resolve_async(
+            db,
+            user_id,
+            thread_ids,
+            comment_ids,
+        )
+        return liked_ids
+
+    @classmethod
+    async def overlay(
+        cls,
+        db: AsyncSession,
+        user_id: int | None,
+        threads: list[dict] = (),
+        comments: list[dict] = (),
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Copies of these serialized threads and comments with the viewer's
+        `user_has_liked` and the current `like_count`.
+        """
+        (liked_threads, liked_comments), counts = await cls._resolve_async(
+            db,
+            user_id,
+            cls._ids(threads),
+            cls._ids(comments),
+        )
+        return (
+            cls._apply(threads, "thread", liked_threads, counts),
+            cls._apply(comments, "comment", liked_comments, counts),
+        )
@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from anyio import from_thread
 
+from app.core.constants import RedisChannels
+from app.db.unit_of_work import unit_of_work
 from app.schemas.moderation import (
     ModerationCreate,
     ReportCreate,
@@ -10,7 +11,8 @@ from app.schemas.moderation import (
 from app.repositories.moderation import (
     ModerationRepository
 )
-from app.websocket.handlers import broadcast_moderation_review
+from app.services.outbox_service import OutboxService
+from app.websocket.handlers import build_moderation_message
 
 
 class ModerationService:
@@ -26,20 +28,16 @@ class ModerationService:
         db: Session,
         payload: ModerationCreate | ReportCreate
     ):
-        review = cls.repo.create(
-            db,
-            payload.model_dump()
-        )
-
-        try:
-            from_thread.run(
-                broadcast_moderation_review,
-                review,
-                "created",
+        with unit_of_work(db):
+            review = cls.repo.create(
+                db,
+                payload.model_dump()
+            )
+            OutboxService.publish(
+                db,
+                RedisChannels.MODERATION,
+                build_moderation_message(review, "created"),
             )
-        except Exception:
-            # Realtime delivery is best-effort.
-            pass
 
         return review
 
@@ -81,19 +79,16 @@ class ModerationService:
         update_data = payload.model_dump()
         update_data["reviewer_id"] = reviewer_id
 
-        updated_review = cls.repo.update(
-            db,
-            review,
-            update_data
-        )
-        try:
-            from_thread.run(
-                broadcast_moderation_review,
-                updated_review,
-                "updated",
+        with unit_of_work(db):
+            updated_review = cls.repo.update(
+                db,
+                review,
+                update_data
+            )
+            OutboxService.publish(
+                db,
+                RedisChannels.MODERATION,
+                build_moderation_message(updated_review, "updated"),
             )
-        except Exception:
-            # Realtime delivery is best-effort.
-            pass
 
         return updated_review
@@ -0,0 +1,106 @@
+import json
+import logging
+
+from redis.exceptions import ResponseError
+
+from app.integrations.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationQueueService:
+    """
+    Notification jobs on a Redis Stream (`NOTIFICATION_QUEUE`).
+
+    Write paths append one entry per notification once their transaction
+    has committed. Workers in one consumer group read batches, hand them
+    to `NotificationService` for a bulk insert and acknowledge them only
+    afterwards; entries a crashed worker left unacknowledged are claimed
+    by another worker once they have been idle for `_claim_idle_ms`.
+    """
+
+    _stream_key = "notifications:jobs"
+    _group = "notification-workers"
+    _batch_size = 100
+    _block_ms = 1000
+    _claim_idle_ms = 60_000
+    # Trimmed approximately; acknowledged entries are deleted anyway.
+    _max_length = 100_000
+
+    # ==============================
+    # Enqueue
+    # ==============================
+    @classmethod
+    async def enqueue(cls, jobs: list[dict]) -> None:
+        pipe = redis_client.redis.pipeline(transaction=False)
+        for job in jobs:
+            pipe.xadd(
+                cls._stream_key,
+                {"job": json.dumps(job, default=str)},
+                maxlen=cls._max_length,
+                approximate=True,
+            )
+        await pipe.execute()
+
+    # ==============================
+    # Consume
+    # ==============================
+    @classmethod
+    async def ensure_group(cls) -> None:
+        try:
+            await redis_client.redis.xgroup_create(
+                cls._stream_key,
+                cls._group,
+                id="0",
+                mkstream=True,
+            )
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    @classmethod
+    async def _read_batch(cls, consumer: str) -> list[tuple[str, dict | None]]:
+        # Entries abandoned by a dead worker go first.
+        claimed = await redis_client.redis.xautoclaim(
+            cls._stream_key,
+            cls._group,
+            consumer,
+            min_idle_time=cls._claim_idle_ms,
+            start_id="0-0",
+            count=cls._batch_size,
+        )
+        if claimed[1]:
+            return claimed[1]
+        response = await redis_client.redis.xreadgroup(
+            cls._group,
+            consumer,
+            {cls._stream_key: ">"},
+            count=cls._batch_size,
+            block=cls._block_ms,
+        )
+        return response[0][1] if response else []
+
+    @classmethod
+    async def drain(cls, consumer: str, apply) -> int:
+        """
+        Read one batch and hand its jobs to `apply` (an async callable);
+        the entries are acknowledged and deleted once it succeeds.
+        """
+        entries = await cls._read_batch(consumer)
+        if not entries:
+            return 0
+        jobs = []
+        for entry_id, fields in entries:
+            try:
+                jobs.append(json.loads(fields["job"]))
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Dropping malformed notification job %s", entry_id)
+        if jobs:
+            await apply(jobs)
+        entry_ids = [entry_id for entry_id, _fields in entries]
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.xack(cls._stream_key, cls._group, *entry_ids)
+        pipe.xdel(cls._stream_key, *entry_ids)
+        await pipe.execute()
+        return len(jobs)
@@ -1,52 +1,78 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import Counter
+
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from anyio import from_thread
+from anyio import to_thread
 
+from app.core.config import settings
+from app.core.constants import RedisChannels
+from app.db.session import SessionLocal
+from app.db.unit_of_work import after_commit, after_commit_batch, unit_of_work
 from app.repositories.notification import (
-    NotificationRepository
+    AsyncNotificationRepository,
+    NotificationRepository,
 )
-from app.websocket.manager import manager
 from app.websocket.notifications_handler import (
-    dispatch_notification_event,
+    build_notification_payload,
 )
-from app.integrations.redis_client import redis_client
+from app.services.notification_queue_service import NotificationQueueService
+from app.services.outbox_service import OutboxService
+from app.services.unread_counter_service import UnreadCounterService
+from app.utils.cache import CacheAside, LocalCache, run_redis_call
+from app.utils.etag import bump_version, read_version
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationService:
 
     repo = NotificationRepository()
-    _count_cache_prefix = "notifications:unread_count:"
+    async_repo = AsyncNotificationRepository()
     _list_cache_prefix = "notifications:list:"
+    _generation_prefix = "notifications:generation:"
     _cache_ttl_seconds = 300
+    _cache_soft_ttl_seconds = 240
+    _list_cache = CacheAside(
+        ttl_seconds=_cache_ttl_seconds,
+        soft_ttl_seconds=_cache_soft_ttl_seconds,
+    )
+    _local_cache = LocalCache("notifications", maxsize=1024, ttl_seconds=30)
+    _duplicate_window_seconds = 30
+    _worker_retry_seconds = 1
 
     @classmethod
-    def _count_cache_key(cls, user_id: int) -> str:
-        return f"{cls._count_cache_prefix}{user_id}"
+    def _generation_key(cls, user_id: int) -> str:
+        return f"{cls._generation_prefix}{user_id}"
 
     @classmethod
-    def _list_cache_key(cls, user_id: int, page: int, size: int) -> str:
-        return f"{cls._list_cache_prefix}{user_id}:{page}:{size}"
+    def _list_cache_key(
+        cls,
+        user_id: int,
+        query: str,
+        generation: str | None = None,
+    ) -> str:
+        # The L1 key has no generation: local copies are dropped by prefix.
+        if generation is None:
+            return f"{cls._list_cache_prefix}{user_id}:{query}"
+        return f"{cls._list_cache_prefix}{user_id}:v{generation}:{query}"
 
     @classmethod
     def _invalidate_cache(cls, user_id: int):
-        try:
-            from_thread.run(
-                redis_client.redis.delete,
-                cls._count_cache_key(user_id),
-            )
-            pattern = f"{cls._list_cache_prefix}{user_id}:*"
-            keys = from_thread.run(
-                redis_client.redis.keys,
-                pattern,
-            )
-            if keys:
-                for key in keys:
-                    from_thread.run(
-                        redis_client.redis.delete,
-                        key,
-                    )
-        except Exception:
-            pass
+        """
+        One INCR retires every cached list page of the user: readers move
+        on to keys of the new generation and the old ones just expire.
+        """
+        cls._local_cache.invalidate(
+            prefixes=[f"{cls._list_cache_prefix}{user_id}:"],
+        )
+        bump_version(cls._generation_key(user_id))
 
     @staticmethod
     def _serialize_notification(notification) -> dict:
@@ -80,6 +106,21 @@ class NotificationService:
         entity_id: int,
     ):
 
+        data = {
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "type": type,
+            "title": title,
+            "message": message,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+        }
+        if settings.NOTIFICATION_QUEUE:
+            # Enqueued once the caller's transaction commits; a worker
+            # creates it. All jobs of one transaction share one round trip.
+            after_commit_batch(db, cls._enqueue_jobs, data)
+            return None
+
         existing = cls.repo.find_recent_duplicate(
             db,
             user_id=user_id,
@@ -87,122 +128,203 @@ class NotificationService:
             type=type,
             entity_type=entity_type,
             entity_id=entity_id,
-            window_seconds=30,
+            window_seconds=cls._duplicate_window_seconds,
         )
         if existing is not None:
             return existing
 
-        data = {
-            "user_id": user_id,
-            "actor_id": actor_id,
-            "type": type,
-            "title": title,
-            "message": message,
-            "entity_type": entity_type,
-            "entity_id": entity_id,
-        }
-
         notification = cls.repo.create(db, data)
-        cls._invalidate_cache(user_id)
+        after_commit(db, cls._invalidate_cache, user_id)
+        after_commit(db, UnreadCounterService.adjust, user_id, 1)
+        # Every worker's listener delivers to the recipient's own sockets,
+        # wherever they are connected.
+        OutboxService.publish(
+            db,
+            RedisChannels.NOTIFICATIONS,
+            build_notification_payload(notification),
+        )
 
-        if manager.is_user_online(user_id):
-            from_thread.run(
-                dispatch_notification_event,
-                notification,
+        return notification
+
+    # ==============================
+    # Queued creation (NOTIFICATION_QUEUE)
+    # ==============================
+    @classmethod
+    def create_notifications(cls, db: Session, jobs: list[dict]) -> list:
+        """
+        Bulk form of `create_notification` used by the queue worker: one
+        duplicate lookup, one insert, one cache invalidation per
+        recipient and one outbox insert for all the socket events.
+        """
+        existing = cls.repo.find_recent_duplicate_keys(
+            db,
+            jobs,
+            window_seconds=cls._duplicate_window_seconds,
+        )
+        rows = []
+        for job in jobs:
+            key = (
+                job["user_id"],
+                job["actor_id"],
+                job["type"],
+                job["entity_type"],
+                job["entity_id"],
             )
+            if key in existing:
+                continue
+            existing.add(key)
+            rows.append(job)
 
-        return notification
+        notifications = cls.repo.create_many(db, rows)
+        created = Counter(item.user_id for item in notifications)
+        for user_id in sorted(created):
+            after_commit(db, cls._invalidate_cache, user_id)
+            after_commit(db, UnreadCounterService.adjust, user_id, created[user_id])
+        OutboxService.publish_many(
+            db,
+            RedisChannels.NOTIFICATIONS,
+            [build_notification_payload(item) for item in notifications],
+        )
+        return notifications
+
+    @classmethod
+    def _persist_jobs(cls, jobs: list[dict]):
+        db = SessionLocal()
+        try:
+            with unit_of_work(db):
+                cls.create_notifications(db, jobs)
+        finally:
+            db.close()
+
+    @classmethod
+    def _enqueue_jobs(cls, jobs: list[dict]):
+        try:
+            run_redis_call(NotificationQueueService.enqueue, jobs)
+        except Exception:
+            logger.warning(
+                "Notification queue unavailable; creating inline",
+                exc_info=True,
+            )
+            cls._persist_jobs(jobs)
+
+    @classmethod
+    async def consume_once(cls, consumer: str) -> int:
+        return await NotificationQueueService.drain(
+            consumer,
+            lambda jobs: to_thread.run_sync(cls._persist_jobs, jobs),
+        )
+
+    @classmethod
+    async def consume_forever(cls, consumer: str | None = None):
+        """
+        Worker loop: runs as a background task of the app
+        (`NOTIFICATION_WORKER_IN_PROCESS`) or standalone via
+        `python -m app.services.notification_service`.
+        """
+        consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        group_ready = False
+        while True:
+            try:
+                if not group_ready:
+                    await NotificationQueueService.ensure_group()
+                    group_ready = True
+                await cls.consume_once(consumer)
+            except Exception:
+                logger.warning("Notification worker failed", exc_info=True)
+                group_ready = False
+                await asyncio.sleep(cls._worker_retry_seconds)
 
     # ==============================
     # List Notifications
     # ==============================
     @classmethod
-    def get_user_notifications(
+    async def get_user_notifications(
         cls,
-        db: Session,
+        db: AsyncSession,
         user_id: int,
         page: int = 1,
         size: int = 20,
+        before: str | None = None,
+        unread_only: bool = False,
     ):
-        cache_key = cls._list_cache_key(user_id, page, size)
-        cached = None
-        try:
-            cached = from_thread.run(
-                redis_client.redis.get,
-                cache_key,
-            )
-        except Exception:
-            pass
-        if cached:
-            import json
-
-            return json.loads(cached)
+        """
+        One inbox page, newest first. `before` switches to keyset
+        pagination: "" for the first page, then each `next_cursor`.
+        """
+        cursor = None
+        if before:
+            try:
+                cursor = decode_cursor(before)
+            except ValueError:
+                raise HTTPException(400, "Invalid cursor") from None
 
-        items = cls.repo.get_user_notifications(
-            db,
-            user_id,
-            page=page,
-            size=size,
-        )
-        serialized_items = [
-            cls._serialize_notification(item)
-            for item in items
-        ]
-        total = cls.repo.count_user_notifications(
-            db,
-            user_id,
-        )
-        response = {
-            "items": serialized_items,
-            "total": total,
-            "page": page,
-            "size": size,
-        }
-        try:
-            import json
-
-            from_thread.run(
-                redis_client.redis.setex,
-                cache_key,
-                cls._cache_ttl_seconds,
-                json.dumps(
-                    response,
-                    default=str,
-                ),
-            )
-        except Exception:
-            pass
+        async def load() -> dict:
+            response = {"size": size}
+            if before is None:
+                items = await cls.async_repo.get_user_notifications(
+                    db,
+                    user_id,
+                    page=page,
+                    size=size,
+                    unread_only=unread_only,
+                )
+                response["total"] = await cls.async_repo.count_user_notifications(
+                    db,
+                    user_id,
+                    unread_only=unread_only,
+                )
+                response["page"] = page
+            else:
+                # No total in cursor mode: counting the whole inbox would
+                # make each page scale with it again.
+                response["total"] = None
+                # One extra row tells whether another page exists.
+                items = await cls.async_repo.get_user_notifications_page(
+                    db,
+                    user_id,
+                    limit=size + 1,
+                    before=cursor,
+                    unread_only=unread_only,
+                )
+                has_more = len(items) > size
+                items = items[:size]
+                response["next_cursor"] = (
+                    encode_cursor(items[-1].created_at, items[-1].id)
+                    if has_more
+                    else None
+                )
+            response["items"] = [
+                cls._serialize_notification(item)
+                for item in items
+            ]
+            return response
 
+        query = ":".join([
+            "unread" if unread_only else "all",
+            str(page) if before is None else f"c{before}",
+            str(size),
+        ])
+        local_key = cls._list_cache_key(user_id, query)
+        response = cls._local_cache.get(local_key)
+        if response is None:
+            generation = await read_version(cls._generation_key(user_id))
+            if generation is None:
+                response = await load()
+            else:
+                response = await cls._list_cache.get_or_load(
+                    cls._list_cache_key(user_id, query, generation),
+                    load,
+                )
+            cls._local_cache.set(local_key, response)
         return response
 
     @classmethod
-    def get_unread_count(
+    async def get_unread_count(
         cls,
-        db: Session,
+        db: AsyncSession,
         user_id: int,
     ) -> int:
-        cache_key = cls._count_cache_key(user_id)
-        try:
-            cached = from_thread.run(
-                redis_client.redis.get,
-                cache_key,
-            )
-            if cached is not None:
-                return int(cached)
-        except Exception:
-            pass
-
-        count = cls.repo.get_unread_count(db, user_id)
-        try:
-            from_thread.run(
-                redis_client.redis.setex,
-                cache_key,
-                cls._cache_ttl_seconds,
-                str(count),
-            )
-        except Exception:
-            pass
-        return count
+        return await UnreadCounterService.get(db, user_id)
 
     # ==============================
     # Mark as Read
@@ -223,11 +345,9 @@ class NotificationService:
         if not notification:
             raise HTTPException(404, "Notification not found")
 
-        notification = cls.repo.mark_as_read(
-            db,
-            notification,
-        )
-        cls._invalidate_cache(user_id)
+        if cls.repo.mark_as_read(db, notification):
+            UnreadCounterService.adjust(user_id, -1)
+            cls._invalidate_cache(user_id)
 
         return notification
 
@@ -241,5 +361,20 @@ class NotificationService:
             db,
             user_id,
         )
-        cls._invalidate_cache(user_id)
+        if updated:
+            # A delta, not SET 0: notifications created meanwhile keep
+            # their increments.
+            UnreadCounterService.adjust(user_id, -updated)
+            cls._invalidate_cache(user_id)
         return updated
+
+
+def run():
+    """
+    Standalone notification worker entry point.
+    """
+    asyncio.run(NotificationService.consume_forever())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import logging
+
+from anyio import from_thread
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import AsyncSessionLocal
+from app.db.unit_of_work import after_commit
+from app.integrations.redis_client import redis_client
+from app.repositories.outbox import AsyncOutboxRepository, OutboxRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxService:
+    """
+    Transactional outbox for realtime events.
+
+    Write paths insert the event next to the domain change, so it commits
+    (or rolls back) with it and the request never waits on Redis. A relay
+    task publishes pending rows to their `RedisChannels` in batches and
+    deletes them afterwards: delivery is at-least-once, and events
+    written while Redis is down go out once it is back.
+    """
+
+    repo = OutboxRepository()
+    async_repo = AsyncOutboxRepository()
+    _batch_size = 100
+    _poll_interval_seconds = 1.0
+    _wakeup: asyncio.Event | None = None
+
+    # ==============================
+    # Enqueue (sync write paths)
+    # ==============================
+    @classmethod
+    def publish(cls, db: Session, channel: str, message: dict) -> None:
+        cls.repo.add(db, channel, json.dumps(message, default=str))
+        after_commit(db, cls.wake)
+
+    @classmethod
+    def publish_many(cls, db: Session, channel: str, messages: list[dict]) -> None:
+        if not messages:
+            return
+        cls.repo.add_many(
+            db,
+            channel,
+            [json.dumps(message, default=str) for message in messages],
+        )
+        after_commit(db, cls.wake)
+
+    @classmethod
+    def wake(cls):
+        """
+        Nudge the relay so committed events don't wait for the next poll.
+        """
+        if cls._wakeup is None:
+            return
+        try:
+            from_thread.run_sync(cls._wakeup.set)
+        except Exception:
+            # The poll interval bounds the delay.
+            pass
+
+    # ==============================
+    # Relay
+    # ==============================
+    @classmethod
+    async def relay_once(cls, db: AsyncSession) -> int:
+        events = await cls.async_repo.claim_batch(db, cls._batch_size)
+        if not events:
+            await db.rollback()
+            return 0
+        pipe = redis_client.redis.pipeline(transaction=False)
+        for event in events:
+            pipe.publish(event.channel, event.payload)
+        await pipe.execute()
+        # A crash before this commit republishes the batch; consumers
+        # already tolerate duplicate frames.
+        await cls.async_repo.delete_ids(db, [event.id for event in events])
+        await db.commit()
+        return len(events)
+
+    @classmethod
+    async def relay_forever(cls):
+        """
+        Background task: drain the outbox, then wait for a wake-up or
+        the poll interval.
+        """
+        cls._wakeup = asyncio.Event()
+        while True:
+            cls._wakeup.clear()
+            try:
+                async with AsyncSessionLocal() as db:
+                    relayed = await cls.relay_once(db)
+            except Exception:
+                logger.warning("Outbox relay failed", exc_info=True)
+                await asyncio.sleep(cls._poll_interval_seconds)
+                continue
+            if relayed >= cls._batch_size:
+                continue
+            try:
+                await asyncio.wait_for(
+                    cls._wakeup.wait(),
+                    cls._poll_interval_seconds,
+                )
+            except TimeoutError:
+                pass
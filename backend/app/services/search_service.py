@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from app.repositories.comment import CommentRepository
 from app.repositories.thread import ThreadRepository
+from app.services.like_state_service import LikeStateService
 from app.services.thread_service import ThreadService
 
 
@@ -14,7 +15,6 @@ class SearchService:
 
     @staticmethod
     def _serialize_comment(comment) -> dict:
-        likes = list(comment.likes or [])
         return {
             "id": comment.id,
             "created_at": comment.created_at,
@@ -33,11 +33,27 @@ class SearchService:
                 else None
             ),
             "parent_comment_id": comment.parent_comment_id,
-            "like_count": len(likes),
+            "like_count": comment.like_count or 0,
             "user_has_liked": False,
             "is_deleted": comment.is_deleted,
         }
 
+    @staticmethod
+    def _overlay_liked(
+        db: Session,
+        items: list[dict],
+        user_id: int | None,
+        kind: str,
+    ) -> list[dict]:
+        """
+        Mark the page's items the viewer liked, with one batch lookup.
+        """
+        if kind == "thread":
+            items, _ = LikeStateService.overlay_sync(db, user_id, threads=items)
+        else:
+            _, items = LikeStateService.overlay_sync(db, user_id, comments=items)
+        return items
+
     # ==============================
     # Search Threads
     # ==============================
@@ -50,6 +66,7 @@ class SearchService:
         size: int = 20,
         search_in: str = "all",
         sort_by: str = "relevance",
+        user_id: int | None = None,
     ):
 
         if not keyword:
@@ -67,7 +84,7 @@ class SearchService:
         for thread in results:
             try:
                 serialized.append(
-                    ThreadService._serialize_thread(thread, None)
+                    ThreadService._serialize_thread(thread)
                 )
             except AttributeError:
                 serialized.append({"id": getattr(thread, "id", None)})
@@ -90,7 +107,12 @@ class SearchService:
         end = start + size
 
         return {
-            "results": serialized[start:end],
+            "results": cls._overlay_liked(
+                db,
+                serialized[start:end],
+                user_id,
+                "thread",
+            ),
             "total": total
         }
 
@@ -101,6 +123,7 @@ class SearchService:
         keyword: str,
         page: int = 1,
         size: int = 20,
+        user_id: int | None = None,
     ):
         if not keyword:
             return {
@@ -120,6 +143,11 @@ class SearchService:
         start = (page - 1) * size
         end = start + size
         return {
-            "results": serialized[start:end],
+            "results": cls._overlay_liked(
+                db,
+                serialized[start:end],
+                user_id,
+                "comment",
+            ),
             "total": total
         }
@@ -1,25 +1,31 @@
-import asyncio
 import math
 import json
+from datetime import datetime, timedelta, timezone
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from anyio import from_thread
 
+from app.db.unit_of_work import after_commit, unit_of_work
 from app.models.thread import Thread
 from app.models.user import User
-from app.core.constants import Roles
+from app.core.constants import RedisChannels, Roles
 from app.schemas.thread import ThreadCreate, ThreadUpdate
-from app.repositories.thread import ThreadRepository
+from app.repositories.thread import AsyncThreadRepository, ThreadRepository
 from app.repositories.tag import TagRepository
 from app.repositories.user import UserRepository
-from app.repositories.like import LikeRepository
 from app.models.tag import Tag
 from app.integrations.redis_client import redis_client
-from app.websocket.handlers import broadcast_new_thread
+from app.utils.cache import CacheAside, LocalCache, run_redis_call
+from app.utils.etag import THREADS_VERSION_KEY, bump_version
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.websocket.handlers import build_thread_message
+from app.services.like_state_service import LikeStateService
 from app.services.mention_service import MentionService
 from app.services.moderation_service import ModerationService
 from app.services.notification_service import NotificationService
+from app.services.outbox_service import OutboxService
+from app.services.trending_service import TrendingService
 from app.schemas.moderation import ModerationCreate
 
 
@@ -28,9 +34,41 @@ class ThreadService:
     repo = ThreadRepository()
     user_repo = UserRepository()
     tag_repo = TagRepository()
-    like_repo = LikeRepository()
-    _threads_cache_key = "threads:list"
-    _threads_cache_ttl_seconds = 300
+    async_repo = AsyncThreadRepository()
+    # Structured list cache: an ordered ID index (sorted set scored by
+    # created_at) plus one hash per thread card. Writes patch individual
+    # cards or index members instead of dropping the whole list.
+    _threads_index_key = "threads:index"
+    _threads_index_ready_key = "threads:index:ready"
+    _thread_card_prefix = "threads:card:"
+    _threads_index_ttl_seconds = 300
+    _threads_index_hard_ttl_seconds = 3600
+    _thread_card_ttl_seconds = 3600
+    # How far before a rebuild's snapshot to look for threads committed
+    # while it ran (covers commit latency and clock skew).
+    _index_catch_up_seconds = 60
+    # The ready marker is the index's soft TTL: once it lapses one worker
+    # rebuilds the index under a lock while others keep reading the old one.
+    _index_cache = CacheAside(
+        ttl_seconds=_threads_index_hard_ttl_seconds,
+        soft_ttl_seconds=_threads_index_ttl_seconds,
+    )
+    # In-process L1 in front of the Redis index and cards; invalidations
+    # are broadcast so every worker drops the same entries.
+    _local_pages = LocalCache("threads:pages", maxsize=256, ttl_seconds=30)
+    _local_cards = LocalCache("threads:cards", maxsize=2048, ttl_seconds=60)
+    _card_counter_fields = ("like_count", "comment_count", "view_count")
+    # Only bump counters on cards that are fully cached; a partial hash
+    # would otherwise be created for threads nobody has read yet.
+    _patch_card_script = """
+if redis.call('HEXISTS', KEYS[1], 'data') == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
 
     @staticmethod
     def _is_moderator_or_admin(user: User) -> bool:
@@ -40,9 +78,7 @@ class ThreadService:
         )
 
     @staticmethod
-    def _serialize_thread(thread: Thread, user_id: int | None = None) -> dict:
-        likes = list(thread.likes or [])
-        comments = list(thread.comments or [])
+    def _serialize_thread(thread: Thread, user_has_liked: bool = False) -> dict:
         return {
             "id": thread.id,
             "created_at": thread.created_at,
@@ -61,33 +97,418 @@ class ThreadService:
                 if thread.author
                 else None
             ),
-            "comment_count": sum(
-                1 for comment in comments
-                if not comment.is_deleted
-            ),
-            "like_count": len(likes),
-            "user_has_liked": any(
-                like.user_id == user_id for like in likes
-            ) if user_id is not None else False,
+            "comment_count": thread.comment_count or 0,
+            "like_count": thread.like_count or 0,
+            "view_count": thread.view_count or 0,
+            "user_has_liked": bool(user_has_liked),
             "is_deleted": thread.is_deleted,
         }
 
+    @staticmethod
+    def _item_cursor(item: dict) -> str:
+        created_at = item["created_at"]
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        return encode_cursor(created_at, item["id"])
+
     @staticmethod
     def _run_redis_call(method, *args):
+        return run_redis_call(method, *args)
+
+    @classmethod
+    def _card_key(cls, thread_id: int) -> str:
+        return f"{cls._thread_card_prefix}{thread_id}"
+
+    @staticmethod
+    def _index_score(created_at) -> float:
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return created_at.timestamp()
+
+    @classmethod
+    def _card_mapping(cls, item: dict) -> dict:
+        static = {
+            key: value
+            for key, value in item.items()
+            if key not in cls._card_counter_fields
+            and key != "user_has_liked"
+        }
+        return {
+            "data": json.dumps(static, default=str),
+            **{field: int(item[field]) for field in cls._card_counter_fields},
+        }
+
+    @classmethod
+    def _card_from_hash(cls, raw: dict | None) -> dict | None:
+        if not raw or "data" not in raw:
+            return None
+        item = json.loads(raw["data"])
+        for field in cls._card_counter_fields:
+            item[field] = int(raw.get(field) or 0)
+        item["user_has_liked"] = False
+        return item
+
+    @classmethod
+    async def _read_index_page(cls, start: int, stop: int):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.exists(cls._threads_index_ready_key)
+        pipe.zcard(cls._threads_index_key)
+        pipe.zrevrange(cls._threads_index_key, start, stop)
+        return await pipe.execute()
+
+    @classmethod
+    async def _write_index(cls, entries: list[tuple[int, float]]):
+        # Built aside and renamed over the live index, so readers never
+        # see it half-written.
+        staging_key = f"{cls._threads_index_key}:staging"
+        pipe = redis_client.redis.pipeline(transaction=True)
+        pipe.delete(staging_key)
+        if entries:
+            pipe.zadd(
+                staging_key,
+                {str(thread_id): score for thread_id, score in entries},
+            )
+            pipe.expire(
+                staging_key,
+                cls._index_cache.jittered(cls._threads_index_hard_ttl_seconds),
+            )
+            pipe.rename(staging_key, cls._threads_index_key)
+        else:
+            pipe.delete(cls._threads_index_key)
+        pipe.set(
+            cls._threads_index_ready_key,
+            "1",
+            ex=cls._index_cache.jittered(cls._threads_index_ttl_seconds),
+        )
+        await pipe.execute()
+
+    @classmethod
+    async def _read_cards(cls, thread_ids: list[int]):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        for thread_id in thread_ids:
+            pipe.hgetall(cls._card_key(thread_id))
+        return await pipe.execute()
+
+    @classmethod
+    async def _write_cards(cls, items: list[dict]):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        for item in items:
+            key = cls._card_key(item["id"])
+            pipe.hset(key, mapping=cls._card_mapping(item))
+            pipe.expire(
+                key,
+                cls._index_cache.jittered(cls._thread_card_ttl_seconds),
+            )
+        await pipe.execute()
+
+    @classmethod
+    async def _add_to_index(cls, item: dict):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.zadd(
+            cls._threads_index_key,
+            {str(item["id"]): cls._index_score(item["created_at"])},
+        )
+        key = cls._card_key(item["id"])
+        pipe.hset(key, mapping=cls._card_mapping(item))
+        pipe.expire(
+            key,
+            cls._index_cache.jittered(cls._thread_card_ttl_seconds),
+        )
+        await pipe.execute()
+
+    @classmethod
+    async def _remove_from_index(cls, thread_ids: list[int]):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.zrem(
+            cls._threads_index_key,
+            *[str(thread_id) for thread_id in thread_ids],
+        )
+        for thread_id in thread_ids:
+            pipe.delete(cls._card_key(thread_id))
+        await pipe.execute()
+
+    @classmethod
+    async def _incr_card_counters(cls, thread_id: int, deltas: dict):
+        args = []
+        for field, delta in deltas.items():
+            args.extend([field, int(delta)])
+        return await redis_client.redis.eval(
+            cls._patch_card_script,
+            1,
+            cls._card_key(thread_id),
+            *args,
+        )
+
+    # The write paths below update Redis first and only then drop L1 and
+    # bump the list version: a reader in between would otherwise cache
+    # the old card or page in L1 and pair it with the new ETag.
+    @classmethod
+    def _index_new_thread(cls, thread: Thread):
         try:
-            return asyncio.run(method(*args))
-        except RuntimeError:
-            return from_thread.run(method, *args)
+            cls._run_redis_call(
+                cls._add_to_index,
+                cls._serialize_thread(thread),
+            )
+        except Exception:
+            pass
+        cls._local_pages.invalidate(everything=True)
+        bump_version(THREADS_VERSION_KEY)
 
     @classmethod
-    def _invalidate_threads_cache(cls):
+    def _refresh_thread_card(cls, thread: Thread):
+        try:
+            cls._run_redis_call(
+                cls._write_cards,
+                [cls._serialize_thread(thread)],
+            )
+        except Exception:
+            pass
+        cls._local_cards.invalidate(keys=[str(thread.id)])
+        bump_version(THREADS_VERSION_KEY)
+
+    @classmethod
+    def _evict_thread(cls, thread_id: int):
+        try:
+            cls._run_redis_call(cls._remove_from_index, [thread_id])
+        except Exception:
+            pass
+        cls._local_pages.invalidate(everything=True)
+        cls._local_cards.invalidate(keys=[str(thread_id)])
+        bump_version(THREADS_VERSION_KEY)
+
+    @classmethod
+    def _drop_thread_cards(cls, thread_ids: list[int]):
+        """
+        Forget cached cards (e.g. after their author changed); the next
+        read reloads them from the DB.
+        """
+        if not thread_ids:
+            return
         try:
             cls._run_redis_call(
                 redis_client.redis.delete,
-                cls._threads_cache_key,
+                *[cls._card_key(thread_id) for thread_id in thread_ids],
             )
         except Exception:
             pass
+        cls._local_cards.invalidate(
+            keys=[str(thread_id) for thread_id in thread_ids],
+        )
+        bump_version(THREADS_VERSION_KEY)
+
+    @classmethod
+    def _patch_thread_card(
+        cls,
+        thread_id: int,
+        like_delta: int = 0,
+        comment_delta: int = 0,
+    ):
+        deltas = {
+            field: delta
+            for field, delta in (
+                ("like_count", like_delta),
+                ("comment_count", comment_delta),
+            )
+            if delta
+        }
+        if not deltas:
+            return
+        try:
+            cls._run_redis_call(cls._incr_card_counters, thread_id, deltas)
+        except Exception:
+            pass
+        cls._local_cards.invalidate(keys=[str(thread_id)])
+        bump_version(THREADS_VERSION_KEY)
+
+    @classmethod
+    async def _load_cards(
+        cls,
+        db: AsyncSession,
+        thread_ids: list[int],
+    ) -> list[dict]:
+        cards = {
+            thread_id: cls._local_cards.get(str(thread_id))
+            for thread_id in thread_ids
+        }
+        remote = [
+            thread_id
+            for thread_id, card in cards.items()
+            if card is None
+        ]
+        if remote:
+            raw_cards = await cls._read_cards(remote)
+            cards.update({
+                thread_id: cls._card_from_hash(raw)
+                for thread_id, raw in zip(remote, raw_cards, strict=True)
+            })
+        missing = [
+            thread_id
+            for thread_id, card in cards.items()
+            if card is None
+        ]
+        if missing:
+            loaded = [
+                cls._serialize_thread(thread)
+                for thread in await cls.async_repo.get_by_ids(db, missing)
+            ]
+            if loaded:
+                await cls._write_cards(loaded)
+            cards.update({item["id"]: item for item in loaded})
+            gone = [
+                thread_id
+                for thread_id in missing
+                if cards.get(thread_id) is None
+            ]
+            if gone:
+                await cls._remove_from_index(gone)
+                cls._local_pages.drop(everything=True)
+        for thread_id in remote:
+            if cards.get(thread_id) is not None:
+                cls._local_cards.set(str(thread_id), cards[thread_id])
+        return [
+            cards[thread_id]
+            for thread_id in thread_ids
+            if cards.get(thread_id) is not None
+        ]
+
+    @classmethod
+    async def _rebuild_index(
+        cls,
+        db: AsyncSession,
+        start: int,
+        size: int,
+    ) -> tuple[int, list[int]]:
+        # Only (id, created_at) pairs are read to rebuild the index;
+        # cards are filled lazily for the pages that get requested.
+        started = datetime.now(timezone.utc) - timedelta(
+            seconds=cls._index_catch_up_seconds,
+        )
+        keys = await cls.async_repo.get_active_thread_keys(db)
+        await cls._write_index(
+            [
+                (thread_id, cls._index_score(created_at))
+                for thread_id, created_at in keys
+            ],
+        )
+        # Threads committed after the snapshot were added to the index the
+        # rename just replaced; add them again.
+        known = {thread_id for thread_id, _ in keys}
+        recent = [
+            (thread_id, created_at)
+            for thread_id, created_at in await cls.async_repo.get_active_thread_keys(
+                db,
+                since=started,
+            )
+            if thread_id not in known
+        ]
+        if recent:
+            await redis_client.redis.zadd(
+                cls._threads_index_key,
+                {
+                    str(thread_id): cls._index_score(created_at)
+                    for thread_id, created_at in recent
+                },
+            )
+            keys = sorted(
+                keys + recent,
+                key=lambda key: (cls._index_score(key[1]), key[0]),
+                reverse=True,
+            )
+        return len(keys), [
+            thread_id
+            for thread_id, _ in keys[start:start + size]
+        ]
+
+    @classmethod
+    async def _probe_index_page(cls, start: int, stop: int):
+        page = await cls._read_index_page(start, stop)
+        return page if page[0] else None
+
+    @classmethod
+    async def _read_cached_page(
+        cls,
+        db: AsyncSession,
+        start: int,
+        size: int,
+    ) -> tuple[list[dict], int]:
+        page_key = f"{start}:{size}"
+        cached_page = cls._local_pages.get(page_key)
+        if cached_page is not None:
+            total, thread_ids = cached_page
+            return await cls._load_cards(db, thread_ids), total
+
+        stop = start + size - 1
+        ready, total, raw_ids = await cls._read_index_page(start, stop)
+        if not ready:
+            token = await cls._index_cache.try_acquire(cls._threads_index_key)
+            if token is not None:
+                try:
+                    total, raw_ids = await cls._rebuild_index(db, start, size)
+                finally:
+                    await cls._index_cache.release(
+                        cls._threads_index_key,
+                        token,
+                    )
+            elif not total:
+                # Cold index and another worker is building it: wait for
+                # that rebuild instead of stampeding the DB.
+                rebuilt = await cls._index_cache.wait_for(
+                    lambda: cls._probe_index_page(start, stop)
+                )
+                if rebuilt is None:
+                    raise LookupError("Thread index is not ready")
+                _, total, raw_ids = rebuilt
+            # Otherwise a stale index exists and is served while it refreshes.
+        thread_ids = [int(thread_id) for thread_id in raw_ids]
+        cls._local_pages.set(page_key, (int(total), thread_ids))
+        return await cls._load_cards(db, thread_ids), int(total)
+
+    @classmethod
+    async def _read_recent_page(
+        cls,
+        db: AsyncSession,
+        start: int,
+        size: int,
+    ) -> tuple[list[dict], int]:
+        try:
+            return await cls._read_cached_page(db, start, size)
+        except Exception:
+            items = [
+                cls._serialize_thread(thread)
+                for thread in await cls.async_repo.get_active_threads(
+                    db,
+                    offset=start,
+                    limit=size,
+                )
+            ]
+            return items, await cls.async_repo.count_active_threads(db)
+
+    @classmethod
+    async def _read_trending_page(
+        cls,
+        db: AsyncSession,
+        start: int,
+        size: int,
+    ) -> tuple[list[dict], int]:
+        page = await TrendingService.get_page(db, start, size)
+        if page is None:
+            # Trending is unavailable for now; the recent order is cheap.
+            return await cls._read_recent_page(db, start, size)
+        total, thread_ids = page
+        try:
+            return await cls._load_cards(db, thread_ids), total
+        except Exception:
+            threads = {
+                thread.id: thread
+                for thread in await cls.async_repo.get_by_ids(db, thread_ids)
+            }
+            return [
+                cls._serialize_thread(threads[thread_id])
+                for thread_id in thread_ids
+                if thread_id in threads
+            ], total
 
     # ==============================
     # Create Thread
@@ -113,161 +534,187 @@ class ThreadService:
         thread_data = payload.model_dump(exclude={"tags"})
         thread_data["author_id"] = author_id
 
-        thread = cls.repo.create(db, thread_data)
-        raw_tags = payload.tags or []
-        tag_names = sorted(
-            {
-                tag.strip().lower()
-                for tag in raw_tags
-                if isinstance(tag, str) and tag.strip()
-            }
-        )
-        if tag_names:
-            existing_tags = cls.tag_repo.get_by_names(db, tag_names)
-            existing_by_name = {tag.name: tag for tag in existing_tags}
-            to_create = [name for name in tag_names if name not in existing_by_name]
-
-            created_tags = []
-            for name in to_create:
-                created_tags.append(
-                    Tag(name=name)
-                )
-            if created_tags:
-                db.add_all(created_tags)
+        # One transaction for the thread, tags, review, mentions and
+        # notifications; side effects run once it has committed.
+        with unit_of_work(db):
+            thread = cls.repo.create(db, thread_data)
+            raw_tags = payload.tags or []
+            tag_names = sorted(
+                {
+                    tag.strip().lower()
+                    for tag in raw_tags
+                    if isinstance(tag, str) and tag.strip()
+                }
+            )
+            if tag_names:
+                existing_tags = cls.tag_repo.get_by_names(db, tag_names)
+                existing_by_name = {tag.name: tag for tag in existing_tags}
+                to_create = [name for name in tag_names if name not in existing_by_name]
+
+                created_tags = []
+                for name in to_create:
+                    created_tags.append(
+                        Tag(name=name)
+                    )
+                if created_tags:
+                    db.add_all(created_tags)
+                    db.flush()
+
+                thread.tags = [*existing_tags, *created_tags]
                 db.flush()
 
-            thread.tags = [*existing_tags, *created_tags]
-            db.commit()
-            db.refresh(thread)
-
-        author = cls.user_repo.get_by_id(db, author_id)
-        if author is None or not cls._is_moderator_or_admin(author):
-            ModerationService.create_review(
+            author = cls.user_repo.get_by_id(db, author_id)
+            if author is None or not cls._is_moderator_or_admin(author):
+                ModerationService.create_review(
+                    db,
+                    ModerationCreate(
+                        content_type="THREAD",
+                        thread_id=thread.id,
+                    ),
+                )
+            mentioned_users = MentionService.process_mentions(
                 db,
-                ModerationCreate(
-                    content_type="THREAD",
-                    thread_id=thread.id,
-                ),
+                f"{payload.title} {payload.description}",
+                thread_id=thread.id,
             )
-        mentioned_users = MentionService.process_mentions(
-            db,
-            f"{payload.title} {payload.description}",
-            thread_id=thread.id,
-        )
-        actor_label = (
-            (author.name or "").strip()
-            if author is not None
-            else ""
-        ) or (author.email if author is not None else "") or "Someone"
-        for user in mentioned_users:
-            if user.id == author_id:
-                continue
-            NotificationService.create_notification(
+            actor_label = (
+                (author.name or "").strip()
+                if author is not None
+                else ""
+            ) or (author.email if author is not None else "") or "Someone"
+            for user in mentioned_users:
+                if user.id == author_id:
+                    continue
+                NotificationService.create_notification(
+                    db,
+                    user_id=user.id,
+                    actor_id=author_id,
+                    type="THREAD_MENTION",
+                    title="You were mentioned in a thread",
+                    message=f"{actor_label} mentioned you in a thread.",
+                    entity_type="thread",
+                    entity_id=thread.id,
+                )
+
+            OutboxService.publish(
                 db,
-                user_id=user.id,
-                actor_id=author_id,
-                type="THREAD_MENTION",
-                title="You were mentioned in a thread",
-                message=f"{actor_label} mentioned you in a thread.",
-                entity_type="thread",
-                entity_id=thread.id,
+                RedisChannels.THREADS,
+                build_thread_message(thread, "created"),
             )
 
-        cls._invalidate_threads_cache()
-        try:
-            from_thread.run(
-                broadcast_new_thread,
-                thread,
-                "created",
-            )
-        except Exception:
-            # Realtime delivery is best-effort.
-            pass
+            # Caches only see committed state.
+            after_commit(db, cls._index_new_thread, thread)
+            after_commit(db, TrendingService.record_new_thread, thread.id)
         return thread
 
     # ==============================
     # List Threads
     # ==============================
     @classmethod
-    def list_threads(
+    async def list_threads(
         cls,
-        db: Session,
+        db: AsyncSession,
         page: int = 1,
         size: int = 20,
         user_id: int | None = None,
+        cursor: str | None = None,
+        sort: str = "recent",
     ):
-        data: list[dict] | None = None
-
-        if user_id is None:
-            try:
-                cached = cls._run_redis_call(
-                    redis_client.redis.get,
-                    cls._threads_cache_key
-                )
-                if cached:
-                    data = json.loads(cached)
-            except Exception:
-                pass
-        else:
-            try:
-                cached = cls._run_redis_call(
-                    redis_client.redis.get,
-                    cls._threads_cache_key
-                )
-                if cached:
-                    data = json.loads(cached)
-            except Exception:
-                pass
-
-        if data is None:
-            threads = cls.repo.get_active_threads(db)
-            # Cache canonical payload without user-specific like state.
-            data = [cls._serialize_thread(thread, None) for thread in threads]
-
-            try:
-                cls._run_redis_call(
-                    redis_client.redis.setex,
-                    cls._threads_cache_key,
-                    cls._threads_cache_ttl_seconds,
-                    json.dumps(data, default=str),
+        if cursor is not None:
+            if sort != "recent":
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cursor pagination is only supported for sort=recent"
                 )
-            except Exception:
-                pass
-
-        if user_id is not None:
-            liked_thread_ids = cls.like_repo.get_liked_thread_ids(
+            return await cls._list_threads_keyset(
                 db,
-                user_id,
+                cursor=cursor,
+                size=size,
+                user_id=user_id,
             )
-            for item in data:
-                item["user_has_liked"] = (
-                    int(item["id"]) in liked_thread_ids
-                )
 
-        total = len(data)
-        pages = max(1, math.ceil(total / size))
         start = (page - 1) * size
+        if sort == "trending":
+            items, total = await cls._read_trending_page(db, start, size)
+        else:
+            items, total = await cls._read_recent_page(db, start, size)
+
+        # Only the IDs on this page are checked, never the user's full
+        # like history.
+        items, _ = await LikeStateService.overlay(db, user_id, threads=items)
+
+        pages = max(1, math.ceil(total / size))
         end = start + size
         return {
-            "items": data[start:end],
+            "items": items,
             "total": total,
             "page": page,
             "size": size,
             "pages": pages,
+            "next_cursor": (
+                cls._item_cursor(items[-1])
+                if sort == "recent" and items and end < total
+                else None
+            ),
+        }
+
+    @classmethod
+    async def _list_threads_keyset(
+        cls,
+        db: AsyncSession,
+        cursor: str,
+        size: int = 20,
+        user_id: int | None = None,
+    ):
+        before = None
+        if cursor:
+            try:
+                before = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid cursor"
+                ) from None
+
+        # Fetch one extra row to learn whether another page exists.
+        threads = await cls.async_repo.get_active_threads_page(
+            db,
+            limit=size + 1,
+            before=before,
+        )
+        has_more = len(threads) > size
+        threads = threads[:size]
+        items, _ = await LikeStateService.overlay(
+            db,
+            user_id,
+            threads=[cls._serialize_thread(thread) for thread in threads],
+        )
+
+        # No total in cursor mode: counting every active thread would make
+        # each page scale with the forum again.
+        return {
+            "items": items,
+            "total": None,
+            "size": size,
+            "next_cursor": (
+                encode_cursor(threads[-1].created_at, threads[-1].id)
+                if has_more
+                else None
+            ),
         }
 
     # ==============================
     # Get Thread
     # ==============================
     @classmethod
-    def get_thread(
+    async def get_thread(
         cls,
-        db: Session,
+        db: AsyncSession,
         thread_id: int,
         user_id: int | None = None,
     ):
 
-        thread = cls.repo.get_by_id(db, thread_id)
+        thread = await cls.async_repo.get_by_id(db, thread_id)
 
         if not thread or thread.is_deleted:
             raise HTTPException(
@@ -275,7 +722,12 @@ class ThreadService:
                 detail="Thread not found"
             )
 
-        return cls._serialize_thread(thread, user_id)
+        (item,), _ = await LikeStateService.overlay(
+            db,
+            user_id,
+            threads=[cls._serialize_thread(thread)],
+        )
+        return item
 
     # ==============================
     # Update Thread
@@ -309,47 +761,48 @@ class ThreadService:
         payload_data = payload.model_dump(exclude_unset=True)
         new_tags = payload_data.pop("tags", None)
 
-        updated_thread = cls.repo.update(
-            db,
-            thread,
-            payload_data
-        )
-        if new_tags is not None:
-            tag_names = sorted(
-                {
-                    tag.strip().lower()
-                    for tag in new_tags
-                    if isinstance(tag, str) and tag.strip()
-                }
+        with unit_of_work(db):
+            updated_thread = cls.repo.update(
+                db,
+                thread,
+                payload_data
             )
+            if new_tags is not None:
+                tag_names = sorted(
+                    {
+                        tag.strip().lower()
+                        for tag in new_tags
+                        if isinstance(tag, str) and tag.strip()
+                    }
+                )
 
-            existing_tags = cls.tag_repo.get_by_names(db, tag_names)
-            existing_by_name = {tag.name: tag for tag in existing_tags}
-            to_create = [name for name in tag_names if name not in existing_by_name]
+                existing_tags = cls.tag_repo.get_by_names(db, tag_names)
+                existing_by_name = {tag.name: tag for tag in existing_tags}
+                to_create = [name for name in tag_names if name not in existing_by_name]
 
-            created_tags = []
-            for name in to_create:
-                created_tags.append(
-                    Tag(name=name)
-                )
-            if created_tags:
-                db.add_all(created_tags)
-                db.flush()
+                created_tags = []
+                for name in to_create:
+                    created_tags.append(
+                        Tag(name=name)
+                    )
+                if created_tags:
+                    db.add_all(created_tags)
+                    db.flush()
 
-            updated_thread.tags = [*existing_tags, *created_tags]
-            db.commit()
-            db.refresh(updated_thread)
-        cls._invalidate_threads_cache()
-        try:
-            from_thread.run(
-                broadcast_new_thread,
-                updated_thread,
-                "updated",
+                updated_thread.tags = [*existing_tags, *created_tags]
+                db.flush()
+            OutboxService.publish(
+                db,
+                RedisChannels.THREADS,
+                build_thread_message(updated_thread, "updated"),
             )
-        except Exception:
-            # Realtime delivery is best-effort.
-            pass
-        return cls._serialize_thread(updated_thread, user_id)
+            after_commit(db, cls._refresh_thread_card, updated_thread)
+        (item,), _ = LikeStateService.overlay_sync(
+            db,
+            user_id,
+            threads=[cls._serialize_thread(updated_thread)],
+        )
+        return item
 
     # ==============================
     # Delete Thread (Soft)
@@ -379,17 +832,15 @@ class ThreadService:
                 detail="Not allowed to delete"
             )
 
-        cls.repo.soft_delete(
-            db,
-            thread,
-        )
-        cls._invalidate_threads_cache()
-        try:
-            from_thread.run(
-                broadcast_new_thread,
+        with unit_of_work(db):
+            cls.repo.soft_delete(
+                db,
                 thread,
-                "deleted",
             )
-        except Exception:
-            # Realtime delivery is best-effort.
-            pass
+            OutboxService.publish(
+                db,
+                RedisChannels.THREADS,
+                build_thread_message(thread, "deleted"),
+            )
+            after_commit(db, cls._evict_thread, thread.id)
+            after_commit(db, TrendingService.remove_thread, thread.id)
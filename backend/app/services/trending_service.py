@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.integrations.redis_client import redis_client
+from app.repositories.thread import AsyncThreadRepository
+from app.utils.cache import CacheAside, run_redis_call
+from app.utils.etag import THREADS_VERSION_KEY
+
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingService:
+    """
+    Time-decayed "trending" ranking kept in a Redis sorted set.
+
+    Scores are stored relative to an epoch: an engagement event adds
+    `weight * 2 ** ((now - epoch) / half_life)`, so fresh events outrank
+    older ones without touching every member. The periodic recompute
+    rebases the epoch to "now" and rescores recent threads from the DB as
+    `(1 + likes + 2 * comments) / 2 ** (age / half_life)`.
+    """
+
+    repo = AsyncThreadRepository()
+    _scores_key = "threads:trending"
+    _epoch_key = "threads:trending:epoch"
+    _half_life_seconds = 12 * 3600
+    _window_days = 7
+    _refresh_interval_seconds = 300
+    _like_weight = 1
+    _comment_weight = 2
+    # One worker recomputes per interval (the lock is left to expire);
+    # a cold set is rebuilt on demand under a short, released lock.
+    _refresh_lock = CacheAside(
+        ttl_seconds=_refresh_interval_seconds,
+        lock_ttl_seconds=_refresh_interval_seconds - 5,
+    )
+    _rebuild_lock = CacheAside(ttl_seconds=_refresh_interval_seconds)
+    # Only members already ranked are bumped, and only once the set has
+    # been built (the epoch exists); a cold set is filled by the recompute.
+    _bump_script = """
+local epoch = redis.call('GET', KEYS[2])
+if not epoch then
+    return 0
+end
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) and ARGV[4] == '0' then
+    return 0
+end
+local boost = tonumber(ARGV[2]) * 2 ^ ((tonumber(ARGV[3]) - tonumber(epoch)) / tonumber(ARGV[5]))
+redis.call('ZINCRBY', KEYS[1], boost, ARGV[1])
+return 1
+"""
+
+    @classmethod
+    def _score(
+        cls,
+        created_at: datetime,
+        like_count: int,
+        comment_count: int,
+        now: float,
+    ) -> float:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age = max(0.0, now - created_at.timestamp())
+        engagement = (
+            1
+            + cls._like_weight * (like_count or 0)
+            + cls._comment_weight * (comment_count or 0)
+        )
+        return engagement / 2 ** (age / cls._half_life_seconds)
+
+    @classmethod
+    async def _scored_candidates(
+        cls,
+        db: AsyncSession,
+        now: float,
+    ) -> dict[int, float]:
+        since = datetime.fromtimestamp(now, timezone.utc) - timedelta(
+            days=cls._window_days,
+        )
+        rows = await cls.repo.get_trending_candidates(db, since)
+        return {
+            thread_id: cls._score(created_at, likes, comments, now)
+            for thread_id, created_at, likes, comments in rows
+        }
+
+    # ==============================
+    # Recompute
+    # ==============================
+    @classmethod
+    async def recompute(cls, db: AsyncSession) -> int:
+        now = time.time()
+        scores = await cls._scored_candidates(db, now)
+        staging_key = f"{cls._scores_key}:staging"
+        pipe = redis_client.redis.pipeline(transaction=True)
+        pipe.delete(staging_key)
+        if scores:
+            pipe.zadd(
+                staging_key,
+                {str(thread_id): score for thread_id, score in scores.items()},
+            )
+            pipe.rename(staging_key, cls._scores_key)
+        else:
+            pipe.delete(cls._scores_key)
+        pipe.set(cls._epoch_key, repr(now))
+        # The trending order changed; revalidate polled thread lists.
+        pipe.incr(THREADS_VERSION_KEY)
+        await pipe.execute()
+        return len(scores)
+
+    @classmethod
+    async def refresh_forever(cls):
+        """
+        Background task: rebase and rescore the trending set periodically.
+        """
+        while True:
+            try:
+                token = await cls._refresh_lock.try_acquire(cls._epoch_key)
+                if token is not None:
+                    async with AsyncSessionLocal() as db:
+                        await cls.recompute(db)
+            except Exception:
+                logger.warning("Trending recompute failed", exc_info=True)
+            await asyncio.sleep(cls._refresh_interval_seconds)
+
+    # ==============================
+    # Incremental updates (sync write paths)
+    # ==============================
+    @classmethod
+    def _bump(cls, thread_id: int, weight: float, add_missing: bool = False):
+        try:
+            run_redis_call(
+                redis_client.redis.eval,
+                cls._bump_script,
+                2,
+                cls._scores_key,
+                cls._epoch_key,
+                str(thread_id),
+                weight,
+                time.time(),
+                "1" if add_missing else "0",
+                cls._half_life_seconds,
+            )
+        except Exception:
+            # The next recompute restores the score.
+            pass
+
+    @classmethod
+    def record_new_thread(cls, thread_id: int):
+        cls._bump(thread_id, 1, add_missing=True)
+
+    @classmethod
+    def record_engagement(
+        cls,
+        thread_id: int,
+        like_delta: int = 0,
+        comment_delta: int = 0,
+    ):
+        weight = (
+            cls._like_weight * like_delta
+            + cls._comment_weight * comment_delta
+        )
+        if weight:
+            cls._bump(thread_id, weight)
+
+    @classmethod
+    def remove_thread(cls, thread_id: int):
+        try:
+            run_redis_call(
+                redis_client.redis.zrem,
+                cls._scores_key,
+                str(thread_id),
+            )
+        except Exception:
+            pass
+
+    # ==============================
+    # Read
+    # ==============================
+    @classmethod
+    async def _read_page(
+        cls,
+        start: int,
+        size: int,
+    ) -> tuple[int, list[int]] | None:
+        pipe = redis_client.redis.pipeline()
+        pipe.exists(cls._epoch_key)
+        pipe.zcard(cls._scores_key)
+        pipe.zrevrange(cls._scores_key, start, start + size - 1)
+        ready, total, raw_ids = await pipe.execute()
+        if not ready:
+            return None
+        return int(total), [int(thread_id) for thread_id in raw_ids]
+
+    @classmethod
+    async def get_page(
+        cls,
+        db: AsyncSession,
+        start: int,
+        size: int,
+    ) -> tuple[int, list[int]] | None:
+        """
+        Return (total, thread_ids) for one trending page, best first, or
+        None when the set is unavailable (Redis down, or cold while
+        another worker builds it). Callers then serve another order
+        rather than each scoring the whole window from the DB.
+        """
+        try:
+            page = await cls._read_page(start, size)
+            if page is not None:
+                return page
+            token = await cls._rebuild_lock.try_acquire(cls._scores_key)
+        except Exception:
+            return None
+        if token is None:
+            # Another worker is rebuilding the cold set: wait for it.
+            return await cls._rebuild_lock.wait_for(
+                lambda: cls._read_page(start, size)
+            )
+        try:
+            await cls.recompute(db)
+            return await cls._read_page(start, size)
+        except Exception:
+            logger.warning("Trending rebuild failed", exc_info=True)
+            return None
+        finally:
+            await cls._rebuild_lock.release(cls._scores_key, token)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import AsyncSessionLocal
+from app.integrations.redis_client import redis_client
+from app.repositories.notification import AsyncNotificationRepository
+from app.utils.cache import CacheAside, run_redis_call
+
+
+logger = logging.getLogger(__name__)
+
+
+class UnreadCounterService:
+    """
+    Unread notification counts kept as Redis integers.
+
+    Write paths adjust a counter only while it exists; a missing counter is
+    rebuilt from the DB by the next read. Since increments and the rebuild
+    can interleave, a periodic reconciliation recounts every live counter
+    and overwrites it unless it moved during the recount.
+    """
+
+    repo = AsyncNotificationRepository()
+    _prefix = "notifications:unread:"
+    _users_key = "notifications:unread:users"
+    _ttl_seconds = 24 * 3600
+    _reconcile_interval_seconds = 600
+    _reconcile_batch_size = 500
+    _reconcile_lock = CacheAside(
+        ttl_seconds=_reconcile_interval_seconds,
+        lock_ttl_seconds=_reconcile_interval_seconds - 5,
+    )
+    # Returns the new count, or nil when the counter is not built.
+    _adjust_script = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+local count = redis.call('INCRBY', KEYS[1], ARGV[1])
+if count < 0 then
+    redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+    count = 0
+end
+return count
+"""
+    # ARGV holds (expected, recounted) pairs; a counter that changed since
+    # it was read is left for the next round.
+    _reconcile_script = """
+local fixed = 0
+for i, key in ipairs(KEYS) do
+    local current = redis.call('GET', key)
+    if current and current == ARGV[2 * i - 1] and current ~= ARGV[2 * i] then
+        redis.call('SET', key, ARGV[2 * i], 'KEEPTTL')
+        fixed = fixed + 1
+    end
+end
+return fixed
+"""
+
+    @classmethod
+    def _key(cls, user_id: int) -> str:
+        return f"{cls._prefix}{user_id}"
+
+    # ==============================
+    # Write paths (sync)
+    # ==============================
+    @classmethod
+    def adjust(cls, user_id: int, delta: int) -> None:
+        try:
+            run_redis_call(
+                redis_client.redis.eval,
+                cls._adjust_script,
+                1,
+                cls._key(user_id),
+                delta,
+            )
+        except Exception:
+            # Drift is bounded by the counter TTL and the reconciliation.
+            pass
+
+    @classmethod
+    async def _store(cls, user_id: int, count: int, only_missing: bool = False):
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.set(cls._key(user_id), count, ex=cls._ttl_seconds, nx=only_missing)
+        pipe.sadd(cls._users_key, str(user_id))
+        await pipe.execute()
+
+    # ==============================
+    # Read
+    # ==============================
+    @classmethod
+    async def get(cls, db: AsyncSession, user_id: int) -> int:
+        try:
+            count = await redis_client.redis.get(cls._key(user_id))
+        except Exception:
+            return await cls.repo.get_unread_count(db, user_id)
+        if count is not None:
+            return int(count)
+
+        count = await cls.repo.get_unread_count(db, user_id)
+        try:
+            await cls._store(user_id, count, only_missing=True)
+        except Exception:
+            pass
+        return count
+
+    # ==============================
+    # Reconciliation
+    # ==============================
+    @classmethod
+    async def _reconcile_users(cls, db: AsyncSession, user_ids: list[int]) -> int:
+        keys = [cls._key(user_id) for user_id in user_ids]
+        current = await redis_client.redis.mget(keys)
+        live = [
+            (user_id, key, value)
+            for user_id, key, value in zip(user_ids, keys, current, strict=True)
+            if value is not None
+        ]
+        expired = [
+            str(user_id)
+            for user_id, value in zip(user_ids, current, strict=True)
+            if value is None
+        ]
+        if expired:
+            await redis_client.redis.srem(cls._users_key, *expired)
+        if not live:
+            return 0
+
+        counts = await cls.repo.get_unread_counts(
+            db,
+            [user_id for user_id, _key, _value in live],
+        )
+        args = []
+        for user_id, _key, value in live:
+            args += [value, str(counts.get(user_id, 0))]
+        return int(await redis_client.redis.eval(
+            cls._reconcile_script,
+            len(live),
+            *[key for _user_id, key, _value in live],
+            *args,
+        ))
+
+    @classmethod
+    async def reconcile(cls, db: AsyncSession) -> int:
+        """
+        Recount every live counter against the DB; returns how many were
+        corrected.
+        """
+        fixed = 0
+        batch = []
+        async for member in redis_client.redis.sscan_iter(
+            cls._users_key,
+            count=cls._reconcile_batch_size,
+        ):
+            batch.append(int(member))
+            if len(batch) >= cls._reconcile_batch_size:
+                fixed += await cls._reconcile_users(db, batch)
+                batch = []
+        if batch:
+            fixed += await cls._reconcile_users(db, batch)
+        return fixed
+
+    @classmethod
+    async def reconcile_forever(cls):
+        """
+        Background task: one worker reconciles the counters per interval.
+        """
+        while True:
+            try:
+                token = await cls._reconcile_lock.try_acquire(cls._users_key)
+                if token is not None:
+                    async with AsyncSessionLocal() as db:
+                        await cls.reconcile(db)
+            except Exception:
+                logger.warning("Unread counter reconciliation failed", exc_info=True)
+            await asyncio.sleep(cls._reconcile_interval_seconds)
@@ -1,23 +1,32 @@
 import math
 import logging
-from anyio import from_thread
 
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from app.core.constants import Roles
+from app.core.constants import RedisChannels, Roles
+from app.db.unit_of_work import unit_of_work
 from app.models.user import User
+from app.repositories.comment import CommentRepository
 from app.repositories.role import RoleRepository
+from app.repositories.thread import ThreadRepository
 from app.repositories.user import UserRepository
 from app.services.notification_service import NotificationService
-from app.websocket.handlers import broadcast_new_user
+from app.services.outbox_service import OutboxService
+from app.services.thread_service import ThreadService
+from app.utils.etag import bump_version, comments_version_key
+from app.websocket.handlers import build_user_message
 
 
 class UserService:
 
     repo = UserRepository()
     role_repo = RoleRepository()
+    thread_repo = ThreadRepository()
+    comment_repo = CommentRepository()
     logger = logging.getLogger(__name__)
+    # Copied into cached thread cards and comment pages.
+    _author_fields = {"name", "email", "avatar_url"}
 
     @staticmethod
     def _is_admin(user: User) -> bool:
@@ -26,6 +35,18 @@ class UserService:
             for role in user.roles
         )
 
+    @classmethod
+    def _refresh_authored_content(cls, db: Session, user_id: int, data: dict):
+        if not cls._author_fields & data.keys():
+            return
+        ThreadService._drop_thread_cards(
+            cls.thread_repo.get_author_thread_ids(db, user_id)
+        )
+        bump_version(*[
+            comments_version_key(thread_id)
+            for thread_id in cls.comment_repo.get_commented_thread_ids(db, user_id)
+        ])
+
     @classmethod
     def get_profile(
         cls,
@@ -45,7 +66,9 @@ class UserService:
 
         user = cls.repo.get_by_id(db, user_id)
 
-        return cls.repo.update(db, user, data)
+        updated_user = cls.repo.update(db, user, data)
+        cls._refresh_authored_content(db, user_id, data)
+        return updated_user
 
     @classmethod
     def list_users(
@@ -113,21 +136,14 @@ class UserService:
         if not user:
             raise HTTPException(404, "User not found")
 
-        updated_user = cls.repo.update(db, user, data)
-
-        try:
-            from_thread.run(
-                broadcast_new_user,
-                updated_user,
-                "updated",
-            )
-        except Exception:
-            # Realtime delivery is best-effort.
-            cls.logger.warning(
-                "Failed to broadcast updated user event for user_id=%s",
-                updated_user.id,
-                exc_info=True,
+        with unit_of_work(db):
+            updated_user = cls.repo.update(db, user, data)
+            OutboxService.publish(
+                db,
+                RedisChannels.USERS,
+                build_user_message(updated_user, "updated"),
             )
+        cls._refresh_authored_content(db, user_id, data)
 
         return updated_user
 
@@ -151,50 +167,42 @@ class UserService:
             raise HTTPException(400, "Role not found")
 
         previous_roles = {r.role_name for r in user.roles}
-        user.roles = [role]
-        db.commit()
-        db.refresh(user)
-
-        try:
-            from_thread.run(
-                broadcast_new_user,
-                user,
-                "updated",
-            )
-        except Exception:
-            # Realtime delivery is best-effort.
-            cls.logger.warning(
-                "Failed to broadcast role update event for user_id=%s",
-                user.id,
-                exc_info=True,
-            )
-
-        if role_name == Roles.ADMIN and Roles.ADMIN not in previous_roles:
-            NotificationService.create_notification(
+        with unit_of_work(db):
+            user.roles = [role]
+            db.flush()
+            db.refresh(user)
+            OutboxService.publish(
                 db,
-                user_id=user.id,
-                actor_id=actor.id,
-                type="ROLE_PROMOTION",
-                title="You have been promoted to Admin",
-                message="Re-login to access the admin dashboard.",
-                entity_type="user",
-                entity_id=user.id,
+                RedisChannels.USERS,
+                build_user_message(user, "updated"),
             )
 
-        if (
-            role_name == Roles.MODERATOR
-            and Roles.MODERATOR not in previous_roles
-        ):
-            NotificationService.create_notification(
-                db,
-                user_id=user.id,
-                actor_id=actor.id,
-                type="ROLE_PROMOTION",
-                title="You have been promoted to Moderator",
-                message="Please login as moderator to access moderator dashboard.",
-                entity_type="user",
-                entity_id=user.id,
-            )
+            if role_name == Roles.ADMIN and Roles.ADMIN not in previous_roles:
+                NotificationService.create_notification(
+                    db,
+                    user_id=user.id,
+                    actor_id=actor.id,
+                    type="ROLE_PROMOTION",
+                    title="You have been promoted to Admin",
+                    message="Re-login to access the admin dashboard.",
+                    entity_type="user",
+                    entity_id=user.id,
+                )
+
+            if (
+                role_name == Roles.MODERATOR
+                and Roles.MODERATOR not in previous_roles
+            ):
+                NotificationService.create_notification(
+                    db,
+                    user_id=user.id,
+                    actor_id=actor.id,
+                    type="ROLE_PROMOTION",
+                    title="You have been promoted to Moderator",
+                    message="Please login as moderator to access moderator dashboard.",
+                    entity_type="user",
+                    entity_id=user.id,
+                )
 
         return user
 
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.integrations.redis_client import redis_client
+from app.repositories.thread import AsyncThreadRepository
+from app.services.thread_service import ThreadService
+from app.utils.cache import CacheAside
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountService:
+    """
+    Thread view counters buffered in Redis.
+
+    Reads only HINCRBY a pending hash; a background task swaps the hash
+    out and applies the aggregated deltas to `threads.view_count` in one
+    bulk UPDATE, then patches the cached thread cards without touching
+    `updated_at` or the list ETag version.
+
+    A batch is applied at most once: the swapped-out hash is deleted
+    before the UPDATE commits, and its deltas are put back into the
+    pending hash if the commit fails.
+    """
+
+    repo = AsyncThreadRepository()
+    _pending_key = "threads:views:pending"
+    _flushing_key = "threads:views:flushing"
+    _viewers_prefix = "threads:viewers:"
+    _flush_interval_seconds = 60
+    _flush_lock = CacheAside(
+        ttl_seconds=_flush_interval_seconds,
+        lock_ttl_seconds=_flush_interval_seconds,
+    )
+
+    @classmethod
+    def _viewers_key(cls, thread_id: int) -> str:
+        return f"{cls._viewers_prefix}{thread_id}"
+
+    # ==============================
+    # Record
+    # ==============================
+    @classmethod
+    async def record_view(cls, thread_id: int, viewer_id: int | None = None):
+        try:
+            pipe = redis_client.redis.pipeline(transaction=False)
+            pipe.hincrby(cls._pending_key, str(thread_id), 1)
+            if settings.TRACK_UNIQUE_THREAD_VIEWERS and viewer_id is not None:
+                pipe.pfadd(cls._viewers_key(thread_id), str(viewer_id))
+            await pipe.execute()
+        except Exception:
+            # A lost view is cheaper than a failed read.
+            pass
+
+    @classmethod
+    async def unique_viewers(cls, thread_id: int) -> int | None:
+        """
+        Approximate distinct viewers (HyperLogLog), when tracking is on.
+        """
+        if not settings.TRACK_UNIQUE_THREAD_VIEWERS:
+            return None
+        try:
+            return int(await redis_client.redis.pfcount(cls._viewers_key(thread_id)))
+        except Exception:
+            return None
+
+    # ==============================
+    # Flush
+    # ==============================
+    @classmethod
+    async def _take_pending(cls) -> dict[int, int]:
+        # A batch left behind by a failed flush is retried before new
+        # views are swapped out, so no delta is lost or applied twice.
+        if not await redis_client.redis.exists(cls._flushing_key):
+            if not await redis_client.redis.exists(cls._pending_key):
+                return {}
+            await redis_client.redis.rename(cls._pending_key, cls._flushing_key)
+        raw = await redis_client.redis.hgetall(cls._flushing_key)
+        return {
+            int(thread_id): int(delta)
+            for thread_id, delta in raw.items()
+            if int(delta)
+        }
+
+    @classmethod
+    async def flush(cls, db: AsyncSession) -> int:
+        token = await cls._flush_lock.try_acquire(cls._flushing_key)
+        if token is None:
+            return 0
+        try:
+            deltas = await cls._take_pending()
+            if not deltas:
+                await redis_client.redis.delete(cls._flushing_key)
+                return 0
+            await cls.repo.add_view_counts(db, deltas)
+            try:
+                await redis_client.redis.delete(cls._flushing_key)
+            except Exception:
+                # The batch stays in Redis and is retried; the UPDATE must
+                # not commit or it would be applied twice.
+                await db.rollback()
+                raise
+            try:
+                await db.commit()
+            except Exception:
+                await cls._restore(deltas)
+                raise
+        finally:
+            await cls._flush_lock.release(cls._flushing_key, token)
+
+        for thread_id, delta in deltas.items():
+            try:
+                await ThreadService._incr_card_counters(
+                    thread_id,
+                    {"view_count": delta},
+                )
+            except Exception:
+                # Cards pick the new count up when they are next rebuilt.
+                pass
+        # THREADS_VERSION_KEY is left alone: bumping it every interval
+        # would invalidate every list ETag for a view count. Conditional
+        # GETs pick the new counts up with the next content change.
+        await ThreadService._local_cards.invalidate_async(
+            keys=[str(thread_id) for thread_id in deltas],
+        )
+        return sum(deltas.values())
+
+    @classmethod
+    async def _restore(cls, deltas: dict[int, int]) -> None:
+        try:
+            pipe = redis_client.redis.pipeline(transaction=False)
+            for thread_id, delta in deltas.items():
+                pipe.hincrby(cls._pending_key, str(thread_id), delta)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Dropping %d buffered thread views", sum(deltas.values()))
+
+    @classmethod
+    async def flush_forever(cls):
+        """
+        Background task: apply buffered view counts periodically.
+        """
+        while True:
+            await asyncio.sleep(cls._flush_interval_seconds)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await cls.flush(db)
+            except Exception:
+                logger.warning("Thread view count flush failed", exc_info=True)
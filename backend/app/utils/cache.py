@@ -0,0 +1,352 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from uuid import uuid4
+
+from anyio import NoEventLoopError, from_thread
+
+from app.core.constants import RedisChannels
+from app.integrations.redis_client import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_redis_call(method, *args, **kwargs):
+    """
+    Run a Redis coroutine from synchronous service code.
+
+    Sync endpoints run in AnyIO worker threads, so the call hops back to the
+    app's event loop (and its connection pool). Outside a worker thread
+    (scripts, tests) it falls back to a private loop.
+    """
+    call = partial(method, *args, **kwargs)
+    try:
+        return from_thread.run(call)
+    except NoEventLoopError:
+        pass
+    coroutine = call()
+    try:
+        return asyncio.run(coroutine)
+    except RuntimeError:
+        # Called on a thread that is already running a loop.
+        coroutine.close()
+        raise
+
+
+class CacheAside:
+    """
+    Redis cache-aside helper for the async read paths.
+
+    - single-flight: only the worker holding `<key>:lock` rebuilds a value
+    - soft TTL: stale values keep being served while that worker refreshes
+    - jitter: hard expiries are spread so keys written together don't
+      expire together
+    """
+
+    _release_script = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        soft_ttl_seconds: int | None = None,
+        lock_ttl_seconds: int = 10,
+        jitter_ratio: float = 0.1,
+        wait_timeout_seconds: float = 1.0,
+        poll_interval_seconds: float = 0.05,
+    ):
+        self.ttl = ttl_seconds
+        self.soft_ttl = (
+            soft_ttl_seconds
+            if soft_ttl_seconds is not None
+            else ttl_seconds
+        )
+        self.lock_ttl = lock_ttl_seconds
+        self.jitter_ratio = jitter_ratio
+        self.wait_timeout = wait_timeout_seconds
+        self.poll_interval = poll_interval_seconds
+
+    def jittered(self, seconds: int) -> int:
+        return seconds + random.randint(0, int(seconds * self.jitter_ratio))
+
+    @staticmethod
+    def lock_key(key: str) -> str:
+        return f"{key}:lock"
+
+    # ==============================
+    # Single-flight lock
+    # ==============================
+    async def try_acquire(self, key: str) -> str | None:
+        token = uuid4().hex
+        try:
+            acquired = await redis_client.redis.set(
+                self.lock_key(key),
+                token,
+                nx=True,
+                ex=self.lock_ttl,
+            )
+        except Exception:
+            return None
+        return token if acquired else None
+
+    async def release(self, key: str, token: str) -> None:
+        try:
+            await redis_client.redis.eval(
+                self._release_script,
+                1,
+                self.lock_key(key),
+                token,
+            )
+        except Exception:
+            # The lock expires on its own after lock_ttl.
+            pass
+
+    async def wait_for(self, probe):
+        """
+        Poll `probe` until it returns a non-None value or the wait times out.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                value = await probe()
+            except Exception:
+                return None
+            if value is not None:
+                return value
+        return None
+
+    # ==============================
+    # Cache-aside read
+    # ==============================
+    async def _read(self, key: str) -> dict | None:
+        raw = await redis_client.redis.get(key)
+        return json.loads(raw) if raw else None
+
+    async def _store(self, key: str, value) -> None:
+        envelope = {
+            "value": value,
+            "fresh_until": time.time() + self.soft_ttl,
+        }
+        await redis_client.redis.set(
+            key,
+            json.dumps(envelope, default=str),
+            ex=self.jittered(self.ttl),
+        )
+
+    async def _rebuild(self, key: str, loader, token: str):
+        try:
+            value = await loader()
+            try:
+                await self._store(key, value)
+            except Exception:
+                logger.warning("Cache write failed for %s", key, exc_info=True)
+            return value
+        finally:
+            await self.release(key, token)
+
+    async def get_or_load(self, key: str, loader):
+        try:
+            envelope = await self._read(key)
+        except Exception:
+            return await loader()
+
+        if envelope is not None:
+            if time.time() < envelope["fresh_until"]:
+                return envelope["value"]
+            token = await self.try_acquire(key)
+            if token is None:
+                # Another worker is refreshing; serve the stale copy.
+                return envelope["value"]
+            return await self._rebuild(key, loader, token)
+
+        token = await self.try_acquire(key)
+        if token is not None:
+            return await self._rebuild(key, loader, token)
+
+        envelope = await self.wait_for(lambda: self._read(key))
+        if envelope is not None:
+            return envelope["value"]
+        return await loader()
+
+    async def invalidate(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await redis_client.redis.delete(*keys)
+        except Exception:
+            pass
+
+
+# ==============================
+# In-process L1 cache
+# ==============================
+_local_caches: dict[str, "LocalCache"] = {}
+_instance_id = uuid4().hex
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU with a per-entry TTL, kept in front of Redis.
+
+    Invalidations are applied locally and published on
+    `RedisChannels.CACHE_INVALIDATION` so every worker drops the same
+    entries.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl_seconds: float = 30,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _local_caches[name] = self
+
+    def get(self, key: str, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def drop(
+        self,
+        keys=(),
+        prefixes=(),
+        everything: bool = False,
+    ) -> None:
+        with self._lock:
+            if everything:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+            if prefixes:
+                prefixes = tuple(prefixes)
+                for key in [
+                    key for key in self._entries
+                    if key.startswith(prefixes)
+                ]:
+                    del self._entries[key]
+
+    def _invalidation(self, keys, prefixes, everything: bool) -> dict:
+        keys, prefixes = list(keys), list(prefixes)
+        self.drop(keys, prefixes, everything)
+        return {
+            "origin": _instance_id,
+            "cache": self.name,
+            "keys": keys,
+            "prefixes": prefixes,
+            "everything": everything,
+        }
+
+    def invalidate(
+        self,
+        keys=(),
+        prefixes=(),
+        everything: bool = False,
+    ) -> None:
+        message = self._invalidation(keys, prefixes, everything)
+        try:
+            run_redis_call(
+                redis_client.publish,
+                RedisChannels.CACHE_INVALIDATION,
+                message,
+            )
+        except Exception:
+            # Other workers fall back to the entry TTL.
+            pass
+
+    async def invalidate_async(
+        self,
+        keys=(),
+        prefixes=(),
+        everything: bool = False,
+    ) -> None:
+        """
+        `invalidate` for code already running on the event loop.
+        """
+        message = self._invalidation(keys, prefixes, everything)
+        try:
+            await redis_client.publish(
+                RedisChannels.CACHE_INVALIDATION,
+                message,
+            )
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def local_cache_stats() -> dict[str, dict]:
+    return {
+        name: cache.stats()
+        for name, cache in _local_caches.items()
+    }
+
+
+def apply_invalidation(message: dict) -> None:
+    if message.get("origin") == _instance_id:
+        return
+    cache = _local_caches.get(message.get("cache"))
+    if cache is None:
+        return
+    cache.drop(
+        message.get("keys") or (),
+        message.get("prefixes") or (),
+        bool(message.get("everything")),
+    )
+
+
+async def listen_for_invalidations():
+    pubsub = await redis_client.subscribe(
+        RedisChannels.CACHE_INVALIDATION,
+    )
+    async for msg in pubsub.listen():
+        if msg["type"] != "message":
+            continue
+        try:
+            apply_invalidation(json.loads(msg["data"]))
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed cache invalidation message")
@@ -0,0 +1,57 @@
+import time
+
+from app.integrations.redis_client import redis_client
+from app.utils.cache import run_redis_call
+
+
+# Version counters behind the weak ETags of polled list endpoints.
+THREADS_VERSION_KEY = "threads:version"
+COMMENTS_VERSION_PREFIX = "comments:version:"
+
+
+def comments_version_key(thread_id: int) -> str:
+    return f"{COMMENTS_VERSION_PREFIX}{thread_id}"
+
+
+def bump_version(*keys: str) -> None:
+    """
+    Advance version counters from the sync write paths (best-effort).
+    """
+    for key in keys:
+        try:
+            run_redis_call(redis_client.redis.incr, key)
+        except Exception:
+            # Clients re-download once the counter moves again.
+            pass
+
+
+async def read_version(key: str) -> str | None:
+    try:
+        version = await redis_client.redis.get(key)
+        if version is None:
+            # Seed from the clock so tags issued before a Redis flush
+            # can never match a restarted counter.
+            await redis_client.redis.set(key, time.time_ns(), nx=True)
+            version = await redis_client.redis.get(key)
+    except Exception:
+        return None
+    return version
+
+
+def weak_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison against an If-None-Match header (RFC 9110 13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -1,3 +1,6 @@
+import base64
+import json
+from datetime import datetime
 from math import ceil
 
 
@@ -18,3 +21,28 @@ def paginate(query, page: int, limit: int):
         "pages": ceil(total / limit),
         "page": page,
     }
+
+
+def encode_cursor(created_at: datetime, obj_id: int) -> str:
+    """
+    Build an opaque keyset cursor from a (created_at, id) pair.
+    """
+    raw = json.dumps(
+        [created_at.isoformat(), int(obj_id)],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Reverse of `encode_cursor`. Raises ValueError on malformed input.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, obj_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode()).decode()
+        )
+        return datetime.fromisoformat(created_at), int(obj_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
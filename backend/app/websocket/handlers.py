@@ -1,21 +1,20 @@
+import asyncio
+import logging
+
 from app.websocket.manager import manager
 from app.websocket.events import WSEvents
-from app.integrations.redis_client import (
-    redis_client
-)
-from app.core.constants import RedisChannels
-from app.websocket.notifications_handler import (
-    dispatch_notification_event,
-)
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
 
 
 # ==============================
 # Comment Event
 # ==============================
 
-async def broadcast_new_comment(comment):
-
-    message = {
+def build_comment_message(comment) -> dict:
+    return {
         "event": WSEvents.NEW_COMMENT,
         "data": {
             "comment_id": comment.id,
@@ -24,23 +23,16 @@ async def broadcast_new_comment(comment):
         }
     }
 
-    await manager.broadcast(message)
-    await redis_client.publish(
-        RedisChannels.COMMENTS,
-        message
-    )
-
 
 # ==============================
 # Thread Event
 # ==============================
 
-async def broadcast_new_thread(
+def build_thread_message(
     thread,
     action: str = "created",
-):
-
-    message = {
+) -> dict:
+    return {
         "event": WSEvents.NEW_THREAD,
         "data": {
             "action": action,
@@ -51,25 +43,18 @@ async def broadcast_new_thread(
         }
     }
 
-    await manager.broadcast(message)
-    await redis_client.publish(
-        RedisChannels.THREADS,
-        message
-    )
-
 
 # ==============================
 # Like Event
 # ==============================
 
-async def broadcast_new_like(
+def build_like_message(
     thread_id=None,
     comment_id=None,
     like_count=None,
     action="updated",
-):
-
-    message = {
+) -> dict:
+    return {
         "event": WSEvents.NEW_LIKE,
         "data": {
             "thread_id": thread_id,
@@ -79,35 +64,63 @@ async def broadcast_new_like(
         }
     }
 
-    await manager.broadcast(message)
-    await redis_client.publish(
-        RedisChannels.LIKES,
-        message
-    )
 
-
-# ==============================
-# Notification Event
-# ==============================
-
-async def broadcast_notification(
-    notification
-):
-    await dispatch_notification_event(
-        notification
-    )
+class LikeBroadcastCoalescer:
+    """
+    Merges like events per (thread_id, comment_id) over a short window
+    and broadcasts only the latest one, so a hot target costs each socket
+    one write per window instead of one per like. A window of 0 sends
+    every event straight through.
+
+    This only saves local socket writes: it sits behind the likes channel
+    listener, so every like still goes through the outbox and Redis
+    pub/sub.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window = window_seconds
+        self._pending: dict[tuple, dict] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def submit(self, message: dict):
+        if self.window <= 0:
+            await manager.broadcast(message)
+            return
+        data = message.get("data") or {}
+        # Later events replace earlier ones: the newest like_count wins.
+        self._pending[(data.get("thread_id"), data.get("comment_id"))] = message
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        # Events submitted while flushing open the next window.
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        for message in pending.values():
+            try:
+                await manager.broadcast(message)
+            except Exception:
+                logger.warning("Like broadcast failed", exc_info=True)
+
+
+like_coalescer = LikeBroadcastCoalescer(
+    settings.LIKE_BROADCAST_WINDOW_MS / 1000,
+)
 
 
 # ==============================
 # User Event
 # ==============================
 
-async def broadcast_new_user(
+def build_user_message(
     user,
     action: str = "created",
-):
-
-    message = {
+) -> dict:
+    return {
         "event": WSEvents.NEW_USER,
         "data": {
             "action": action,
@@ -130,23 +143,16 @@ async def broadcast_new_user(
         },
     }
 
-    await manager.broadcast(message)
-    await redis_client.publish(
-        RedisChannels.USERS,
-        message,
-    )
-
 
 # ==============================
 # Moderation Event
 # ==============================
 
-async def broadcast_moderation_review(
+def build_moderation_message(
     review,
     action: str = "created",
-):
-
-    message = {
+) -> dict:
+    return {
         "event": WSEvents.MODERATION_REVIEW,
         "data": {
             "action": action,
@@ -164,9 +170,3 @@ async def broadcast_moderation_review(
             },
         },
     }
-
-    await manager.broadcast(message)
-    await redis_client.publish(
-        RedisChannels.MODERATION,
-        message,
-    )
@@ -100,7 +100,12 @@ class ConnectionManager:
     # ==============================
     # Redis Subscriber Listener
     # ==============================
-    async def listen_to_channel(self, channel: str):
+    async def listen_to_channel(self, channel: str, broadcast=None):
+        """
+        Fan a Redis channel out to the sockets; `broadcast` replaces the
+        plain broadcast (e.g. to coalesce like events).
+        """
+        broadcast = broadcast or self.broadcast
 
         pubsub = await redis_client.subscribe(channel)
 
@@ -124,9 +129,9 @@ class ConnectionManager:
                         continue
 
                 if isinstance(payload, dict):
-                    await self.broadcast(payload)
+                    await broadcast(payload)
                 else:
-                    await self.broadcast({
+                    await broadcast({
                         "redis_event": payload
                     })
 
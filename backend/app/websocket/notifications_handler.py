@@ -1,11 +1,5 @@
-import logging
-
-from app.core.constants import RedisChannels
 from app.websocket.events import WSEvents
-from app.websocket.manager import manager
-from app.integrations.redis_client import redis_client
 
-logger = logging.getLogger(__name__)
 
 def build_notification_payload(notification) -> dict:
     return {
@@ -23,24 +17,3 @@ def build_notification_payload(notification) -> dict:
             "created_at": str(notification.created_at),
         },
     }
-
-
-async def dispatch_notification_event(notification) -> None:
-    payload = build_notification_payload(notification)
-
-    try:
-        await redis_client.publish(
-            RedisChannels.NOTIFICATIONS,
-            payload,
-        )
-        return
-    except Exception:
-        logger.warning(
-            "Redis notification publish failed; falling back to in-process websocket delivery",
-            exc_info=True,
-        )
-
-    await manager.send_notification_to_user(
-        notification.user_id,
-        payload,
-    )
@@ -1,13 +1,18 @@
+import os
+import tempfile
+
+import fakeredis
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from fastapi import Request
 from uuid import uuid4
 
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db, to_async_url
 from app.main import app
 from app.models.user import User
 from app.models.role import Role
@@ -17,14 +22,17 @@ from app.dependencies.rate_limit import (
     comment_rate_limiter,
 )
 from app.websocket.manager import manager
+from app.integrations.redis_client import redis_client
+from app.utils import cache as cache_utils
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# A file-backed database so the sync and async engines see the same rows.
+_db_dir = tempfile.mkdtemp(prefix="forum-tests-")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 
 TestingSessionLocal = sessionmaker(
@@ -33,6 +41,18 @@ TestingSessionLocal = sessionmaker(
     bind=engine,
 )
 
+# NullPool: pytest-asyncio gives each test its own event loop.
+async_engine = create_async_engine(
+    to_async_url(SQLALCHEMY_DATABASE_URL),
+    poolclass=NullPool,
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -45,6 +65,26 @@ def db():
     session.close()
 
 
+@pytest.fixture(scope="function")
+async def async_db(db):
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture(scope="function")
+def fake_redis(monkeypatch):
+    fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(redis_client, "redis", fake)
+    return fake
+
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_local_caches():
+    for local_cache in cache_utils._local_caches.values():
+        local_cache.drop(everything=True)
+    yield
+
+
 @pytest.fixture(scope="function", autouse=True)
 def mock_password_hashing(monkeypatch):
     monkeypatch.setattr(
@@ -64,7 +104,7 @@ def client(db):
     async def bypass_rate_limiter(request: Request):
         return None
 
-    async def bypass_redis_listener(channel: str):
+    async def bypass_redis_listener(channel: str, broadcast=None):
         return None
 
     def override_get_db():
@@ -74,7 +114,12 @@ def client(db):
         finally:
             session.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     app.dependency_overrides[login_rate_limiter] = bypass_rate_limiter
     app.dependency_overrides[comment_rate_limiter] = bypass_rate_limiter
     manager.listen_to_channel = bypass_redis_listener
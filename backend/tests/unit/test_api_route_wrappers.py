@@ -1,9 +1,10 @@
+import asyncio
 from types import SimpleNamespace
 
 from app.api.v1 import auth, comments, likes, mentions, moderation, notifications, search, threads, users
 from app.schemas.auth import ChangePasswordRequest, LoginRequest, RefreshTokenRequest
 from app.schemas.comment import CommentCreate, CommentUpdate
-from app.schemas.like import LikeCreate
+from app.schemas.like import LikeCreate, LikedStateRequest, LikeToggle
 from app.schemas.moderation import ModerationCreate, ModerationUpdate, ReportCreate
 from app.schemas.thread import ThreadCreate, ThreadUpdate
 from app.schemas.user import UserRoleUpdate, UserUpdate
@@ -13,6 +14,13 @@ def _user(user_id: int = 1):
     return SimpleNamespace(id=user_id)
 
 
+def _async_return(value):
+    async def fake(*_args, **_kwargs):
+        return value
+
+    return fake
+
+
 def test_auth_routes_delegate(monkeypatch):
     monkeypatch.setattr("app.api.v1.auth.AuthService.register_user", lambda *_a, **_k: {"id": 1})
     monkeypatch.setattr("app.api.v1.auth.AuthService.login_user", lambda *_a, **_k: {"access_token": "a", "refresh_token": "r", "token_type": "bearer"})
@@ -30,46 +38,67 @@ def test_auth_routes_delegate(monkeypatch):
 
 def test_thread_comment_like_search_routes_delegate(monkeypatch):
     monkeypatch.setattr("app.api.v1.threads.ThreadService.create_thread", lambda *_a, **_k: {"id": 1})
-    monkeypatch.setattr("app.api.v1.threads.ThreadService.list_threads", lambda *_a, **_k: {"items": [], "total": 0, "page": 1, "size": 20, "pages": 1})
-    monkeypatch.setattr("app.api.v1.threads.ThreadService.get_thread", lambda *_a, **_k: {"id": 1})
+    monkeypatch.setattr("app.api.v1.threads.ThreadService.list_threads", _async_return({"items": [], "total": 0, "page": 1, "size": 20, "pages": 1}))
+    monkeypatch.setattr("app.api.v1.threads.ThreadService.get_thread", _async_return({"id": 1}))
+    monkeypatch.setattr("app.api.v1.threads.CommentService.get_thread_view", _async_return({"thread": {"id": 1}, "comment_count": 0}))
+    monkeypatch.setattr("app.api.v1.threads.ViewCountService.record_view", _async_return(None))
+    monkeypatch.setattr("app.api.v1.threads.ViewCountService.unique_viewers", _async_return(None))
     monkeypatch.setattr("app.api.v1.threads.ThreadService.update_thread", lambda *_a, **_k: {"id": 1, "title": "u"})
     monkeypatch.setattr("app.api.v1.threads.ThreadService.delete_thread", lambda *_a, **_k: None)
 
     monkeypatch.setattr("app.api.v1.comments.CommentService.create_comment", lambda *_a, **_k: {"id": 1})
-    monkeypatch.setattr("app.api.v1.comments.CommentService.list_thread_comments", lambda *_a, **_k: [{"id": 1}])
+    monkeypatch.setattr("app.api.v1.comments.CommentService.list_thread_comments", _async_return([{"id": 1}]))
+    monkeypatch.setattr("app.api.v1.comments.CommentService.list_comment_tree", _async_return({"items": [], "next_cursor": None}))
+    monkeypatch.setattr(
+        "app.api.v1.comments.CommentService.list_thread_comments_page",
+        _async_return({"items": [{"id": 4}], "next_cursor": "next"}),
+    )
+    monkeypatch.setattr("app.api.v1.comments.CommentService.list_root_comments", _async_return({"items": [{"id": 2}]}))
+    monkeypatch.setattr("app.api.v1.comments.CommentService.list_replies", _async_return({"items": [{"id": 3}]}))
     monkeypatch.setattr("app.api.v1.comments.CommentService.update_comment", lambda *_a, **_k: {"id": 1})
     monkeypatch.setattr("app.api.v1.comments.CommentService.delete_comment", lambda *_a, **_k: None)
 
     monkeypatch.setattr("app.api.v1.likes.LikeService.add_like", lambda *_a, **_k: {"id": 1})
     monkeypatch.setattr("app.api.v1.likes.LikeService.remove_like", lambda *_a, **_k: None)
+    monkeypatch.setattr("app.api.v1.likes.LikeService.set_like", lambda *_a, **_k: {"liked": False})
+    monkeypatch.setattr("app.api.v1.likes.LikeService.get_liked_state", _async_return({"liked_thread_ids": [1]}))
     monkeypatch.setattr("app.api.v1.search.SearchService.search_threads", lambda *_a, **_k: {"results": [], "total": 0})
     monkeypatch.setattr("app.api.v1.search.SearchService.search_comments", lambda *_a, **_k: {"results": [], "total": 0})
     monkeypatch.setattr("app.api.v1.mentions.MentionService.get_user_mentions", lambda *_a, **_k: {"items": [], "total": 0, "page": 1, "size": 20})
 
     actor = _user(1)
     assert threads.create_thread(ThreadCreate(title="t", description="d"), db=None, user=actor)["id"] == 1
-    assert threads.list_threads(page=1, size=20, db=None, user=actor)["total"] == 0
-    assert threads.get_thread(1, db=None, user=actor)["id"] == 1
+    assert asyncio.run(threads.list_threads(page=1, size=20, db=None, user=actor))["total"] == 0
+    assert asyncio.run(threads.get_thread(1, db=None, user=actor))["id"] == 1
+    assert asyncio.run(threads.get_thread_view(1, size=20, db=None, user=actor))["comment_count"] == 0
     assert threads.update_thread(1, ThreadUpdate(title="x"), db=None, user=actor)["title"] == "u"
     assert threads.delete_thread(1, db=None, user=actor)["message"] == "Thread deleted"
 
     assert comments.create_comment(CommentCreate(content="c", thread_id=1), db=None, user=actor)["id"] == 1
-    assert comments.list_comments(1, db=None, user=actor)[0]["id"] == 1
+    assert asyncio.run(comments.list_comments(1, SimpleNamespace(headers={}), cursor=None, db=None, user=actor))[0]["id"] == 1
+    keyset_response = SimpleNamespace(headers={})
+    assert asyncio.run(comments.list_comments(1, keyset_response, size=1, cursor="", db=None, user=actor))[0]["id"] == 4
+    assert keyset_response.headers["X-Next-Cursor"] == "next"
+    assert asyncio.run(comments.list_comment_tree(1, size=50, max_depth=None, cursor=None, db=None, user=actor))["items"] == []
+    assert asyncio.run(comments.list_root_comments(1, size=20, cursor=None, db=None, user=actor))["items"][0]["id"] == 2
+    assert asyncio.run(comments.list_replies(2, size=20, cursor=None, db=None, user=actor))["items"][0]["id"] == 3
     assert comments.update_comment(1, CommentUpdate(content="x"), db=None, user=actor)["id"] == 1
     assert comments.delete_comment(1, db=None, user=actor)["message"] == "Comment deleted"
 
     assert likes.add_like(LikeCreate(thread_id=1, comment_id=None), db=None, user=actor)["id"] == 1
     assert likes.remove_like(LikeCreate(thread_id=1, comment_id=None), db=None, user=actor)["message"] == "Like removed"
-    assert search.search_threads(q="hello", db=None)["total"] == 0
-    assert search.search_comments(q="hello", db=None)["total"] == 0
+    assert likes.set_like(LikeToggle(thread_id=1, liked=False), db=None, user=actor)["liked"] is False
+    assert asyncio.run(likes.get_liked_state(LikedStateRequest(thread_ids=[1, 2]), db=None, user=actor))["liked_thread_ids"] == [1]
+    assert search.search_threads(q="hello", db=None, user=None)["total"] == 0
+    assert search.search_comments(q="hello", db=None, user=actor)["total"] == 0
     assert mentions.list_mentions(db=None, user=actor)["total"] == 0
 
 
 def test_notification_moderation_user_routes_delegate(monkeypatch):
-    monkeypatch.setattr("app.api.v1.notifications.NotificationService.get_user_notifications", lambda *_a, **_k: {"items": [], "total": 0, "page": 1, "size": 20})
+    monkeypatch.setattr("app.api.v1.notifications.NotificationService.get_user_notifications", _async_return({"items": [], "total": 0, "page": 1, "size": 20}))
     monkeypatch.setattr("app.api.v1.notifications.NotificationService.mark_as_read", lambda *_a, **_k: {"id": 1, "is_read": True})
     monkeypatch.setattr("app.api.v1.notifications.NotificationService.mark_all_as_read", lambda *_a, **_k: 3)
-    monkeypatch.setattr("app.api.v1.notifications.NotificationService.get_unread_count", lambda *_a, **_k: 9)
+    monkeypatch.setattr("app.api.v1.notifications.NotificationService.get_unread_count", _async_return(9))
 
     monkeypatch.setattr("app.api.v1.moderation.ModerationService.create_review", lambda *_a, **_k: {"id": 1})
     monkeypatch.setattr("app.api.v1.moderation.ModerationService.list_pending_reviews", lambda *_a, **_k: [{"id": 1}])
@@ -85,10 +114,10 @@ def test_notification_moderation_user_routes_delegate(monkeypatch):
     monkeypatch.setattr("app.api.v1.users.UserService.set_user_role", lambda *_a, **_k: {"id": 1})
 
     actor = _user(1)
-    assert notifications.get_notifications(page=1, size=20, db=None, user=actor)["total"] == 0
+    assert asyncio.run(notifications.get_notifications(page=1, size=20, before="", unread_only=True, db=None, user=actor))["total"] == 0
     assert notifications.mark_notification_read(1, db=None, user=actor)["is_read"] is True
     assert notifications.mark_all_notifications_read(db=None, user=actor)["updated"] == 3
-    assert notifications.get_unread_count(db=None, user=actor)["unread_count"] == 9
+    assert asyncio.run(notifications.get_unread_count(db=None, user=actor))["unread_count"] == 9
 
     assert moderation.create_review(ModerationCreate(content_type="THREAD", thread_id=1), db=None, _=actor)["id"] == 1
     assert moderation.report_content(ReportCreate(content_type="THREAD", thread_id=1, reason="spam"), db=None, _=actor)["id"] == 1
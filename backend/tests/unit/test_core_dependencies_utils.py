@@ -1,4 +1,5 @@
 import asyncio
+import json
 from types import SimpleNamespace
 
 import pytest
@@ -14,11 +15,24 @@ from app.core.security import (
     verify_password,
 )
 from app.db import session as db_session
+from app.db.unit_of_work import after_commit, unit_of_work
 from app.dependencies import auth as auth_dep
+from app.dependencies.etag import comment_list_etag, thread_list_etag
 from app.dependencies.permissions import require_admin, require_moderator
 from app.dependencies.rate_limit import comment_rate_limiter, login_rate_limiter
 from app.integrations.redis_client import redis_client
+from app.models.user import User
+from app.repositories.user import UserRepository
 from app.schemas.mention import MentionResponse
+from app.utils import cache as cache_utils
+from app.utils.cache import CacheAside, LocalCache, run_redis_call
+from app.utils.etag import (
+    THREADS_VERSION_KEY,
+    bump_version,
+    comments_version_key,
+    etag_matches,
+    weak_etag,
+)
 from app.utils.pagination import paginate
 from app.utils.rate_limiter import RateLimiter
 
@@ -124,6 +138,9 @@ def test_get_current_user_dependency_branches(monkeypatch):
     resolved_user = auth_dep.get_current_user(credentials=credentials, db=FakeDB(user=active_user))
     assert resolved_user.id == 2
 
+    assert auth_dep.get_optional_user(credentials=None, db=FakeDB(user=active_user)) is None
+    assert auth_dep.get_optional_user(credentials=credentials, db=FakeDB(user=active_user)).id == 2
+
 
 def test_get_db_dependency_closes_session(monkeypatch):
     state = {"closed": False}
@@ -140,6 +157,47 @@ def test_get_db_dependency_closes_session(monkeypatch):
     assert state["closed"] is True
 
 
+async def test_get_current_user_async_resolves_active_user(monkeypatch):
+    credentials = SimpleNamespace(credentials="token")
+
+    class FakeAsyncDB:
+        def __init__(self, user):
+            self.user = user
+
+        async def scalar(self, _stmt):
+            return self.user
+
+    monkeypatch.setattr(auth_dep, "decode_token", lambda _token: {"sub": "2"})
+    monkeypatch.setattr(auth_dep, "is_token_type", lambda *_args, **_kwargs: True)
+    with pytest.raises(HTTPException) as no_user:
+        await auth_dep.get_current_user_async(credentials=credentials, db=FakeAsyncDB(None))
+    assert no_user.value.status_code == 401
+
+    active_user = _make_user(user_id=2, active=True)
+    resolved = await auth_dep.get_current_user_async(credentials=credentials, db=FakeAsyncDB(active_user))
+    assert resolved.id == 2
+
+
+async def test_get_async_db_dependency_closes_session(monkeypatch):
+    state = {"closed": False}
+
+    class FakeAsyncSession:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *_exc):
+            state["closed"] = True
+
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", lambda: FakeAsyncSession())
+    generator = db_session.get_async_db()
+    assert isinstance(await generator.__anext__(), FakeAsyncSession)
+    with pytest.raises(StopAsyncIteration):
+        await generator.__anext__()
+    assert state["closed"] is True
+    assert db_session.to_async_url("postgresql://u:p@db/forum").drivername == "postgresql+asyncpg"
+    assert db_session.to_async_url("sqlite:///x.db").drivername == "sqlite+aiosqlite"
+
+
 @pytest.mark.asyncio
 async def test_dependency_rate_limiters_use_request_ip(monkeypatch):
     calls = []
@@ -257,3 +315,241 @@ def test_paginate_mention_schema_and_email_service(capsys):
         updated_at="2024-01-01T00:00:00",
     )
     assert mention.mentioned_user_id == 1
+
+
+async def test_cache_aside_loads_once_and_serves_stale_while_locked(fake_redis):
+    cache = CacheAside(ttl_seconds=60, soft_ttl_seconds=30)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return {"value": len(calls)}
+
+    assert await cache.get_or_load("k", loader) == {"value": 1}
+    assert await cache.get_or_load("k", loader) == {"value": 1}
+    assert len(calls) == 1
+    assert 60 <= await fake_redis.ttl("k") <= 66
+
+    # Past the soft TTL while another worker holds the lock: stale is served.
+    envelope = json.loads(await fake_redis.get("k"))
+    envelope["fresh_until"] = 0
+    await fake_redis.set("k", json.dumps(envelope))
+    token = await cache.try_acquire("k")
+    assert await cache.try_acquire("k") is None
+    assert await cache.get_or_load("k", loader) == {"value": 1}
+    assert len(calls) == 1
+
+    # Once the lock is released the next reader refreshes the value.
+    await cache.release("k", token)
+    assert await cache.get_or_load("k", loader) == {"value": 2}
+    assert await fake_redis.exists("k:lock") == 0
+
+
+async def test_cache_aside_waits_for_rebuild_then_falls_back(fake_redis):
+    cache = CacheAside(
+        ttl_seconds=60,
+        wait_timeout_seconds=0.05,
+        poll_interval_seconds=0.01,
+    )
+
+    def value(result):
+        async def load():
+            return result
+
+        return load
+
+    await cache.try_acquire("k")
+    # Nobody fills the key within the wait window: load directly.
+    assert await cache.get_or_load("k", value("direct")) == "direct"
+
+    await cache.invalidate("k:lock")
+    await cache.invalidate()
+    assert await cache.get_or_load("k", value("cached")) == "cached"
+    assert await cache.get_or_load("k", value("unused")) == "cached"
+
+
+async def test_cache_aside_falls_back_to_loader_when_redis_down(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("redis down")
+
+    async def load():
+        return 7
+
+    monkeypatch.setattr(
+        redis_client,
+        "redis",
+        SimpleNamespace(get=broken, set=broken, eval=broken, delete=broken),
+    )
+    cache = CacheAside(ttl_seconds=60)
+
+    assert await cache.get_or_load("k", load) == 7
+    assert await cache.try_acquire("k") is None
+    await cache.release("k", "token")
+    await cache.invalidate("k")
+
+
+def test_run_redis_call_uses_private_loop_outside_worker_threads():
+    async def echo(value, suffix=""):
+        return f"{value}{suffix}"
+
+    assert run_redis_call(echo, "ok", suffix="!") == "ok!"
+
+
+def test_local_cache_lru_ttl_and_stats(monkeypatch):
+    now = {"t": 100.0}
+    monkeypatch.setattr(cache_utils.time, "monotonic", lambda: now["t"])
+    cache = LocalCache("test:lru", maxsize=2, ttl_seconds=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # "b" is least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now["t"] += 11
+    assert cache.get("a", "expired") == "expired"
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 2,
+        "evictions": 1,
+    }
+    assert cache_utils.local_cache_stats()["test:lru"]["evictions"] == 1
+
+
+def test_local_cache_invalidation_is_broadcast_and_applied(fake_redis):
+    cache = LocalCache("test:pubsub", ttl_seconds=60)
+    for key in ("user:1:a", "user:1:b", "user:10:a", "other"):
+        cache.set(key, key)
+
+    async def publish_and_read():
+        pubsub = await cache_utils.redis_client.subscribe(
+            cache_utils.RedisChannels.CACHE_INVALIDATION,
+        )
+        await asyncio.to_thread(cache.invalidate, ["other"], ["user:1:"])
+        while True:
+            msg = await pubsub.get_message(timeout=1)
+            if msg and msg["type"] == "message":
+                return json.loads(msg["data"])
+
+    message = asyncio.run(publish_and_read())
+    assert message["cache"] == "test:pubsub"
+    assert cache.stats()["size"] == 1
+    assert cache.get("user:10:a") == "user:10:a"
+
+    # Our own messages are ignored; other workers' messages are applied.
+    cache.set("other", 1)
+    cache_utils.apply_invalidation(message)
+    assert cache.get("other") == 1
+    cache_utils.apply_invalidation({**message, "origin": "peer", "everything": True})
+    assert cache.stats()["size"] == 0
+    cache_utils.apply_invalidation({"cache": "unknown"})
+
+
+@pytest.mark.asyncio
+async def test_listen_for_invalidations_applies_messages(monkeypatch):
+    cache = LocalCache("test:listener", ttl_seconds=60)
+    cache.set("k", 1)
+
+    class FakePubSub:
+        async def listen(self):
+            yield {"type": "subscribe", "data": 1}
+            yield {"type": "message", "data": "not-json"}
+            yield {
+                "type": "message",
+                "data": json.dumps({"origin": "peer", "cache": "test:listener", "keys": ["k"]}),
+            }
+
+    async def fake_subscribe(_channel):
+        return FakePubSub()
+
+    monkeypatch.setattr(cache_utils.redis_client, "subscribe", fake_subscribe)
+    await cache_utils.listen_for_invalidations()
+    assert cache.get("k") is None
+
+
+def test_weak_etag_matching():
+    etag = weak_etag("threads", 7, "12")
+    assert etag == 'W/"threads-7-12"'
+    assert etag_matches('"threads-7-12"', etag) is True
+    assert etag_matches('W/"other", W/"threads-7-12"', etag) is True
+    assert etag_matches("*", etag) is True
+    assert etag_matches('W/"threads-7-13"', etag) is False
+    assert etag_matches(None, etag) is False
+
+
+async def test_conditional_get_dependencies_answer_304(monkeypatch, fake_redis):
+    credentials = SimpleNamespace(credentials=create_access_token({"sub": "5"}))
+
+    def request(if_none_match=None):
+        headers = {"if-none-match": if_none_match} if if_none_match else {}
+        return SimpleNamespace(headers=headers)
+
+    first = SimpleNamespace(headers={})
+    etag = await thread_list_etag(request(), first, credentials)
+    assert first.headers["ETag"] == etag
+    assert etag.startswith('W/"threads-5-')
+
+    with pytest.raises(HTTPException) as not_modified:
+        await thread_list_etag(request(etag), SimpleNamespace(headers={}), credentials)
+    assert not_modified.value.status_code == 304
+    assert not_modified.value.headers == {"ETag": etag}
+
+    # Writes bump the counter from sync code; the old tag stops matching.
+    await asyncio.to_thread(bump_version, THREADS_VERSION_KEY, comments_version_key(3))
+    refreshed = SimpleNamespace(headers={})
+    assert await thread_list_etag(request(etag), refreshed, credentials) != etag
+    assert refreshed.headers["ETag"] != etag
+
+    comments_tag = await comment_list_etag(3, request(), SimpleNamespace(headers={}), credentials)
+    assert comments_tag.startswith('W/"comments-3-5-')
+
+    # Redis down: no tag, normal response.
+    monkeypatch.setattr(redis_client, "redis", SimpleNamespace())
+    untagged = SimpleNamespace(headers={})
+    assert await comment_list_etag(3, request(comments_tag), untagged, credentials) is None
+    assert untagged.headers == {}
+    await asyncio.to_thread(bump_version, THREADS_VERSION_KEY)
+
+
+def test_unit_of_work_commits_once_and_defers_side_effects(db):
+    repo = UserRepository()
+    effects = []
+    commits = []
+    real_commit = db.commit
+
+    def counting_commit():
+        commits.append(1)
+        real_commit()
+
+    db.commit = counting_commit
+
+    with unit_of_work(db) as unit:
+        repo.create(db, {"email": "one@example.com", "password_hash": "x"})
+        after_commit(db, effects.append, "first")
+        with unit_of_work(db) as nested:
+            assert nested is unit
+            repo.create(db, {"email": "two@example.com", "password_hash": "x"})
+            after_commit(db, lambda: 1 / 0)
+            after_commit(db, effects.append, "second")
+        assert effects == []
+        assert commits == []
+
+    assert commits == [1]
+    # A failing side effect is logged and does not stop the others.
+    assert effects == ["first", "second"]
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            repo.create(db, {"email": "three@example.com", "password_hash": "x"})
+            after_commit(db, effects.append, "never")
+            raise RuntimeError("abort")
+    assert effects == ["first", "second"]
+    assert db.query(User).filter(User.email == "three@example.com").first() is None
+    assert db.query(User).count() == 2
+
+    # Outside a unit of work, side effects run immediately.
+    after_commit(db, effects.append, "now")
+    assert effects[-1] == "now"
@@ -4,6 +4,8 @@ import pytest
 
 def test_health_endpoint_function():
     assert main.health() == {"status": "ok"}
+    stats = main.cache_health()
+    assert set(stats["threads:cards"]) == {"size", "maxsize", "hits", "misses", "evictions"}
 
 
 def test_startup_listener_registers_tasks(monkeypatch):
@@ -13,7 +15,7 @@ def test_startup_listener_registers_tasks(monkeypatch):
         def close(self):
             calls["closed"] += 1
 
-    async def fake_listener(channel: str):
+    async def fake_listener(channel: str, broadcast=None):
         calls["channels"].append(channel)
 
     def fake_create_task(coro):
@@ -35,9 +37,14 @@ def test_startup_listener_registers_tasks(monkeypatch):
     asyncio.run(main.start_redis_listener())
 
     assert calls["bootstrap"] == 1
-    assert calls["tasks"] == 6
+    assert calls["tasks"] == 12
     assert calls["closed"] == 1
 
+    # The notification worker runs in-process only when the queue is on.
+    monkeypatch.setattr(main.settings, "NOTIFICATION_QUEUE", True)
+    asyncio.run(main.start_redis_listener())
+    assert calls["tasks"] == 12 + 13
+
 
 @pytest.mark.asyncio
 async def test_lifespan_cancels_startup_tasks(monkeypatch):
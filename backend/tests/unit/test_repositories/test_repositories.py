@@ -4,8 +4,8 @@ from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.repositories.user import UserRepository
 from app.repositories.thread import ThreadRepository
-from app.repositories.comment import CommentRepository
-from app.repositories.like import LikeRepository
+from app.repositories.comment import AsyncCommentRepository, CommentRepository
+from app.repositories.like import AsyncLikeRepository, LikeRepository
 from app.repositories.notification import NotificationRepository
 from app.repositories.moderation import ModerationRepository
 
@@ -90,6 +90,23 @@ def test_create_comment(db):
 
     assert comment.id is not None
 
+    # Counting a reply does not look like an edit of its parent or thread.
+    db.refresh(thread)
+    edited = (thread.updated_at, comment.updated_at)
+    repo.create(
+        db,
+        {
+            "content": "Reply",
+            "thread_id": thread.id,
+            "author_id": user.id,
+            "parent_comment_id": comment.id,
+        }
+    )
+    db.refresh(thread)
+    db.refresh(comment)
+    assert (thread.comment_count, comment.reply_count) == (2, 1)
+    assert (thread.updated_at, comment.updated_at) == edited
+
 
 def test_like_thread(db):
     user = _create_user(db, "like@test.com")
@@ -103,15 +120,7 @@ def test_like_thread(db):
     )
     repo = LikeRepository()
 
-    like = repo.create(
-        db,
-        {
-            "user_id": user.id,
-            "thread_id": thread.id,
-        }
-    )
-
-    assert like.id is not None
+    assert repo.set_like(db, user.id, thread_id=thread.id) == (True, 1)
 
 
 def test_create_notification(db):
@@ -201,3 +210,79 @@ def test_unique_like(db):
             db,
             {"user_id": user.id, "thread_id": thread.id}
         )
+
+
+
+def test_set_like_is_idempotent(db):
+    user = _create_user(db, "set-like@test.com")
+    thread = ThreadRepository().create(
+        db,
+        {
+            "title": "Set Like Thread",
+            "description": "Testing upserted likes",
+            "author_id": user.id,
+        }
+    )
+    comment = CommentRepository().create(
+        db,
+        {"content": "liked", "thread_id": thread.id, "author_id": user.id}
+    )
+    repo = LikeRepository()
+    db.refresh(thread)
+    edited = (thread.updated_at, comment.updated_at)
+
+    assert repo.set_like(db, user.id, thread_id=thread.id) == (True, 1)
+    assert repo.set_like(db, user.id, thread_id=thread.id) == (False, 1)
+    assert repo.set_like(db, user.id, comment_id=comment.id) == (True, 1)
+    assert repo.set_like(db, user.id, thread_id=thread.id, liked=False) == (True, 0)
+    assert repo.set_like(db, user.id, thread_id=thread.id, liked=False) == (False, 0)
+    assert repo.get_liked_ids(db, user.id, [thread.id], [comment.id]) == (set(), {comment.id})
+    assert repo.get_liked_ids(db, user.id, [], []) == (set(), set())
+    assert repo.set_like(db, user.id, thread_id=thread.id + 100, liked=False) is None
+    repo.sync_like_counts(db, [thread.id], [comment.id])
+    # Counter updates are not edits.
+    db.refresh(thread)
+    db.refresh(comment)
+    assert (thread.updated_at, comment.updated_at) == edited
+
+async def test_like_and_comment_counters_follow_writes(db, async_db):
+    user = _create_user(db, "counters@test.com")
+    thread = ThreadRepository().create(
+        db,
+        {
+            "title": "Counter Thread",
+            "description": "Testing counters",
+            "author_id": user.id,
+        }
+    )
+    comment_repo = CommentRepository()
+    like_repo = LikeRepository()
+
+    comment = comment_repo.create(
+        db,
+        {"content": "first", "thread_id": thread.id, "author_id": user.id}
+    )
+    like_repo.set_like(db, user.id, thread_id=thread.id)
+    like_repo.set_like(db, user.id, comment_id=comment.id)
+    db.refresh(thread)
+    db.refresh(comment)
+
+    assert thread.comment_count == 1
+    assert thread.like_count == 1
+    assert comment.like_count == 1
+    async_like_repo = AsyncLikeRepository()
+    assert await async_like_repo.get_liked_ids(
+        async_db, user.id, [thread.id, thread.id + 1], [comment.id]
+    ) == ({thread.id}, {comment.id})
+    assert await async_like_repo.get_liked_ids(async_db, user.id, [thread.id + 1], []) == (set(), set())
+    assert await async_like_repo.get_liked_ids(async_db, user.id, [], []) == (set(), set())
+    comments = await AsyncCommentRepository().get_thread_comments(async_db, thread.id)
+    assert [item.id for item in comments] == [comment.id]
+
+    like_repo.set_like(db, user.id, thread_id=thread.id, liked=False)
+    comment_repo.soft_delete(db, comment)
+    comment_repo.soft_delete(db, comment)
+    db.refresh(thread)
+
+    assert thread.like_count == 0
+    assert thread.comment_count == 0
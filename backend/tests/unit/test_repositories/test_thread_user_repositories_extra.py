@@ -1,10 +1,12 @@
+from datetime import datetime, timedelta, timezone
+
 from app.core.constants import Roles
 from app.models.role import Role
 from app.models.tag import Tag
 from app.repositories.comment import CommentRepository
 from app.repositories.like import LikeRepository
 from app.repositories.role import RoleRepository
-from app.repositories.thread import ThreadRepository
+from app.repositories.thread import AsyncThreadRepository, ThreadRepository
 from app.repositories.user import UserRepository
 
 
@@ -23,7 +25,7 @@ def _create_user_with_name(db, email: str, name: str):
     )
 
 
-def test_thread_repository_custom_queries(db):
+async def test_thread_repository_custom_queries(db, async_db):
     user = _create_user_with_name(db, "thread-extra@example.com", "Threader")
     repo = ThreadRepository()
     tag = Tag(name="architecture")
@@ -43,13 +45,60 @@ def test_thread_repository_custom_queries(db):
         {"title": "To delete", "description": "Deleted thread", "author_id": user.id},
     )
 
+    async_repo = AsyncThreadRepository()
     assert repo.get_by_id(db, t1.id).id == t1.id
-    assert repo.count_active_threads(db) >= 2
-    assert len(repo.get_active_threads(db)) >= 2
+    assert (await async_repo.get_by_id(async_db, t1.id)).tags[0].name == "architecture"
+    assert await async_repo.count_active_threads(async_db) >= 2
+    assert len(await async_repo.get_active_threads(async_db)) >= 2
     assert any(thread.id == t1.id for thread in repo.search_threads(db, "architecture"))
 
+    keys = await async_repo.get_active_thread_keys(async_db)
+    assert [thread_id for thread_id, _ in keys] == [t2.id, t1.id]
+    assert await async_repo.get_active_thread_keys(async_db, since=keys[0][1]) == keys[:1]
+    offset_page = await async_repo.get_active_threads(async_db, offset=1, limit=1)
+    assert [thread.id for thread in offset_page] == [t1.id]
+    assert await async_repo.get_by_ids(async_db, []) == []
+
     repo.soft_delete(db, t2)
     assert repo.get_by_id(db, t2.id).is_deleted is True
+    by_ids = await async_repo.get_by_ids(async_db, [t1.id, t2.id])
+    assert [thread.id for thread in by_ids] == [t1.id]
+
+
+async def test_thread_repository_keyset_page(db, async_db):
+    user = _create_user_with_name(db, "keyset@example.com", "Keyset")
+    repo = ThreadRepository()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    created = [
+        repo.create(
+            db,
+            {
+                "title": f"Thread {index}",
+                "description": "Keyset",
+                "author_id": user.id,
+                "created_at": base + timedelta(minutes=index // 2),
+            },
+        )
+        for index in range(5)
+    ]
+
+    async_repo = AsyncThreadRepository()
+    first = await async_repo.get_active_threads_page(async_db, limit=2)
+    assert [thread.id for thread in first] == [created[4].id, created[3].id]
+
+    second = await async_repo.get_active_threads_page(
+        async_db,
+        limit=2,
+        before=(first[-1].created_at, first[-1].id),
+    )
+    assert [thread.id for thread in second] == [created[2].id, created[1].id]
+
+    last = await async_repo.get_active_threads_page(
+        async_db,
+        limit=2,
+        before=(second[-1].created_at, second[-1].id),
+    )
+    assert [thread.id for thread in last] == [created[0].id]
 
 
 def test_user_repository_extended_queries(db):
@@ -84,8 +133,8 @@ def test_user_repository_extended_queries(db):
         db,
         {"content": "nice", "thread_id": thread.id, "author_id": admin.id},
     )
-    like_repo.create(db, {"user_id": admin.id, "thread_id": thread.id})
-    like_repo.create(db, {"user_id": member.id, "comment_id": comment.id})
+    like_repo.set_like(db, admin.id, thread_id=thread.id)
+    like_repo.set_like(db, member.id, comment_id=comment.id)
 
     users_page, total = user_repo.list_users(db, page=1, size=10, q="repo")
     assert total >= 2
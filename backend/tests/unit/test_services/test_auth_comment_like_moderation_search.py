@@ -1,19 +1,50 @@
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
+from app.repositories.comment import AsyncCommentRepository, CommentRepository
+from app.repositories.like import LikeRepository
+from app.repositories.thread import ThreadRepository
+from app.repositories.user import UserRepository
 from app.schemas.auth import RefreshTokenRequest
 from app.schemas.comment import CommentCreate, CommentUpdate
-from app.schemas.like import LikeCreate
+from app.schemas.like import LikeCreate, LikeToggle
 from app.schemas.moderation import ModerationCreate, ModerationUpdate
 from app.schemas.thread import ThreadCreate
 from app.schemas.user import UserCreate
 from app.services.auth_service import AuthService
 from app.services.comment_service import CommentService
 from app.services.like_service import LikeService
+from app.services.like_state_service import LikeStateService
 from app.services.moderation_service import ModerationService
+from app.services.outbox_service import OutboxService
 from app.services.search_service import SearchService
+from app.services.thread_service import ThreadService
+from app.utils.etag import comments_version_key
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+class _FakeSession:
+    """Just enough Session for code running inside a unit of work."""
+
+    def __init__(self):
+        self.info = {}
+        self.commits = 0
+        self.rollbacks = 0
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
 
 
 def _user(user_id: int, role_names: list[str] | None = None, active: bool = True):
@@ -22,8 +53,14 @@ def _user(user_id: int, role_names: list[str] | None = None, active: bool = True
         email=f"user{user_id}@example.com",
         name=f"User {user_id}",
         password_hash="hashed::pw",
+        avatar_url=None,
+        bio=None,
+        created_at=None,
         is_active=active,
-        roles=[SimpleNamespace(role_name=role) for role in (role_names or [])],
+        roles=[
+            SimpleNamespace(id=index, role_name=role)
+            for index, role in enumerate(role_names or [], start=1)
+        ],
     )
 
 
@@ -70,7 +107,7 @@ def test_auth_service_register_login_change_password_and_refresh(monkeypatch):
 
     monkeypatch.setattr(AuthService, "user_repo", FakeUserRepo())
     monkeypatch.setattr(AuthService, "role_repo", FakeRoleRepo())
-    monkeypatch.setattr("app.services.auth_service.from_thread.run", lambda *_a, **_k: None)
+    monkeypatch.setattr(OutboxService, "publish", lambda *_a, **_k: None)
     monkeypatch.setattr("app.services.auth_service.create_access_token", lambda data: f"access:{data['sub']}")
     monkeypatch.setattr("app.services.auth_service.create_refresh_token", lambda data: f"refresh:{data['sub']}")
     monkeypatch.setattr("app.services.auth_service.decode_token", lambda token: {"sub": token.split(":")[-1], "typ": "refresh"})
@@ -81,7 +118,7 @@ def test_auth_service_register_login_change_password_and_refresh(monkeypatch):
     with pytest.raises(HTTPException):
         AuthService.register_user(None, UserCreate(email="exists@example.com", password="pw"))
 
-    created = AuthService.register_user(None, UserCreate(email="new@example.com", password="pw"))
+    created = AuthService.register_user(_FakeSession(), UserCreate(email="new@example.com", password="pw"))
     assert created.id == 10
     assert state["created"][0]["email"] == "new@example.com"
 
@@ -138,7 +175,9 @@ def test_comment_service_branches(monkeypatch):
         author_id=1,
         author=SimpleNamespace(id=1, name="Actor", email="actor@example.com", avatar_url=None),
         parent_comment_id=5,
-        likes=[],
+        depth=1,
+        reply_count=0,
+        like_count=0,
         is_deleted=False,
     )
     mutable = {"comment": created_comment}
@@ -149,15 +188,13 @@ def test_comment_service_branches(monkeypatch):
                 return parent
             return mutable["comment"] if mutable["comment"] and mutable["comment"].id == comment_id else None
 
-        def create(self, _db, data):
+        def create(self, _db, data, parent=None):
+            assert parent is None or parent.id == data["parent_comment_id"]
             mutable["comment"].thread_id = data["thread_id"]
             mutable["comment"].author_id = data["author_id"]
             mutable["comment"].parent_comment_id = data.get("parent_comment_id")
             return mutable["comment"]
 
-        def get_thread_comments(self, _db, _thread_id, page=1, size=100):
-            return [mutable["comment"]]
-
         def update(self, _db, comment, payload):
             comment.content = payload["content"]
             return comment
@@ -168,14 +205,30 @@ def test_comment_service_branches(monkeypatch):
     monkeypatch.setattr(CommentService, "repo", Repo())
     monkeypatch.setattr(CommentService, "thread_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: thread))
     monkeypatch.setattr(CommentService, "user_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: _user(1, ["MEMBER"])))
+    monkeypatch.setattr(
+        LikeStateService,
+        "repo",
+        SimpleNamespace(get_liked_ids=lambda *_a, **_k: (set(), set())),
+    )
+
+    class AsyncRepo:
+        async def get_thread_comments(self, _db, _thread_id, page=1, size=100):
+            return [mutable["comment"]]
+
+    class AsyncLikeRepo:
+        async def get_liked_ids(self, _db, _user_id, thread_ids, comment_ids):
+            return set(), set(comment_ids)
+
+    monkeypatch.setattr(CommentService, "async_repo", AsyncRepo())
+    monkeypatch.setattr(LikeStateService, "async_repo", AsyncLikeRepo())
     monkeypatch.setattr("app.services.comment_service.ModerationService.create_review", lambda *_a, **_k: None)
     monkeypatch.setattr("app.services.comment_service.MentionService.process_mentions", lambda *_a, **_k: [_user(1), _user(4)])
     monkeypatch.setattr("app.services.comment_service.NotificationService.create_notification", lambda *_a, **_k: None)
-    monkeypatch.setattr("app.services.comment_service.from_thread.run", lambda *_a, **_k: None)
+    monkeypatch.setattr(OutboxService, "publish", lambda *_a, **_k: None)
 
     monkeypatch.setattr(CommentService, "thread_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: None))
     with pytest.raises(HTTPException):
-        CommentService.create_comment(None, CommentCreate(content="x", thread_id=77), 1)
+        CommentService.create_comment(_FakeSession(), CommentCreate(content="x", thread_id=77), 1)
     monkeypatch.setattr(CommentService, "thread_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: thread))
 
     bad_parent = SimpleNamespace(id=7, is_deleted=False, thread_id=99, author_id=3)
@@ -184,19 +237,41 @@ def test_comment_service_branches(monkeypatch):
         create=lambda *_a, **_k: created_comment,
     ))
     with pytest.raises(HTTPException):
-        CommentService.create_comment(None, CommentCreate(content="x", thread_id=9, parent_comment_id=7), 1)
+        CommentService.create_comment(_FakeSession(), CommentCreate(content="x", thread_id=9, parent_comment_id=7), 1)
 
     repo = Repo()
     monkeypatch.setattr(CommentService, "repo", repo)
+    session = _FakeSession()
+    events = []
+    monkeypatch.setattr(
+        OutboxService,
+        "publish",
+        lambda db, channel, message: events.append((db, channel, message)),
+    )
     created = CommentService.create_comment(
-        None,
+        session,
         CommentCreate(content="hello @alice", thread_id=9, parent_comment_id=5),
         1,
     )
     assert created["id"] == 11
-
-    listed = CommentService.list_thread_comments(None, 9, 1)
+    # One commit for the whole write, with its event in the same transaction.
+    assert session.commits == 1
+    assert events == [
+        (
+            session,
+            "comments_channel",
+            {
+                "event": "NEW_COMMENT",
+                "data": {"comment_id": 11, "thread_id": 9, "content": "hello @alice"},
+            },
+        ),
+    ]
+
+    listed = asyncio.run(CommentService.list_thread_comments(None, 9, 1))
     assert listed[0]["id"] == 11
+    assert listed[0]["user_has_liked"] is False
+    viewer_listed = asyncio.run(CommentService.list_thread_comments(None, 9, 1, user_id=1))
+    assert viewer_listed[0]["user_has_liked"] is True
 
     updated = CommentService.update_comment(None, 11, CommentUpdate(content="edited"), 1, _user(1, ["MEMBER"]))
     assert updated["content"] == "edited"
@@ -217,32 +292,34 @@ def test_comment_service_branches(monkeypatch):
 
 
 def test_like_moderation_and_search_services(monkeypatch):
-    like = SimpleNamespace(id=1, thread_id=3, comment_id=None)
     thread = SimpleNamespace(id=3, author_id=2)
-    comment = SimpleNamespace(id=4, author_id=2)
-    review = SimpleNamespace(id=22, status="PENDING")
+    comment = SimpleNamespace(id=4, author_id=2, thread_id=3)
+    review = SimpleNamespace(
+        id=22,
+        content_type="THREAD",
+        thread_id=3,
+        comment_id=None,
+        reason=None,
+        reviewer_id=None,
+        status="PENDING",
+        action_taken=None,
+        created_at=None,
+        updated_at=None,
+    )
 
     class LikeRepo:
         def __init__(self):
-            self.existing = None
-            self.removed = False
-
-        def get_user_like(self, *_a, **_k):
-            return self.existing
-
-        def create(self, _db, _data):
-            self.existing = like
-            return like
-
-        def count_thread_likes(self, *_a, **_k):
-            return 10
-
-        def count_comment_likes(self, *_a, **_k):
-            return 7
+            self.likers = set()
 
-        def remove_like(self, _db, _like):
-            self.removed = True
-            self.existing = None
+        def set_like(self, _db, user_id, thread_id=None, comment_id=None, liked=True):
+            if thread_id == 404:
+                return None
+            changed = (user_id in self.likers) != liked
+            if liked:
+                self.likers.add(user_id)
+            else:
+                self.likers.discard(user_id)
+            return changed, len(self.likers)
 
     like_repo = LikeRepo()
     monkeypatch.setattr(LikeService, "repo", like_repo)
@@ -250,20 +327,39 @@ def test_like_moderation_and_search_services(monkeypatch):
     monkeypatch.setattr(LikeService, "comment_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: comment))
     monkeypatch.setattr(LikeService, "user_repo", SimpleNamespace(get_by_id=lambda *_a, **_k: _user(1)))
     monkeypatch.setattr("app.services.like_service.NotificationService.create_notification", lambda *_a, **_k: None)
-    monkeypatch.setattr("app.services.like_service.from_thread.run", lambda *_a, **_k: None)
+    events = []
+    monkeypatch.setattr(
+        OutboxService,
+        "publish",
+        lambda _db, channel, message: events.append((channel, message["data"])),
+    )
 
     with pytest.raises(HTTPException):
         LikeService.add_like(None, LikeCreate(thread_id=None, comment_id=None), 1)
 
-    created_like = LikeService.add_like(None, LikeCreate(thread_id=3, comment_id=None), 1)
-    assert created_like.id == 1
-    with pytest.raises(HTTPException):
-        LikeService.add_like(None, LikeCreate(thread_id=3, comment_id=None), 1)
-
-    LikeService.remove_like(None, LikeCreate(thread_id=3, comment_id=None), 1)
-    assert like_repo.removed is True
-    with pytest.raises(HTTPException):
-        LikeService.remove_like(None, LikeCreate(thread_id=3, comment_id=None), 1)
+    session = _FakeSession()
+    created_like = LikeService.add_like(session, LikeCreate(thread_id=3, comment_id=None), 1)
+    assert created_like == {"thread_id": 3, "comment_id": None, "liked": True, "like_count": 1}
+    with pytest.raises(HTTPException) as exc:
+        LikeService.add_like(session, LikeCreate(thread_id=3, comment_id=None), 1)
+    assert exc.value.status_code == 400
+
+    LikeService.remove_like(session, LikeCreate(thread_id=3, comment_id=None), 1)
+    assert like_repo.likers == set()
+    assert [data["action"] for _channel, data in events] == ["created", "removed"]
+    assert {channel for channel, _data in events} == {"likes_channel"}
+    with pytest.raises(HTTPException) as exc:
+        LikeService.remove_like(_FakeSession(), LikeCreate(thread_id=3, comment_id=None), 1)
+    assert exc.value.status_code == 404
+    with pytest.raises(HTTPException) as exc:
+        LikeService.add_like(_FakeSession(), LikeCreate(thread_id=404, comment_id=None), 1)
+    assert exc.value.detail == "Target not found"
+
+    # The toggle is idempotent: repeats answer with the state, no event.
+    for _ in range(2):
+        state = LikeService.set_like(_FakeSession(), LikeToggle(comment_id=4, liked=True), 1)
+        assert state == {"thread_id": None, "comment_id": 4, "liked": True, "like_count": 1}
+    assert [data["action"] for _channel, data in events] == ["created", "removed", "created"]
 
     class ModRepo:
         def create(self, _db, _data):
@@ -283,13 +379,12 @@ def test_like_moderation_and_search_services(monkeypatch):
             return review
 
     monkeypatch.setattr(ModerationService, "repo", ModRepo())
-    monkeypatch.setattr("app.services.moderation_service.from_thread.run", lambda *_a, **_k: None)
 
-    created_review = ModerationService.create_review(None, ModerationCreate(content_type="THREAD", thread_id=3))
+    created_review = ModerationService.create_review(_FakeSession(), ModerationCreate(content_type="THREAD", thread_id=3))
     assert created_review.id == 22
     assert ModerationService.list_pending_reviews(None)[0].id == 22
     assert ModerationService.list_completed_reviews(None)[0].id == 22
-    updated_review = ModerationService.update_review(None, 22, ModerationUpdate(status="COMPLETED"), reviewer_id=1)
+    updated_review = ModerationService.update_review(_FakeSession(), 22, ModerationUpdate(status="COMPLETED"), reviewer_id=1)
     assert updated_review.status == "COMPLETED"
     with pytest.raises(HTTPException):
         ModerationService.update_review(None, 999, ModerationUpdate(status="COMPLETED"), reviewer_id=1)
@@ -297,3 +392,317 @@ def test_like_moderation_and_search_services(monkeypatch):
     monkeypatch.setattr(SearchService, "repo", SimpleNamespace(search_threads=lambda *_a, **_k: [SimpleNamespace(id=1)]))
     assert SearchService.search_threads(None, "") == {"results": [], "total": 0}
     assert SearchService.search_threads(None, "abc")["total"] == 1
+
+    # Signed-in viewers get their liked state from one batch lookup.
+    lookups = []
+
+    def get_liked_ids(_db, user_id, thread_ids, comment_ids):
+        lookups.append((user_id, thread_ids, comment_ids))
+        return {1}, {5}
+
+    monkeypatch.setattr(LikeStateService, "repo", SimpleNamespace(get_liked_ids=get_liked_ids))
+    assert SearchService.search_threads(None, "abc", user_id=9)["results"][0]["user_has_liked"] is True
+    found = [
+        SimpleNamespace(
+            id=comment_id,
+            created_at=None,
+            updated_at=None,
+            content="abc",
+            thread_id=3,
+            author_id=2,
+            author=None,
+            parent_comment_id=None,
+            like_count=1,
+            is_deleted=False,
+        )
+        for comment_id in (5, 6)
+    ]
+    monkeypatch.setattr(SearchService, "comment_repo", SimpleNamespace(search_comments=lambda *_a, **_k: found))
+    results = SearchService.search_comments(None, "abc", user_id=9)["results"]
+    assert [item["user_has_liked"] for item in results] == [True, False]
+    assert lookups == [(9, [1], []), (9, [], [5, 6])]
+
+
+async def test_thread_view_uses_fixed_query_count(db, async_db):
+    author = UserRepository().create(db, {"email": "view@example.com", "password_hash": "hashed"})
+    thread = ThreadRepository().create(
+        db,
+        {"title": "View", "description": "Thread view", "author_id": author.id},
+    )
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    comments = [
+        CommentRepository().create(
+            db,
+            {
+                "content": f"comment {index}",
+                "thread_id": thread.id,
+                "author_id": author.id,
+                "created_at": started + timedelta(minutes=index),
+            },
+        )
+        for index in range(5)
+    ]
+    LikeRepository().set_like(db, author.id, thread_id=thread.id)
+    LikeRepository().set_like(db, author.id, comment_id=comments[1].id)
+
+    statements = []
+
+    def count(*_args):
+        statements.append(1)
+
+    sync_engine = async_db.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        view = await CommentService.get_thread_view(async_db, thread.id, user_id=author.id, size=3)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    # thread (+author, +tags), comment page (+authors), viewer likes
+    assert len(statements) == 6
+    assert view["thread"]["user_has_liked"] is True
+    assert view["comment_count"] == 5
+    assert [item["id"] for item in view["comments"]] == [comment.id for comment in comments[:3]]
+    assert [item["user_has_liked"] for item in view["comments"]] == [False, True, False]
+    assert view["next_cursor"] is not None
+
+    rest = await AsyncCommentRepository().get_thread_comments_page(
+        async_db,
+        thread.id,
+        limit=10,
+        after=decode_cursor(view["next_cursor"]),
+    )
+    assert [comment.id for comment in rest] == [comment.id for comment in comments[3:]]
+
+    anonymous = await CommentService.get_thread_view(async_db, thread.id, size=10)
+    assert anonymous["next_cursor"] is None
+    assert anonymous["thread"]["user_has_liked"] is False
+
+    with pytest.raises(HTTPException) as missing:
+        await CommentService.get_thread_view(async_db, thread.id + 100)
+    assert missing.value.status_code == 404
+
+
+async def test_comment_tree_pages_follow_materialized_paths(db, async_db):
+    author = UserRepository().create(db, {"email": "tree@example.com", "password_hash": "hashed"})
+    thread = ThreadRepository().create(
+        db,
+        {"title": "Tree", "description": "Nested replies", "author_id": author.id},
+    )
+    repo = CommentRepository()
+
+    def comment(content, parent=None):
+        return repo.create(
+            db,
+            {
+                "content": content,
+                "thread_id": thread.id,
+                "author_id": author.id,
+                "parent_comment_id": parent.id if parent else None,
+            },
+            parent=parent,
+        )
+
+    root_a = comment("a")
+    root_b = comment("b")
+    reply_a1 = comment("a1", root_a)
+    # The parent is loaded by the repository when not passed in.
+    reply_a1a = repo.create(
+        db,
+        {"content": "a1a", "thread_id": thread.id, "author_id": author.id, "parent_comment_id": reply_a1.id},
+    )
+    reply_a2 = comment("a2", root_a)
+    db.refresh(root_a)
+    db.refresh(reply_a1)
+
+    assert reply_a1a.path == ".".join(str(item.id).zfill(10) for item in (root_a, reply_a1, reply_a1a))
+    assert (root_a.depth, reply_a1.depth, reply_a1a.depth) == (0, 1, 2)
+    assert (root_a.reply_count, reply_a1.reply_count) == (2, 1)
+
+    tree = await CommentService.list_comment_tree(async_db, thread.id, size=10)
+    assert [item["content"] for item in tree["items"]] == ["a", "a1", "a1a", "a2", "b"]
+    assert [item["depth"] for item in tree["items"]] == [0, 1, 2, 1, 0]
+    assert tree["next_cursor"] is None
+
+    shallow = await CommentService.list_comment_tree(async_db, thread.id, size=2, max_depth=1, user_id=author.id)
+    assert [item["content"] for item in shallow["items"]] == ["a", "a1"]
+    rest = await CommentService.list_comment_tree(
+        async_db,
+        thread.id,
+        size=2,
+        max_depth=1,
+        cursor=shallow["next_cursor"],
+    )
+    assert [item["id"] for item in rest["items"]] == [reply_a2.id, root_b.id]
+
+    # A deleted reply is still listed, so it still counts.
+    repo.soft_delete(db, reply_a2)
+    db.refresh(root_a)
+    replies = await CommentService.list_replies(async_db, root_a.id, size=10)
+    assert root_a.reply_count == len(replies["items"]) == 2
+    assert replies["items"][-1]["is_deleted"] is True
+
+    with pytest.raises(HTTPException) as invalid:
+        await CommentService.list_comment_tree(async_db, thread.id, cursor="1;drop")
+    assert invalid.value.status_code == 400
+
+
+async def test_root_and_reply_pages_use_keyset_cursors(db, async_db):
+    author = UserRepository().create(db, {"email": "lazy@example.com", "password_hash": "hashed"})
+    thread = ThreadRepository().create(
+        db,
+        {"title": "Lazy", "description": "Load more replies", "author_id": author.id},
+    )
+    repo = CommentRepository()
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def comment(minute, parent=None):
+        return repo.create(
+            db,
+            {
+                "content": f"at {minute}",
+                "thread_id": thread.id,
+                "author_id": author.id,
+                "parent_comment_id": parent.id if parent else None,
+                "created_at": started + timedelta(minutes=minute),
+            },
+            parent=parent,
+        )
+
+    roots = [comment(0), comment(1), comment(2)]
+    replies = [comment(minute, roots[0]) for minute in (3, 4, 5)]
+    LikeRepository().set_like(db, author.id, comment_id=replies[1].id)
+
+    first = await CommentService.list_root_comments(async_db, thread.id, size=2)
+    assert [item["id"] for item in first["items"]] == [roots[0].id, roots[1].id]
+    assert first["items"][0]["reply_count"] == 3
+    second = await CommentService.list_root_comments(async_db, thread.id, size=2, cursor=first["next_cursor"])
+    assert [item["id"] for item in second["items"]] == [roots[2].id]
+    assert second["next_cursor"] is None
+
+    page = await CommentService.list_replies(async_db, roots[0].id, size=2, user_id=author.id)
+    assert [item["id"] for item in page["items"]] == [replies[0].id, replies[1].id]
+    assert [item["user_has_liked"] for item in page["items"]] == [False, True]
+    rest = await CommentService.list_replies(async_db, roots[0].id, size=2, cursor=page["next_cursor"])
+    assert [item["id"] for item in rest["items"]] == [replies[2].id]
+
+    flat = await CommentService.list_thread_comments_page(async_db, thread.id, size=4, cursor="")
+    assert [item["id"] for item in flat["items"]] == [*(root.id for root in roots), replies[0].id]
+    tail = await CommentService.list_thread_comments_page(async_db, thread.id, size=4, cursor=flat["next_cursor"])
+    assert [item["id"] for item in tail["items"]] == [replies[1].id, replies[2].id]
+    assert tail["next_cursor"] is None
+
+    with pytest.raises(HTTPException) as missing:
+        await CommentService.list_replies(async_db, replies[-1].id + 100)
+    assert missing.value.status_code == 404
+    with pytest.raises(HTTPException) as invalid:
+        await CommentService.list_root_comments(async_db, thread.id, cursor="not-a-cursor")
+    assert invalid.value.status_code == 400
+
+
+async def test_comment_keyset_pages_across_timestamp_ties(db, async_db, fake_redis):
+    author = UserRepository().create(db, {"email": "ties@example.com", "password_hash": "hashed"})
+    thread = ThreadRepository().create(
+        db,
+        {"title": "Ties", "description": "Same-second comments", "author_id": author.id},
+    )
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Bursts of comments share a created_at; the id breaks the tie.
+    comments = [
+        CommentRepository().create(
+            db,
+            {
+                "content": f"burst {minute}",
+                "thread_id": thread.id,
+                "author_id": author.id,
+                "created_at": started + timedelta(minutes=minute),
+            },
+        )
+        for minute in (0, 0, 0, 1, 1, 2, 2)
+    ]
+    expected = [comment.id for comment in sorted(comments, key=lambda c: (c.created_at, c.id))]
+
+    for list_page in (CommentService.list_thread_comments_page, CommentService.list_root_comments):
+        page = await list_page(async_db, thread.id, size=2)
+        seen = [item["id"] for item in page["items"]]
+        while page["next_cursor"] is not None:
+            page = await list_page(async_db, thread.id, size=2, cursor=page["next_cursor"])
+            seen += [item["id"] for item in page["items"]]
+        assert seen == expected
+
+    first = await CommentService.list_thread_comments_page(async_db, thread.id, size=2, cursor="")
+    tampered = [
+        "not-a-cursor",
+        first["next_cursor"][:-3],
+        first["next_cursor"][::-1],
+        base64.urlsafe_b64encode(b'["yesterday",1]').decode(),
+        base64.urlsafe_b64encode(b'["2026-01-01T00:00:00+00:00","x"]').decode(),
+        base64.urlsafe_b64encode(b'{"id":1}').decode(),
+    ]
+    for cursor in tampered:
+        with pytest.raises(HTTPException) as invalid:
+            await CommentService.list_thread_comments_page(async_db, thread.id, size=2, cursor=cursor)
+        assert invalid.value.status_code == 400, cursor
+
+    # Keyset order is created_at only; other sorts cannot take a cursor.
+    with pytest.raises(HTTPException) as mixed:
+        await ThreadService.list_threads(
+            async_db,
+            size=2,
+            cursor=encode_cursor(started, thread.id),
+            sort="trending",
+        )
+    assert mixed.value.status_code == 400
+
+
+async def test_comment_pages_are_cached_per_thread_version(monkeypatch, fake_redis):
+    comments = [
+        SimpleNamespace(
+            id=comment_id,
+            created_at=datetime(2026, 1, 1, minute=comment_id, tzinfo=timezone.utc),
+            updated_at=None,
+            content=f"comment {comment_id}",
+            thread_id=9,
+            author_id=1,
+            author=None,
+            parent_comment_id=None,
+            depth=0,
+            reply_count=0,
+            like_count=0,
+            is_deleted=False,
+        )
+        for comment_id in (1, 2, 3)
+    ]
+    loads = []
+
+    class AsyncRepo:
+        async def get_thread_comments(self, _db, thread_id, page=1, size=100):
+            loads.append(("offset", thread_id))
+            return comments[:size]
+
+        async def get_thread_comments_page(self, _db, thread_id, limit, after=None):
+            loads.append(("flat", thread_id))
+            return comments[:limit]
+
+    class AsyncLikeRepo:
+        async def get_liked_ids(self, _db, _user_id, thread_ids, comment_ids):
+            return set(), {2} & set(comment_ids)
+
+    monkeypatch.setattr(CommentService, "async_repo", AsyncRepo())
+    monkeypatch.setattr(LikeStateService, "async_repo", AsyncLikeRepo())
+
+    first = await CommentService.list_thread_comments_page(None, 9, size=2, cursor="", user_id=7)
+    again = await CommentService.list_thread_comments_page(None, 9, size=2, cursor="")
+    assert first["next_cursor"] == again["next_cursor"] is not None
+    assert [item["user_has_liked"] for item in first["items"]] == [False, True]
+    assert [item["user_has_liked"] for item in again["items"]] == [False, False]
+    listed = await CommentService.list_thread_comments(None, 9, size=3, user_id=7)
+    assert [item["id"] for item in listed] == [1, 2, 3]
+    await CommentService.list_thread_comments(None, 9, size=3)
+    assert loads == [("flat", 9), ("offset", 9)]
+
+    # A write to this thread retires its pages; other threads keep theirs.
+    await fake_redis.incr(comments_version_key(9))
+    await CommentService.list_thread_comments_page(None, 9, size=2, cursor="")
+    await CommentService.list_thread_comments(None, 10, size=3)
+    await CommentService.list_thread_comments(None, 10, size=3)
+    assert loads[2:] == [("flat", 9), ("offset", 10)]
@@ -0,0 +1,195 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.like import Like
+from app.models.notification import Notification
+from app.models.outbox import OutboxEvent
+from app.repositories.comment import CommentRepository
+from app.repositories.like import LikeRepository
+from app.repositories.thread import ThreadRepository
+from app.repositories.user import UserRepository
+from app.schemas.like import LikeCreate
+from app.services.comment_service import CommentService
+from app.services.like_buffer_service import LikeBufferService
+from app.services.like_service import LikeService
+from app.services.like_state_service import LikeStateService
+from app.services.thread_service import ThreadService
+
+
+@pytest.fixture
+def write_behind(db, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "LIKE_WRITE_BEHIND", True)
+    # The flusher opens its own session on the test database.
+    monkeypatch.setattr(
+        "app.services.like_service.SessionLocal",
+        sessionmaker(bind=db.get_bind(), autoflush=False),
+    )
+    users = UserRepository()
+    owner = users.create(db, {"email": "owner@example.com", "password_hash": "x"})
+    fan = users.create(db, {"email": "fan@example.com", "password_hash": "x", "name": "Fan"})
+    thread = ThreadRepository().create(
+        db,
+        {"title": "Hot", "description": "viral", "author_id": owner.id},
+    )
+    comment = CommentRepository().create(
+        db,
+        {"content": "reply", "thread_id": thread.id, "author_id": owner.id},
+    )
+    LikeRepository().set_like(db, owner.id, thread_id=thread.id)
+    return owner, fan, thread, comment
+
+
+def _likes(db, **filters):
+    db.expire_all()
+    return db.query(Like).filter_by(**filters).count()
+
+
+def test_buffered_likes_answer_from_redis_and_flush_in_bulk(db, write_behind):
+    owner, fan, thread, comment = write_behind
+
+    state = LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    assert state == {
+        "thread_id": thread.id,
+        "comment_id": None,
+        "liked": True,
+        "like_count": 2,
+    }
+    with pytest.raises(HTTPException) as duplicate:
+        LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    assert duplicate.value.status_code == 400
+
+    # Liked then unliked inside one window: only the last change is kept.
+    LikeService.add_like(db, LikeCreate(comment_id=comment.id), fan.id)
+    LikeService.remove_like(db, LikeCreate(comment_id=comment.id), fan.id)
+    with pytest.raises(HTTPException) as missing:
+        LikeService.remove_like(db, LikeCreate(comment_id=comment.id), fan.id)
+    assert missing.value.status_code == 404
+
+    # Nothing reached the database yet.
+    assert _likes(db, user_id=fan.id) == 0
+
+    assert asyncio.run(LikeService.flush_buffered()) == 2
+    assert _likes(db, user_id=fan.id, thread_id=thread.id) == 1
+    assert _likes(db, user_id=fan.id, comment_id=comment.id) == 0
+    db.refresh(thread)
+    db.refresh(comment)
+    assert (thread.like_count, comment.like_count) == (2, 0)
+    notification = db.query(Notification).one()
+    assert (notification.user_id, notification.message) == (owner.id, "Fan liked your thread.")
+    # One like event per touched target, plus the notification event.
+    assert db.query(OutboxEvent).count() == 3
+    assert asyncio.run(LikeService.flush_buffered()) == 0
+
+    state = LikeService.remove_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    assert state["like_count"] == 1
+    asyncio.run(LikeService.flush_buffered())
+    assert _likes(db, user_id=fan.id) == 0
+    db.refresh(thread)
+    assert thread.like_count == 1
+
+
+def test_buffered_likes_validate_targets_and_write_through_without_redis(
+    db,
+    write_behind,
+    monkeypatch,
+):
+    _owner, fan, thread, _comment = write_behind
+
+    with pytest.raises(HTTPException) as unknown:
+        LikeService.add_like(db, LikeCreate(thread_id=thread.id + 100), fan.id)
+    assert unknown.value.status_code == 404
+
+    def redis_down(*_args, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(LikeBufferService, "toggle", redis_down)
+    like = LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    assert like["like_count"] == 2
+    assert _likes(db, user_id=fan.id) == 1
+
+
+async def test_liked_state_overlays_unflushed_likes(db, async_db, write_behind, fake_redis):
+    owner, fan, thread, comment = write_behind
+    await fake_redis.hset("likes:flushing", f"comment:{comment.id}:{owner.id}", "1")
+    await fake_redis.hset("likes:pending", f"thread:{thread.id}:{owner.id}", "-1")
+
+    state = await LikeService.get_liked_state(
+        async_db,
+        owner.id,
+        [thread.id, thread.id, thread.id + 100],
+        [comment.id],
+    )
+    assert state == {"liked_thread_ids": [], "liked_comment_ids": [comment.id]}
+
+    await fake_redis.delete("likes:pending")
+    state = await LikeService.get_liked_state(async_db, owner.id, [thread.id], [])
+    assert state == {"liked_thread_ids": [thread.id], "liked_comment_ids": []}
+    assert await LikeService.get_liked_state(async_db, fan.id, [], []) == {
+        "liked_thread_ids": [],
+        "liked_comment_ids": [],
+    }
+
+
+def test_sync_liked_ids_overlay_pending_likes(db, write_behind, fake_redis):
+    owner, fan, thread, comment = write_behind
+    LikeService.add_like(db, LikeCreate(comment_id=comment.id), fan.id)
+
+    assert LikeStateService.liked_ids(db, fan.id, [thread.id], [comment.id]) == (set(), {comment.id})
+    assert LikeStateService.liked_ids(db, owner.id, [thread.id], []) == ({thread.id}, set())
+
+
+
+async def test_thread_and_comment_reads_overlay_unflushed_likes(async_db, write_behind, fake_redis):
+    _owner, fan, thread, comment = write_behind
+    await fake_redis.hset("likes:pending", f"thread:{thread.id}:{fan.id}", "1")
+    await fake_redis.hset("likes:pending", f"comment:{comment.id}:{fan.id}", "1")
+    await fake_redis.set(f"likes:thread:{thread.id}:count", 2)
+    await fake_redis.set(f"likes:comment:{comment.id}:count", 1)
+
+    viewed = await ThreadService.get_thread(async_db, thread.id, user_id=fan.id)
+    assert (viewed["user_has_liked"], viewed["like_count"]) == (True, 2)
+
+    listed = await ThreadService.list_threads(async_db, page=1, size=20, user_id=fan.id)
+    assert [(item["user_has_liked"], item["like_count"]) for item in listed["items"]] == [(True, 2)]
+    anonymous = await ThreadService.list_threads(async_db, page=1, size=20)
+    assert [(item["user_has_liked"], item["like_count"]) for item in anonymous["items"]] == [(False, 2)]
+
+    view = await CommentService.get_thread_view(async_db, thread.id, user_id=fan.id)
+    assert (view["thread"]["user_has_liked"], view["thread"]["like_count"]) == (True, 2)
+    assert [(item["user_has_liked"], item["like_count"]) for item in view["comments"]] == [(True, 1)]
+
+
+def test_relike_within_one_window_does_not_notify_again(db, write_behind):
+    _owner, fan, thread, _comment = write_behind
+    LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    asyncio.run(LikeService.flush_buffered())
+    assert db.query(Notification).count() == 1
+
+    LikeService.remove_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    asyncio.run(LikeService.flush_buffered())
+
+    assert _likes(db, user_id=fan.id, thread_id=thread.id) == 1
+    assert db.query(Notification).count() == 1
+
+
+def test_write_through_unlike_after_buffered_like(db, write_behind, monkeypatch):
+    _owner, fan, thread, _comment = write_behind
+    LikeService.add_like(db, LikeCreate(thread_id=thread.id), fan.id)
+
+    def redis_down(*_args, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(LikeBufferService, "toggle", redis_down)
+    state = LikeService.remove_like(db, LikeCreate(thread_id=thread.id), fan.id)
+    assert (state["liked"], state["like_count"]) == (False, 1)
+    assert _likes(db, user_id=fan.id) == 0
+
+    asyncio.run(LikeService.flush_buffered())
+    assert _likes(db, user_id=fan.id) == 0
+    db.refresh(thread)
+    assert thread.like_count == 1
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.unit_of_work import unit_of_work
+from app.models.notification import Notification
+from app.models.outbox import OutboxEvent
+from app.repositories.user import UserRepository
+from app.services.notification_queue_service import NotificationQueueService
+from app.services.notification_service import NotificationService
+
+
+@pytest.fixture
+def queue(db, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_QUEUE", True)
+    # The worker opens its own session on the test database.
+    monkeypatch.setattr(
+        "app.services.notification_service.SessionLocal",
+        sessionmaker(bind=db.get_bind(), autoflush=False),
+    )
+    users = UserRepository()
+    return [
+        users.create(db, {"email": f"queued{index}@example.com", "password_hash": "x"})
+        for index in range(2)
+    ]
+
+
+def _notify(db, user, entity_id=1):
+    return NotificationService.create_notification(
+        db,
+        user_id=user.id,
+        actor_id=None,
+        type="MENTION",
+        title="Mentioned",
+        message="Someone mentioned you.",
+        entity_type="comment",
+        entity_id=entity_id,
+    )
+
+
+def _count(db, model):
+    db.expire_all()
+    return db.query(model).count()
+
+
+def test_queued_notifications_are_created_in_bulk_by_the_worker(db, queue, fake_redis):
+    first, second = queue
+    with unit_of_work(db):
+        assert _notify(db, first) is None
+        _notify(db, second)
+        # Raised twice in one request: the worker keeps one.
+        _notify(db, second)
+
+    assert _count(db, Notification) == 0
+    assert asyncio.run(fake_redis.xlen("notifications:jobs")) == 3
+
+    asyncio.run(NotificationQueueService.ensure_group())
+    asyncio.run(NotificationQueueService.ensure_group())
+    assert asyncio.run(NotificationService.consume_once("worker-1")) == 3
+
+    rows = db.query(Notification).order_by(Notification.user_id).all()
+    assert [row.user_id for row in rows] == [first.id, second.id]
+    assert _count(db, OutboxEvent) == 2
+    assert asyncio.run(fake_redis.xlen("notifications:jobs")) == 0
+
+    # A job arriving inside the duplicate window is dropped as well.
+    _notify(db, first)
+    assert asyncio.run(NotificationService.consume_once("worker-1")) == 1
+    assert _count(db, Notification) == 2
+    assert asyncio.run(NotificationService.consume_once("worker-1")) == 0
+
+
+def test_worker_claims_abandoned_jobs_and_skips_malformed_ones(db, queue, fake_redis, monkeypatch):
+    first, _second = queue
+    asyncio.run(NotificationQueueService.ensure_group())
+    _notify(db, first)
+    asyncio.run(fake_redis.xadd("notifications:jobs", {"job": "not json"}))
+
+    # Read by a worker that dies before acknowledging.
+    assert len(asyncio.run(NotificationQueueService._read_batch("dead-worker"))) == 2
+    monkeypatch.setattr(NotificationQueueService, "_claim_idle_ms", 0)
+
+    assert asyncio.run(NotificationService.consume_once("worker-2")) == 1
+    assert _count(db, Notification) == 1
+    assert asyncio.run(fake_redis.xlen("notifications:jobs")) == 0
+
+
+def test_notifications_are_created_inline_when_the_queue_is_down(db, queue, monkeypatch):
+    first, _second = queue
+
+    async def redis_down(_jobs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(NotificationQueueService, "enqueue", redis_down)
+    _notify(db, first)
+    assert _count(db, Notification) == 1
+
+
+def test_worker_loop_retries_after_failures(monkeypatch):
+    calls = []
+
+    async def ensure_group():
+        calls.append("group")
+
+    async def consume_once(consumer):
+        calls.append(consumer)
+        if len(calls) > 3:
+            raise asyncio.CancelledError
+        raise RuntimeError("redis down")
+
+    async def no_sleep(_seconds):
+        return None
+
+    monkeypatch.setattr(NotificationQueueService, "ensure_group", ensure_group)
+    monkeypatch.setattr(NotificationService, "consume_once", consume_once)
+    monkeypatch.setattr("app.services.notification_service.asyncio.sleep", no_sleep)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(NotificationService.consume_forever("worker-3"))
+    # The group is re-checked after every failure.
+    assert calls == ["group", "worker-3", "group", "worker-3"]
@@ -1,3 +1,12 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from anyio import to_thread
+from fastapi import HTTPException
+
+from app.core.constants import RedisChannels
+from app.models.outbox import OutboxEvent
 from app.services.notification_service import NotificationService
 from app.repositories.user import UserRepository
 
@@ -13,13 +22,9 @@ def _create_user(db, email: str):
     )
 
 
-def test_create_notification_persists_for_offline_user(db, monkeypatch):
+def test_create_notification_persists_for_offline_user(db):
     user = _create_user(db, "offline-notify@test.com")
 
-    monkeypatch.setattr(
-        "app.services.notification_service.manager.is_user_online",
-        lambda user_id: False,
-    )
 
     notification = NotificationService.create_notification(
         db=db,
@@ -37,25 +42,10 @@ def test_create_notification_persists_for_offline_user(db, monkeypatch):
     assert notification.is_read is False
 
 
-def test_create_notification_triggers_realtime_for_online_user(db, monkeypatch):
+def test_create_notification_queues_realtime_event_in_outbox(db):
     user = _create_user(db, "online-notify@test.com")
-    called = {"dispatched": False}
-
-    monkeypatch.setattr(
-        "app.services.notification_service.manager.is_user_online",
-        lambda user_id: True,
-    )
-
-    def fake_from_thread_run(fn, *args, **kwargs):
-        called["dispatched"] = fn.__name__ == "dispatch_notification_event"
-        return None
-
-    monkeypatch.setattr(
-        "app.services.notification_service.from_thread.run",
-        fake_from_thread_run,
-    )
 
-    NotificationService.create_notification(
+    notification = NotificationService.create_notification(
         db=db,
         user_id=user.id,
         actor_id=None,
@@ -66,15 +56,15 @@ def test_create_notification_triggers_realtime_for_online_user(db, monkeypatch):
         entity_id=1,
     )
 
-    assert called["dispatched"] is True
+    event = db.query(OutboxEvent).one()
+    assert event.channel == RedisChannels.NOTIFICATIONS
+    payload = json.loads(event.payload)
+    assert payload["data"]["notification_id"] == notification.id
+    assert payload["data"]["user_id"] == user.id
 
 
-def test_mark_all_as_read_updates_all_rows(db, monkeypatch):
+async def test_mark_all_as_read_updates_all_rows(db, async_db):
     user = _create_user(db, "mark-all@test.com")
-    monkeypatch.setattr(
-        "app.services.notification_service.manager.is_user_online",
-        lambda user_id: False,
-    )
 
     NotificationService.create_notification(
         db=db,
@@ -103,4 +93,129 @@ def test_mark_all_as_read_updates_all_rows(db, monkeypatch):
     )
 
     assert updated == 2
-    assert NotificationService.get_unread_count(db, user.id) == 0
+    assert await NotificationService.get_unread_count(async_db, user.id) == 0
+
+
+async def test_notification_reads_are_served_from_cache(db, async_db, monkeypatch, fake_redis):
+    user = _create_user(db, "cached-notify@test.com")
+    NotificationService.create_notification(
+        db=db,
+        user_id=user.id,
+        actor_id=None,
+        type="SYSTEM",
+        title="First",
+        message="First",
+        entity_type="thread",
+        entity_id=1,
+    )
+
+    first = await NotificationService.get_user_notifications(async_db, user.id)
+    assert first["total"] == 1
+    assert await NotificationService.get_unread_count(async_db, user.id) == 1
+
+    calls = []
+
+    async def counting_unread(*_args):
+        calls.append(1)
+        return 99
+
+    monkeypatch.setattr(
+        NotificationService.async_repo,
+        "get_unread_count",
+        counting_unread,
+    )
+    assert await NotificationService.get_unread_count(async_db, user.id) == 1
+
+    # Another worker's copy: the L1 is empty but Redis still has the value.
+    NotificationService._local_cache.drop(everything=True)
+    assert await NotificationService.get_unread_count(async_db, user.id) == 1
+    assert calls == []
+
+
+async def test_notification_list_cache_is_invalidated_by_generation(db, async_db, monkeypatch, fake_redis):
+    user = _create_user(db, "generation-notify@test.com")
+
+    async def no_keyspace_scans(*_args):
+        raise AssertionError("KEYS must not be used")
+
+    monkeypatch.setattr(fake_redis, "keys", no_keyspace_scans)
+
+    assert (await NotificationService.get_user_notifications(async_db, user.id))["total"] == 0
+    generation = await fake_redis.get(NotificationService._generation_key(user.id))
+    assert await fake_redis.exists(
+        NotificationService._list_cache_key(user.id, "all:1:20", generation)
+    )
+
+    # Write paths run in worker threads, like sync endpoints.
+    await to_thread.run_sync(
+        lambda: NotificationService.create_notification(
+            db=db,
+            user_id=user.id,
+            actor_id=None,
+            type="SYSTEM",
+            title="Later",
+            message="Later",
+            entity_type="thread",
+            entity_id=2,
+        )
+    )
+    assert int(await fake_redis.get(NotificationService._generation_key(user.id))) == int(generation) + 1
+    await async_db.rollback()
+    assert (await NotificationService.get_user_notifications(async_db, user.id))["total"] == 1
+
+    # Redis unavailable: reads go straight to the database.
+    async def redis_down(*_args, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(fake_redis, "get", redis_down)
+    NotificationService._local_cache.drop(everything=True)
+    assert (await NotificationService.get_user_notifications(async_db, user.id))["total"] == 1
+
+
+async def test_inbox_keyset_pages_and_unread_filter(db, async_db):
+    user = _create_user(db, "keyset-notify@test.com")
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    created = [
+        NotificationService.repo.create(
+            db,
+            {
+                "user_id": user.id,
+                "type": "SYSTEM",
+                "title": f"n{index}",
+                "message": "m",
+                "entity_type": "thread",
+                "entity_id": index,
+                # Two notifications share a timestamp: ids break the tie.
+                "created_at": started + timedelta(minutes=min(index, 3)),
+                "is_read": index % 2 == 0,
+            },
+        )
+        for index in range(5)
+    ]
+    newest_first = [item.id for item in reversed(created)]
+
+    first = await NotificationService.get_user_notifications(async_db, user.id, size=2, before="")
+    assert [item["id"] for item in first["items"]] == newest_first[:2]
+    assert first["total"] is None
+    second = await NotificationService.get_user_notifications(
+        async_db, user.id, size=2, before=first["next_cursor"],
+    )
+    assert [item["id"] for item in second["items"]] == newest_first[2:4]
+    last = await NotificationService.get_user_notifications(
+        async_db, user.id, size=2, before=second["next_cursor"],
+    )
+    assert [item["id"] for item in last["items"]] == newest_first[4:]
+    assert last["next_cursor"] is None
+
+    unread = await NotificationService.get_user_notifications(
+        async_db, user.id, size=1, before="", unread_only=True,
+    )
+    assert [item["id"] for item in unread["items"]] == [created[3].id]
+    assert unread["total"] is None
+    unread_page = await NotificationService.get_user_notifications(async_db, user.id, page=2, size=1, unread_only=True)
+    assert [item["id"] for item in unread_page["items"]] == [created[1].id]
+    assert unread_page["total"] == 2
+
+    with pytest.raises(HTTPException) as invalid:
+        await NotificationService.get_user_notifications(async_db, user.id, before="not-a-cursor")
+    assert invalid.value.status_code == 400
@@ -0,0 +1,64 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.constants import RedisChannels
+from app.db.unit_of_work import unit_of_work
+from app.integrations.redis_client import redis_client
+from app.models.outbox import OutboxEvent
+from app.services.outbox_service import OutboxService
+
+
+async def test_outbox_events_commit_with_the_transaction_and_relay_in_order(
+    db,
+    async_db,
+    fake_redis,
+):
+    with pytest.raises(RuntimeError):
+        with unit_of_work(db):
+            OutboxService.publish(db, RedisChannels.THREADS, {"event": "lost"})
+            raise RuntimeError("abort")
+    assert db.query(OutboxEvent).count() == 0
+
+    with unit_of_work(db):
+        OutboxService.publish(db, RedisChannels.THREADS, {"event": "first"})
+        OutboxService.publish(db, RedisChannels.LIKES, {"event": "second"})
+    assert db.query(OutboxEvent).count() == 2
+
+    pubsub = fake_redis.pubsub()
+    await pubsub.subscribe(RedisChannels.THREADS, RedisChannels.LIKES)
+
+    assert await OutboxService.relay_once(async_db) == 2
+    received = []
+    while len(received) < 2:
+        message = await pubsub.get_message(timeout=1)
+        assert message is not None
+        if message["type"] == "message":
+            received.append((message["channel"], json.loads(message["data"])))
+    assert received == [
+        (RedisChannels.THREADS, {"event": "first"}),
+        (RedisChannels.LIKES, {"event": "second"}),
+    ]
+    db.expire_all()
+    assert db.query(OutboxEvent).count() == 0
+    assert await OutboxService.relay_once(async_db) == 0
+    await pubsub.aclose()
+
+
+async def test_outbox_keeps_events_while_redis_is_down(db, async_db, monkeypatch):
+    OutboxService.publish(db, RedisChannels.COMMENTS, {"event": "pending"})
+
+    async def fail():
+        raise ConnectionError("redis down")
+
+    broken = SimpleNamespace(
+        pipeline=lambda **_k: SimpleNamespace(publish=lambda *_a: None, execute=fail),
+    )
+    monkeypatch.setattr(redis_client, "redis", broken)
+
+    with pytest.raises(ConnectionError):
+        await OutboxService.relay_once(async_db)
+    await async_db.rollback()
+    # Nothing is lost: the row is relayed once Redis is back.
+    assert db.query(OutboxEvent).count() == 1
@@ -1,11 +1,32 @@
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event
 
+from app.repositories.like import LikeRepository
+from app.repositories.thread import ThreadRepository
+from app.repositories.user import UserRepository
 from app.schemas.thread import ThreadCreate, ThreadUpdate
+from app.services.outbox_service import OutboxService
+from app.services.like_state_service import LikeStateService
 from app.services.thread_service import ThreadService
+from app.utils.etag import THREADS_VERSION_KEY
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def _async_repo(**methods):
+    """SimpleNamespace whose callables are awaitable, for the async read path."""
+
+    def wrap(method):
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+    return SimpleNamespace(**{name: wrap(method) for name, method in methods.items()})
 
 
 def _make_user(user_id: int, roles: list[str], name: str = "", email: str = ""):
@@ -34,8 +55,9 @@ def _make_thread(author_id: int = 1, deleted: bool = False):
         tags=[SimpleNamespace(name="tag1")],
         author_id=author_id,
         author=author,
-        comments=[SimpleNamespace(is_deleted=False), SimpleNamespace(is_deleted=True)],
-        likes=[SimpleNamespace(user_id=2)],
+        comment_count=1,
+        like_count=1,
+        view_count=0,
         is_deleted=deleted,
     )
 
@@ -52,9 +74,6 @@ class _FakeThreadRepo:
         self.thread.description = data["description"]
         return self.thread
 
-    def get_active_threads(self, _db):
-        return [self.thread]
-
     def get_by_id(self, _db, _thread_id):
         return self.thread
 
@@ -104,71 +123,316 @@ def test_create_thread_non_moderator_triggers_moderation_and_notifications(monke
         "app.services.thread_service.ModerationService.create_review",
         lambda *_args, **_kwargs: moderation_called.__setitem__("value", True),
     )
+    events = []
     monkeypatch.setattr(
-        "app.services.thread_service.from_thread.run",
-        lambda *_args, **_kwargs: (_ for _ in ()).throw(RuntimeError("ws unavailable")),
+        OutboxService,
+        "publish",
+        lambda _db, channel, message: events.append((channel, message["data"])),
     )
-    monkeypatch.setattr(ThreadService, "_invalidate_threads_cache", lambda: None)
+    monkeypatch.setattr(ThreadService, "_index_new_thread", lambda _thread: None)
 
+    session = SimpleNamespace(info={}, commit=lambda: None, rollback=lambda: None)
     created = ThreadService.create_thread(
-        db=None,
+        db=session,
         payload=ThreadCreate(title="New", description="Thread"),
         author_id=1,
     )
 
     assert created.id == 1
+    assert events == [
+        ("threads_channel", {"action": "created", "thread": {"id": 1, "title": "New"}}),
+    ]
     assert moderation_called["value"] is True
     assert len(notifications) == 1
     assert notifications[0]["user_id"] == 2
 
 
-def test_list_threads_uses_cached_payload(monkeypatch):
-    cached = '[{"id":1},{"id":2},{"id":3}]'
+async def _seed_thread_cache(fake_redis, items):
+    await fake_redis.set(ThreadService._threads_index_ready_key, "1")
+    for item in items:
+        await fake_redis.zadd(
+            ThreadService._threads_index_key,
+            {str(item["id"]): ThreadService._index_score(item["created_at"])},
+        )
+        await fake_redis.hset(
+            ThreadService._card_key(item["id"]),
+            mapping=ThreadService._card_mapping(item),
+        )
+
+
+def _card(thread_id: int, day: int) -> dict:
+    return {
+        "id": thread_id,
+        "created_at": f"2026-01-0{day}T00:00:00+00:00",
+        "title": f"Cached {thread_id}",
+        "like_count": thread_id,
+        "comment_count": 0,
+        "view_count": 0,
+        "user_has_liked": False,
+    }
 
-    def fake_run_redis_call(method, *args):
-        if method.__name__ == "get":
-            return cached
-        return None
 
-    monkeypatch.setattr(ThreadService, "_run_redis_call", staticmethod(fake_run_redis_call))
+async def test_list_threads_uses_cached_cards(monkeypatch, fake_redis):
+    await _seed_thread_cache(fake_redis, [_card(1, 1), _card(2, 2), _card(3, 3)])
     monkeypatch.setattr(
         ThreadService,
-        "repo",
-        SimpleNamespace(get_active_threads=lambda _db: (_ for _ in ()).throw(AssertionError("should not query db"))),
+        "async_repo",
+        _async_repo(get_by_ids=lambda *_a: (_ for _ in ()).throw(AssertionError("should not query db"))),
     )
 
-    result = ThreadService.list_threads(db=None, page=2, size=2, user_id=None)
+    result = await ThreadService.list_threads(db=None, page=2, size=2, user_id=None)
     assert result["total"] == 3
-    assert result["items"] == [{"id": 3}]
+    assert [item["id"] for item in result["items"]] == [1]
+    assert result["next_cursor"] is None
+
+    first = await ThreadService.list_threads(db=None, page=1, size=2, user_id=None)
+    assert [item["title"] for item in first["items"]] == ["Cached 3", "Cached 2"]
+    assert decode_cursor(first["next_cursor"])[1] == 2
 
 
-def test_list_threads_falls_back_to_repo_and_writes_cache(monkeypatch):
+async def test_list_threads_rebuilds_index_and_fills_missing_cards(monkeypatch, fake_redis):
+    thread = _make_thread(author_id=1)
+    keys = [(1, thread.created_at), (5, thread.created_at)]
+    loaded = []
+
+    def fake_get_by_ids(_db, thread_ids):
+        loaded.append(list(thread_ids))
+        return [thread] if 1 in thread_ids else []
+
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(
+            get_active_thread_keys=lambda _db, since=None: keys,
+            get_by_ids=fake_get_by_ids,
+        ),
+    )
+
+    result = await ThreadService.list_threads(db=None, page=1, size=20, user_id=None)
+    assert [item["id"] for item in result["items"]] == [1]
+    assert loaded == [[1, 5]]
+
+    members = await fake_redis.zrange(ThreadService._threads_index_key, 0, -1)
+    assert members == ["1"]
+
+    again = await ThreadService.list_threads(db=None, page=1, size=20, user_id=None)
+    assert again["total"] == 1
+    assert loaded == [[1, 5]]
+
+
+async def test_index_rebuild_keeps_threads_committed_meanwhile(monkeypatch, fake_redis):
+    old = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    new = datetime.now(timezone.utc)
+    calls = []
+
+    def fake_keys(_db, since=None):
+        calls.append(since)
+        # Thread 9 commits, and is indexed, while the snapshot is read.
+        if since is None:
+            return [(1, old)]
+        return [(9, new)] if new >= since else []
+
+    await fake_redis.zadd(ThreadService._threads_index_key, {"9": new.timestamp()})
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(get_active_thread_keys=fake_keys),
+    )
+
+    total, thread_ids = await ThreadService._rebuild_index(None, 0, 20)
+    assert (total, thread_ids) == (2, [9, 1])
+    assert await fake_redis.zrevrange(ThreadService._threads_index_key, 0, -1) == ["9", "1"]
+    assert calls[0] is None and calls[1] is not None
+
+
+async def test_list_threads_single_flight_index_rebuild(monkeypatch, fake_redis):
+    await _seed_thread_cache(fake_redis, [_card(1, 1), _card(2, 2)])
+    await fake_redis.delete(ThreadService._threads_index_ready_key)
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(
+            get_active_thread_keys=lambda _db: (_ for _ in ()).throw(AssertionError("should not rebuild")),
+            get_by_ids=lambda *_a: [],
+        ),
+    )
+
+    # Stale index while another worker rebuilds: keep serving it.
+    token = await ThreadService._index_cache.try_acquire(ThreadService._threads_index_key)
+    stale = await ThreadService.list_threads(db=None, page=1, size=20, user_id=None)
+    assert [item["id"] for item in stale["items"]] == [2, 1]
+
+    # Cold index while another worker rebuilds: wait, then fall back to the DB.
+    await fake_redis.delete(ThreadService._threads_index_key)
+    ThreadService._local_pages.drop(everything=True)
+    thread = _make_thread(author_id=1)
+    monkeypatch.setattr(ThreadService._index_cache, "wait_timeout", 0.02)
+    monkeypatch.setattr(ThreadService._index_cache, "poll_interval", 0.01)
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(
+            get_active_thread_keys=lambda _db: (_ for _ in ()).throw(AssertionError("should not rebuild")),
+            get_active_threads=lambda _db, offset=None, limit=None: [thread],
+            count_active_threads=lambda _db: 1,
+        ),
+    )
+    cold = await ThreadService.list_threads(db=None, page=1, size=20, user_id=None)
+    assert [item["id"] for item in cold["items"]] == [thread.id]
+
+    await ThreadService._index_cache.release(ThreadService._threads_index_key, token)
+
+
+def test_thread_card_patch_and_eviction(fake_redis):
+    # Write paths are sync; drive them the way a worker thread would.
+    asyncio.run(_seed_thread_cache(fake_redis, [_card(1, 1), _card(2, 2)]))
+    ThreadService._patch_thread_card(1, like_delta=1, comment_delta=2)
+    ThreadService._patch_thread_card(1)
+    # Cards that are not cached are left alone rather than half-created.
+    ThreadService._patch_thread_card(99, like_delta=1)
+    assert asyncio.run(fake_redis.exists(ThreadService._card_key(99))) == 0
+
+    thread = _make_thread(author_id=1)
+    thread.id = 3
+    ThreadService._index_new_thread(thread)
+    ThreadService._evict_thread(2)
+
+    result = asyncio.run(ThreadService.list_threads(db=None, page=1, size=20, user_id=None))
+    assert [item["id"] for item in result["items"]] == [3, 1]
+    assert result["items"][1]["like_count"] == 2
+    assert result["items"][1]["comment_count"] == 2
+
+    thread.title = "Renamed"
+    ThreadService._refresh_thread_card(thread)
+    result = asyncio.run(ThreadService.list_threads(db=None, page=1, size=1, user_id=None))
+    assert result["items"][0]["title"] == "Renamed"
+
+
+def test_card_writes_reach_redis_before_l1_and_version_move(monkeypatch, fake_redis):
+    asyncio.run(_seed_thread_cache(fake_redis, [_card(1, 1)]))
+    asyncio.run(ThreadService.list_threads(db=None, page=1, size=20, user_id=None))
+    run_redis_call = ThreadService._run_redis_call
+    seen = []
+
+    def read_meanwhile(method, *args):
+        # Another request reads while the Redis write is in flight.
+        page = asyncio.run(ThreadService.list_threads(db=None, page=1, size=20, user_id=None))
+        version = asyncio.run(fake_redis.get(THREADS_VERSION_KEY))
+        seen.append((version, [item["title"] for item in page["items"]]))
+        return run_redis_call(method, *args)
+
+    monkeypatch.setattr(ThreadService, "_run_redis_call", read_meanwhile)
+    thread = _make_thread(author_id=1)
+    thread.created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    thread.title = "Renamed"
+    ThreadService._refresh_thread_card(thread)
+
+    # The reader saw the old card under the old version, and nothing
+    # it cached outlives the write.
+    assert seen == [(None, ["Cached 1"])]
+    assert asyncio.run(fake_redis.get(THREADS_VERSION_KEY)) == "1"
+    result = asyncio.run(ThreadService.list_threads(db=None, page=1, size=20, user_id=None))
+    assert [item["title"] for item in result["items"]] == ["Renamed"]
+
+
+async def test_list_threads_falls_back_to_repo_when_cache_down(monkeypatch):
     thread = _make_thread(author_id=1)
-    repo = _FakeThreadRepo(thread)
     calls = []
 
-    def fake_run_redis_call(method, *args):
-        calls.append(method.__name__)
-        if method.__name__ == "get":
+    class DownRedis:
+        def __getattr__(self, _name):
             raise RuntimeError("cache down")
-        return None
 
-    monkeypatch.setattr(ThreadService, "repo", repo)
-    monkeypatch.setattr(ThreadService, "_run_redis_call", staticmethod(fake_run_redis_call))
+    def fake_get_active_threads(_db, offset=None, limit=None):
+        calls.append((offset, limit))
+        return [thread]
+
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(
+            get_active_threads=fake_get_active_threads,
+            count_active_threads=lambda _db: 1,
+        ),
+    )
+    monkeypatch.setattr(
+        LikeStateService,
+        "async_repo",
+        _async_repo(
+            get_liked_ids=lambda _db, _user_id, thread_ids, _comment_ids: (
+                checked.append(thread_ids) or ({1}, set())
+            ),
+        ),
+    )
+    monkeypatch.setattr("app.services.thread_service.redis_client.redis", DownRedis())
+    checked = []
 
-    result = ThreadService.list_threads(db=None, page=1, size=20, user_id=None)
+    result = await ThreadService.list_threads(db=None, page=1, size=20, user_id=7)
+    assert checked == [[1]]
     assert result["total"] == 1
     assert result["items"][0]["title"] == "Initial"
-    assert "get" in calls
-    assert "setex" in calls
+    assert result["items"][0]["user_has_liked"] is True
+    assert calls == [(0, 20)]
+
+
+async def test_list_threads_keyset_mode(monkeypatch):
+    threads = []
+    for thread_id in (3, 2, 1):
+        thread = _make_thread(author_id=1)
+        thread.id = thread_id
+        threads.append(thread)
+    calls = []
+
+    def fake_page(_db, limit, before=None):
+        calls.append(before)
+        if before is None:
+            return threads[:limit]
+        return [thread for thread in threads if thread.id < before[1]][:limit]
+
+    monkeypatch.setattr(
+        ThreadService,
+        "async_repo",
+        _async_repo(
+            get_active_threads_page=fake_page,
+        ),
+    )
+
+    first = await ThreadService.list_threads(db=None, size=2, cursor="")
+    assert [item["id"] for item in first["items"]] == [3, 2]
+    assert first["total"] is None
+    assert first["next_cursor"] is not None
+
+    second = await ThreadService.list_threads(db=None, size=2, cursor=first["next_cursor"])
+    assert [item["id"] for item in second["items"]] == [1]
+    assert second["next_cursor"] is None
+    assert calls[1][1] == 2
+
+    with pytest.raises(HTTPException) as invalid:
+        await ThreadService.list_threads(db=None, size=2, cursor="not-a-cursor")
+    assert invalid.value.status_code == 400
+
 
+def test_cursor_roundtrip():
+    created_at = datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
 
-def test_get_update_delete_permission_and_not_found_paths(monkeypatch):
+
+async def test_get_update_delete_permission_and_not_found_paths(monkeypatch, fake_redis):
     thread = _make_thread(author_id=1)
     repo = _FakeThreadRepo(thread)
     monkeypatch.setattr(ThreadService, "repo", repo)
-    monkeypatch.setattr(ThreadService, "_invalidate_threads_cache", lambda: None)
-    monkeypatch.setattr("app.services.thread_service.from_thread.run", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(
+        LikeStateService,
+        "repo",
+        SimpleNamespace(
+            get_liked_ids=lambda _db, user_id, thread_ids, _comment_ids: (
+                (set(thread_ids) if user_id == 1 else set()),
+                set(),
+            ),
+        ),
+    )
+    monkeypatch.setattr(OutboxService, "publish", lambda *_args, **_kwargs: None)
+    session = SimpleNamespace(info={}, flush=lambda: None, commit=lambda: None, rollback=lambda: None)
 
     not_author = _make_user(2, ["MEMBER"])
     with pytest.raises(HTTPException) as cannot_edit:
@@ -191,24 +455,82 @@ def test_get_update_delete_permission_and_not_found_paths(monkeypatch):
     assert cannot_delete.value.status_code == 403
 
     updated = ThreadService.update_thread(
-        db=None,
+        db=session,
         thread_id=1,
         payload=ThreadUpdate(title="Updated"),
         user_id=1,
         actor=_make_user(1, ["MEMBER"]),
     )
     assert updated["title"] == "Updated"
+    assert updated["like_count"] == 1
+    assert updated["user_has_liked"] is True
     assert repo.updated_payload["title"] == "Updated"
 
+    monkeypatch.setattr(
+        LikeStateService,
+        "async_repo",
+        _async_repo(
+            get_liked_ids=lambda _db, user_id, thread_ids, _comment_ids: (
+                (set(thread_ids) if user_id == 1 else set()),
+                set(),
+            ),
+        ),
+    )
+    monkeypatch.setattr(ThreadService, "async_repo", _async_repo(get_by_id=lambda _db, _thread_id: thread))
+    viewed = await ThreadService.get_thread(db=None, thread_id=1, user_id=1)
+    assert viewed["user_has_liked"] is True
+
     ThreadService.delete_thread(
-        db=None,
+        db=session,
         thread_id=1,
         user_id=1,
         actor=_make_user(1, ["MEMBER"]),
     )
     assert repo.soft_deleted is True
 
-    repo.thread = None
+    thread = None
     with pytest.raises(HTTPException) as not_found:
-        ThreadService.get_thread(db=None, thread_id=9, user_id=1)
+        await ThreadService.get_thread(db=None, thread_id=9, user_id=1)
     assert not_found.value.status_code == 404
+
+
+async def test_page_hydrates_only_the_ids_on_the_page(db, async_db, fake_redis):
+    author = UserRepository().create(db, {"email": "pages@example.com", "password_hash": "x"})
+    fan = UserRepository().create(db, {"email": "page-fan@example.com", "password_hash": "x"})
+    started = datetime.now(timezone.utc)
+    threads = [
+        ThreadRepository().create(
+            db,
+            {
+                "title": f"Thread {index}",
+                "description": "d",
+                "author_id": author.id,
+                "created_at": started + timedelta(minutes=index),
+            },
+        )
+        for index in range(5)
+    ]
+    # The fan liked every thread, not only the ones on the page.
+    for thread in threads:
+        LikeRepository().set_like(db, fan.id, thread_id=thread.id)
+
+    statements = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        statements.append((statement, tuple(parameters)))
+
+    engine = async_db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        page = await ThreadService.list_threads(async_db, page=1, size=2, user_id=fan.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    on_page = [threads[4].id, threads[3].id]
+    assert [item["id"] for item in page["items"]] == on_page
+    assert all(item["user_has_liked"] for item in page["items"])
+    # Thread rows and like rows are fetched for the page's IDs only.
+    hydrated = [params for statement, params in statements if "threads.title" in statement]
+    assert [sorted(params) for params in hydrated] == [sorted(on_page)]
+    like_lookups = [params for statement, params in statements if "FROM likes" in statement]
+    assert like_lookups == [(fan.id, *on_page)]
@@ -0,0 +1,212 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from anyio import to_thread
+from fastapi import HTTPException
+
+from app.repositories.thread import ThreadRepository
+from app.repositories.user import UserRepository
+from app.services.like_state_service import LikeStateService
+from app.services.thread_service import ThreadService
+from app.services.trending_service import TrendingService
+
+
+def _seed_threads(db):
+    author = UserRepository().create(
+        db,
+        {"email": "trending@example.com", "password_hash": "hashed"},
+    )
+    repo = ThreadRepository()
+    now = datetime.now(timezone.utc)
+
+    def thread(title, hours_old, likes=0, comments=0):
+        return repo.create(
+            db,
+            {
+                "title": title,
+                "description": title,
+                "author_id": author.id,
+                "created_at": now - timedelta(hours=hours_old),
+                "like_count": likes,
+                "comment_count": comments,
+            },
+        )
+
+    return {
+        "fresh": thread("fresh", 1, likes=2),
+        "busy_old": thread("busy old", 48, likes=10, comments=5),
+        "quiet": thread("quiet", 2),
+        "ancient": thread("ancient", 24 * 30, likes=100),
+    }
+
+
+def test_score_decays_with_age():
+    now = datetime.now(timezone.utc)
+    fresh = TrendingService._score(now, 1, 0, now.timestamp())
+    half_life_old = TrendingService._score(
+        now - timedelta(seconds=TrendingService._half_life_seconds),
+        1,
+        0,
+        now.timestamp(),
+    )
+    assert fresh == 2
+    assert half_life_old == pytest.approx(1)
+    assert TrendingService._score(now.replace(tzinfo=None), 0, 1, now.timestamp()) == pytest.approx(3, rel=1e-3)
+
+
+async def test_trending_set_recompute_and_incremental_updates(db, async_db, fake_redis):
+    threads = _seed_threads(db)
+
+    # Cold set: the first read rebuilds it from the DB window.
+    total, ids = await TrendingService.get_page(async_db, 0, 10)
+    assert total == 3
+    assert ids == [threads["fresh"].id, threads["busy_old"].id, threads["quiet"].id]
+    assert await fake_redis.exists(TrendingService._epoch_key) == 1
+
+    # Engagement from the sync write paths moves a thread up.
+    await to_thread.run_sync(
+        lambda: TrendingService.record_engagement(threads["quiet"].id, comment_delta=2)
+    )
+    await to_thread.run_sync(lambda: TrendingService.record_engagement(threads["quiet"].id))
+    _, ids = await TrendingService.get_page(async_db, 0, 1)
+    assert ids == [threads["quiet"].id]
+
+    # New threads enter the set; deleted ones leave it.
+    await to_thread.run_sync(TrendingService.record_new_thread, 999)
+    await to_thread.run_sync(TrendingService.remove_thread, threads["fresh"].id)
+    total, ids = await TrendingService.get_page(async_db, 0, 10)
+    assert total == 3
+    assert 999 in ids
+    assert threads["fresh"].id not in ids
+
+    # Unranked threads are not half-added by engagement bumps.
+    await to_thread.run_sync(lambda: TrendingService.record_engagement(12345, like_delta=1))
+    assert await fake_redis.zscore(TrendingService._scores_key, "12345") is None
+
+
+async def test_trending_page_is_unavailable_while_redis_is_down(db, async_db, monkeypatch):
+    _seed_threads(db)
+
+    class DownRedis:
+        def __getattr__(self, _name):
+            raise RuntimeError("redis down")
+
+    async def no_scoring(*_args):
+        raise AssertionError("scored the window per request")
+
+    monkeypatch.setattr("app.services.trending_service.redis_client.redis", DownRedis())
+    monkeypatch.setattr(TrendingService.repo, "get_trending_candidates", no_scoring)
+    assert await TrendingService.get_page(async_db, 1, 1) is None
+
+    # Bumps are best-effort when Redis is unavailable.
+    await to_thread.run_sync(TrendingService.record_new_thread, 1)
+    await to_thread.run_sync(TrendingService.remove_thread, 1)
+
+
+async def test_cold_trending_set_is_built_once(db, async_db, fake_redis, monkeypatch):
+    threads = _seed_threads(db)
+    monkeypatch.setattr(TrendingService._rebuild_lock, "wait_timeout", 0.05)
+    monkeypatch.setattr(TrendingService._rebuild_lock, "poll_interval", 0.01)
+    token = await TrendingService._rebuild_lock.try_acquire(TrendingService._scores_key)
+    recompute = TrendingService.recompute
+    calls = []
+
+    async def counted_recompute(db):
+        calls.append(1)
+        return await recompute(db)
+
+    monkeypatch.setattr(TrendingService, "recompute", counted_recompute)
+
+    # Another worker holds the rebuild lock and never finishes: give up.
+    assert await TrendingService.get_page(async_db, 0, 10) is None
+
+    # It finishes while this request waits: serve what it built.
+    async def finish_rebuild():
+        await asyncio.sleep(0.02)
+        await recompute(async_db)
+
+    rebuild = asyncio.create_task(finish_rebuild())
+    total, ids = await TrendingService.get_page(async_db, 0, 1)
+    await rebuild
+    assert (total, ids) == (3, [threads["fresh"].id])
+    assert calls == []
+    await TrendingService._rebuild_lock.release(TrendingService._scores_key, token)
+
+
+async def test_refresh_forever_recomputes_once_per_interval(monkeypatch, fake_redis):
+    calls = []
+
+    async def fake_recompute(_db):
+        calls.append(1)
+        return 0
+
+    class FakeSession:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *_exc):
+            return None
+
+    async def stop(_seconds):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(TrendingService, "recompute", fake_recompute)
+    monkeypatch.setattr("app.services.trending_service.AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr("app.services.trending_service.asyncio.sleep", stop)
+
+    for _ in range(2):
+        with pytest.raises(asyncio.CancelledError):
+            await TrendingService.refresh_forever()
+    # The second worker finds the refresh lock taken.
+    assert calls == [1]
+
+
+async def test_list_threads_trending_mode(monkeypatch):
+    cards = {
+        1: {"id": 1, "created_at": "2026-01-01T00:00:00+00:00", "title": "One"},
+        2: {"id": 2, "created_at": "2026-01-02T00:00:00+00:00", "title": "Two"},
+    }
+
+    async def fake_page(_db, start, size):
+        return 3, [2, 1]
+
+    async def fake_load_cards(_db, thread_ids):
+        return [cards[thread_id] for thread_id in thread_ids]
+
+    async def liked(_db, _user_id, thread_ids, _comment_ids):
+        assert thread_ids == [2, 1]
+        return {1}, set()
+
+    monkeypatch.setattr(TrendingService, "get_page", fake_page)
+    monkeypatch.setattr(ThreadService, "_load_cards", fake_load_cards)
+    monkeypatch.setattr(LikeStateService, "async_repo", SimpleNamespace(get_liked_ids=liked))
+
+    result = await ThreadService.list_threads(db=None, page=1, size=2, user_id=5, sort="trending")
+    assert [item["id"] for item in result["items"]] == [2, 1]
+    assert [item["user_has_liked"] for item in result["items"]] == [False, True]
+    assert result["total"] == 3
+    assert result["pages"] == 2
+    assert result["next_cursor"] is None
+    assert "user_has_liked" not in cards[1]
+
+    # Trending unavailable: the recent order is served instead.
+    async def unavailable(_db, _start, _size):
+        return None
+
+    async def recent_page(_db, start, size):
+        return [cards[1]], 1
+
+    async def none_liked(*_args):
+        return set(), set()
+
+    monkeypatch.setattr(TrendingService, "get_page", unavailable)
+    monkeypatch.setattr(ThreadService, "_read_recent_page", recent_page)
+    monkeypatch.setattr(LikeStateService, "async_repo", SimpleNamespace(get_liked_ids=none_liked))
+    fallback = await ThreadService.list_threads(db=None, page=1, size=2, user_id=5, sort="trending")
+    assert [item["id"] for item in fallback["items"]] == [1]
+
+    with pytest.raises(HTTPException) as invalid:
+        await ThreadService.list_threads(db=None, size=2, cursor="", sort="trending")
+    assert invalid.value.status_code == 400
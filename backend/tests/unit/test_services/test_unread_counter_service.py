@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from anyio import to_thread
+
+from app.repositories.user import UserRepository
+from app.services.notification_service import NotificationService
+from app.services.unread_counter_service import UnreadCounterService
+
+
+def _notify(db, user_id: int, entity_id: int):
+    return NotificationService.create_notification(
+        db=db,
+        user_id=user_id,
+        actor_id=None,
+        type="SYSTEM",
+        title="Counter",
+        message="Counter",
+        entity_type="thread",
+        entity_id=entity_id,
+    )
+
+
+async def test_unread_counter_follows_writes_and_reconciles(db, async_db, fake_redis, monkeypatch):
+    user = UserRepository().create(db, {"email": "unread@example.com", "password_hash": "x"})
+    key = UnreadCounterService._key(user.id)
+    # Write paths run in worker threads, like sync endpoints.
+    first = await to_thread.run_sync(_notify, db, user.id, 1)
+    await to_thread.run_sync(_notify, db, user.id, 2)
+    # No counter yet: nothing to adjust until a read builds it.
+    assert await fake_redis.get(key) is None
+    assert await NotificationService.get_unread_count(async_db, user.id) == 2
+
+    async def no_recount(*_args):
+        raise AssertionError("served from the counter")
+
+    monkeypatch.setattr(UnreadCounterService.repo, "get_unread_count", no_recount)
+    await to_thread.run_sync(_notify, db, user.id, 3)
+    assert await NotificationService.get_unread_count(async_db, user.id) == 3
+
+    await to_thread.run_sync(NotificationService.mark_as_read, db, user.id, first.id)
+    await to_thread.run_sync(NotificationService.mark_as_read, db, user.id, first.id)
+    assert await NotificationService.get_unread_count(async_db, user.id) == 2
+
+    mark_all = NotificationService.repo.mark_all_as_read
+
+    def mark_all_then_notify(db, user_id):
+        updated = mark_all(db, user_id)
+        # Committed after the update, counted before mark-all adjusts.
+        _notify(db, user_id, 4)
+        return updated
+
+    monkeypatch.setattr(NotificationService.repo, "mark_all_as_read", mark_all_then_notify)
+    assert await to_thread.run_sync(NotificationService.mark_all_as_read, db, user.id) == 2
+    assert await NotificationService.get_unread_count(async_db, user.id) == 1
+    await to_thread.run_sync(UnreadCounterService.adjust, user.id, -2)
+    assert await fake_redis.get(key) == "0"
+
+    # Drifted counters are corrected; members whose counter expired are dropped.
+    await fake_redis.set(key, 5)
+    await fake_redis.sadd(UnreadCounterService._users_key, "999999")
+    assert await UnreadCounterService.reconcile(async_db) == 1
+    assert await fake_redis.get(key) == "1"
+    assert await fake_redis.smembers(UnreadCounterService._users_key) == {str(user.id)}
+    assert await UnreadCounterService.reconcile(async_db) == 0
+
+
+async def test_unread_count_falls_back_to_the_database(db, async_db, fake_redis, monkeypatch):
+    user = UserRepository().create(db, {"email": "unread-down@example.com", "password_hash": "x"})
+    await to_thread.run_sync(_notify, db, user.id, 1)
+
+    async def redis_down(*_args, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(fake_redis, "get", redis_down)
+    assert await NotificationService.get_unread_count(async_db, user.id) == 1
+
+
+def test_reconcile_loop_survives_failures(monkeypatch):
+    calls = []
+
+    async def failing_acquire(_key):
+        calls.append("acquire")
+        raise RuntimeError("redis down")
+
+    async def stop(_seconds):
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(UnreadCounterService._reconcile_lock, "try_acquire", failing_acquire)
+    monkeypatch.setattr("app.services.unread_counter_service.asyncio.sleep", stop)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(UnreadCounterService.reconcile_forever())
+    assert calls == ["acquire"]
@@ -1,16 +1,21 @@
+import json
 from types import SimpleNamespace
 
 import pytest
+from anyio import to_thread
 from fastapi import HTTPException
 
-from app.core.constants import Roles
+from app.core.constants import RedisChannels, Roles
+from app.models.outbox import OutboxEvent
 from app.models.role import Role
 from app.repositories.comment import CommentRepository
 from app.repositories.like import LikeRepository
 from app.repositories.role import RoleRepository
 from app.repositories.thread import ThreadRepository
 from app.repositories.user import UserRepository
+from app.services.thread_service import ThreadService
 from app.services.user_service import UserService
+from app.utils.etag import THREADS_VERSION_KEY, comments_version_key, read_version
 
 
 def _ensure_roles(db):
@@ -100,10 +105,6 @@ def test_user_service_error_paths_and_admin_promotion_notification(db, monkeypat
         "app.services.user_service.NotificationService.create_notification",
         lambda *_args, **kwargs: notifications.append(kwargs),
     )
-    monkeypatch.setattr(
-        "app.services.user_service.from_thread.run",
-        lambda *_args, **_kwargs: None,
-    )
 
     promoted = UserService.set_user_role(
         db,
@@ -152,9 +153,9 @@ def test_user_service_activity_includes_truncated_comment_like_excerpt(db):
         {"content": long_comment, "thread_id": other_thread.id, "author_id": other.id},
     )
 
-    like_repo.create(db, {"user_id": target.id, "thread_id": other_thread.id})
-    like_repo.create(db, {"user_id": target.id, "comment_id": comment.id})
-    like_repo.create(db, {"user_id": other.id, "thread_id": target_thread.id})
+    like_repo.set_like(db, target.id, thread_id=other_thread.id)
+    like_repo.set_like(db, target.id, comment_id=comment.id)
+    like_repo.set_like(db, other.id, thread_id=target_thread.id)
 
     result = UserService.get_user_activity(
         db,
@@ -192,6 +193,38 @@ def test_user_service_profile_and_suggest_delegate(db):
     assert len(suggestions) >= 1
 
 
+async def test_profile_change_refreshes_cached_author_data(db, async_db, fake_redis):
+    _ensure_roles(db)
+    author = _create_user(db, "author-cache@example.com", "Before", Roles.MEMBER)
+    other = _create_user(db, "other-cache@example.com", "Other", Roles.MEMBER)
+    own = ThreadRepository().create(
+        db,
+        {"title": "Own", "description": "d", "author_id": author.id},
+    )
+    elsewhere = ThreadRepository().create(
+        db,
+        {"title": "Elsewhere", "description": "d", "author_id": other.id},
+    )
+    CommentRepository().create(
+        db,
+        {"content": "hi", "thread_id": elsewhere.id, "author_id": author.id},
+    )
+    listed = await ThreadService.list_threads(async_db, page=1, size=20)
+    assert {item["author"]["name"] for item in listed["items"]} == {"Before", "Other"}
+    threads_version = await read_version(THREADS_VERSION_KEY)
+    comments_version = await read_version(comments_version_key(elsewhere.id))
+
+    await to_thread.run_sync(UserService.update_profile, db, author.id, {"bio": "unrelated"})
+    assert await read_version(THREADS_VERSION_KEY) == threads_version
+
+    await to_thread.run_sync(UserService.update_profile, db, author.id, {"name": "After"})
+    assert await read_version(THREADS_VERSION_KEY) != threads_version
+    assert await read_version(comments_version_key(elsewhere.id)) != comments_version
+    listed = await ThreadService.list_threads(async_db, page=1, size=20)
+    authors = {item["id"]: item["author"]["name"] for item in listed["items"]}
+    assert authors == {own.id: "After", elsewhere.id: "Other"}
+
+
 def test_user_service_list_and_update_success_paths(db, monkeypatch):
     _ensure_roles(db)
     admin = _create_user(db, "admin-list@example.com", "Admin List", Roles.ADMIN)
@@ -211,10 +244,6 @@ def test_user_service_list_and_update_success_paths(db, monkeypatch):
     assert member_view["page"] == 1
     assert member_view["pages"] >= 1
 
-    monkeypatch.setattr(
-        "app.services.user_service.from_thread.run",
-        lambda *_a, **_k: (_ for _ in ()).throw(RuntimeError("ws down")),
-    )
     updated = UserService.update_user(
         db,
         actor=admin,
@@ -222,6 +251,10 @@ def test_user_service_list_and_update_success_paths(db, monkeypatch):
         data={"name": "Target Updated"},
     )
     assert updated.name == "Target Updated"
+    # The realtime event is committed with the change, not sent inline.
+    event = db.query(OutboxEvent).order_by(OutboxEvent.id.desc()).first()
+    assert event.channel == RedisChannels.USERS
+    assert json.loads(event.payload)["data"]["user"]["name"] == "Target Updated"
 
 
 def test_user_service_moderator_promotion_notification(db, monkeypatch):
@@ -234,10 +267,6 @@ def test_user_service_moderator_promotion_notification(db, monkeypatch):
         "app.services.user_service.NotificationService.create_notification",
         lambda *_a, **kwargs: sent.append(kwargs),
     )
-    monkeypatch.setattr(
-        "app.services.user_service.from_thread.run",
-        lambda *_a, **_k: (_ for _ in ()).throw(RuntimeError("ws down")),
-    )
 
     promoted = UserService.set_user_role(
         db,
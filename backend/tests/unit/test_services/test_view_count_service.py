@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.repositories.thread import ThreadRepository
+from app.repositories.user import UserRepository
+from app.services.thread_service import ThreadService
+from app.services.view_count_service import ViewCountService
+from app.utils.etag import THREADS_VERSION_KEY
+
+
+def _seed_threads(db, count: int = 2):
+    author = UserRepository().create(
+        db,
+        {"email": "views@example.com", "password_hash": "hashed"},
+    )
+    return [
+        ThreadRepository().create(
+            db,
+            {"title": f"Thread {index}", "description": "views", "author_id": author.id},
+        )
+        for index in range(count)
+    ]
+
+
+async def test_views_are_buffered_then_flushed_in_bulk(db, async_db, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "TRACK_UNIQUE_THREAD_VIEWERS", True)
+    first, second = _seed_threads(db)
+    await fake_redis.hset(
+        ThreadService._card_key(first.id),
+        mapping=ThreadService._card_mapping(ThreadService._serialize_thread(first)),
+    )
+
+    ThreadService._local_cards.set(str(first.id), {"id": first.id})
+    for viewer_id in (1, 2, 1):
+        await ViewCountService.record_view(first.id, viewer_id)
+    await ViewCountService.record_view(second.id)
+
+    assert await ViewCountService.unique_viewers(first.id) == 2
+    db.refresh(first)
+    assert first.view_count == 0
+    edited = first.updated_at
+
+    assert await ViewCountService.flush(async_db) == 4
+    db.refresh(first)
+    db.refresh(second)
+    assert (first.view_count, second.view_count) == (3, 1)
+    assert first.updated_at == edited
+    assert await fake_redis.hget(ThreadService._card_key(first.id), "view_count") == "3"
+    assert ThreadService._local_cards.get(str(first.id)) is None
+    # View counts alone do not invalidate list ETags.
+    assert await fake_redis.get(THREADS_VERSION_KEY) is None
+    # Only fully cached cards are patched.
+    assert await fake_redis.exists(ThreadService._card_key(second.id)) == 0
+    assert await ViewCountService.flush(async_db) == 0
+
+
+async def test_failed_flush_is_retried_before_new_views(db, async_db, fake_redis, monkeypatch):
+    (thread,) = _seed_threads(db, count=1)
+    await ViewCountService.record_view(thread.id, 1)
+
+    add_view_counts = ViewCountService.repo.add_view_counts
+    failures = [RuntimeError("db down")]
+
+    async def flaky(db_session, deltas):
+        if failures:
+            raise failures.pop()
+        await add_view_counts(db_session, deltas)
+
+    monkeypatch.setattr(ViewCountService.repo, "add_view_counts", flaky)
+    with pytest.raises(RuntimeError):
+        await ViewCountService.flush(async_db)
+
+    await ViewCountService.record_view(thread.id, 1)
+    assert await ViewCountService.flush(async_db) == 1
+    assert await ViewCountService.flush(async_db) == 1
+    db.refresh(thread)
+    assert thread.view_count == 2
+
+
+async def test_flushed_batch_is_applied_at_most_once(db, async_db, fake_redis, monkeypatch):
+    (thread,) = _seed_threads(db, count=1)
+    await ViewCountService.record_view(thread.id, 1)
+
+    # The UPDATE ran but the batch could not be dropped: roll it back.
+    delete = fake_redis.delete
+    failures = [ConnectionError("redis down")]
+
+    async def flaky_delete(*keys):
+        if failures:
+            raise failures.pop()
+        return await delete(*keys)
+
+    monkeypatch.setattr(fake_redis, "delete", flaky_delete)
+    with pytest.raises(ConnectionError):
+        await ViewCountService.flush(async_db)
+    db.refresh(thread)
+    assert thread.view_count == 0
+
+    # The commit failed after the batch was dropped: it goes back to pending.
+    commit = async_db.commit
+    commit_failures = [RuntimeError("commit failed")]
+
+    async def flaky_commit():
+        if commit_failures:
+            await async_db.rollback()
+            raise commit_failures.pop()
+        await commit()
+
+    monkeypatch.setattr(async_db, "commit", flaky_commit)
+    with pytest.raises(RuntimeError):
+        await ViewCountService.flush(async_db)
+    assert await fake_redis.exists(ViewCountService._flushing_key) == 0
+    assert await fake_redis.hget(ViewCountService._pending_key, str(thread.id)) == "1"
+
+    assert await ViewCountService.flush(async_db) == 1
+    assert await ViewCountService.flush(async_db) == 0
+    db.refresh(thread)
+    assert thread.view_count == 1
+
+
+async def test_record_view_and_flush_loop_are_best_effort(monkeypatch):
+    class DownRedis:
+        def __getattr__(self, _name):
+            raise RuntimeError("redis down")
+
+    monkeypatch.setattr("app.services.view_count_service.redis_client.redis", DownRedis())
+    await ViewCountService.record_view(1, 1)
+    assert await ViewCountService.unique_viewers(1) is None
+    monkeypatch.setattr(settings, "TRACK_UNIQUE_THREAD_VIEWERS", True)
+    assert await ViewCountService.unique_viewers(1) is None
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) > 1:
+            raise asyncio.CancelledError
+
+    async def fake_flush(_db):
+        raise RuntimeError("flush failed")
+
+    class FakeSession:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *_exc):
+            return None
+
+    monkeypatch.setattr("app.services.view_count_service.asyncio.sleep", fake_sleep)
+    monkeypatch.setattr("app.services.view_count_service.AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(ViewCountService, "flush", fake_flush)
+    with pytest.raises(asyncio.CancelledError):
+        await ViewCountService.flush_forever()
+    assert sleeps == [ViewCountService._flush_interval_seconds] * 2
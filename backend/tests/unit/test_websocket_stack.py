@@ -1,3 +1,4 @@
+import asyncio
 from types import SimpleNamespace
 
 import pytest
@@ -6,10 +7,7 @@ from app.core.constants import RedisChannels
 from app.websocket import handlers
 from app.websocket.events import WSEvents
 from app.websocket.manager import ConnectionManager
-from app.websocket.notifications_handler import (
-    build_notification_payload,
-    dispatch_notification_event,
-)
+from app.websocket.notifications_handler import build_notification_payload
 
 
 class FakeWebSocket:
@@ -107,20 +105,7 @@ async def test_listen_to_channel_routes_notifications_and_broadcasts(monkeypatch
     assert any(payload.get("event") == "NEW_THREAD" for payload in broadcasted)
 
 
-@pytest.mark.asyncio
-async def test_handlers_publish_expected_messages(monkeypatch):
-    published = []
-    broadcasted = []
-
-    async def fake_publish(channel: str, message: dict):
-        published.append((channel, message))
-
-    async def fake_broadcast(message: dict):
-        broadcasted.append(message)
-
-    monkeypatch.setattr("app.websocket.handlers.redis_client.publish", fake_publish)
-    monkeypatch.setattr("app.websocket.handlers.manager.broadcast", fake_broadcast)
-
+def test_handlers_build_expected_messages():
     thread = SimpleNamespace(
         id=1,
         title="T",
@@ -149,23 +134,54 @@ async def test_handlers_publish_expected_messages(monkeypatch):
     )
     comment = SimpleNamespace(id=4, thread_id=1, content="c")
 
-    await handlers.broadcast_new_comment(comment)
-    await handlers.broadcast_new_thread(thread, "updated")
-    await handlers.broadcast_new_like(thread_id=1, like_count=3, action="created")
-    await handlers.broadcast_new_user(user, "updated")
-    await handlers.broadcast_moderation_review(review, "updated")
-
-    events = [msg[1]["event"] for msg in published]
-    assert WSEvents.NEW_COMMENT in events
-    assert WSEvents.NEW_THREAD in events
-    assert WSEvents.NEW_LIKE in events
-    assert WSEvents.NEW_USER in events
-    assert WSEvents.MODERATION_REVIEW in events
-    assert len(broadcasted) == 5
+    messages = [
+        handlers.build_comment_message(comment),
+        handlers.build_thread_message(thread, "updated"),
+        handlers.build_like_message(thread_id=1, like_count=3, action="created"),
+        handlers.build_user_message(user, "updated"),
+        handlers.build_moderation_message(review, "updated"),
+    ]
+    assert [message["event"] for message in messages] == [
+        WSEvents.NEW_COMMENT,
+        WSEvents.NEW_THREAD,
+        WSEvents.NEW_LIKE,
+        WSEvents.NEW_USER,
+        WSEvents.MODERATION_REVIEW,
+    ]
+    assert messages[1]["data"]["action"] == "updated"
+    assert messages[3]["data"]["user"]["roles"] == [{"id": 1, "role_name": "MEMBER"}]
 
 
 @pytest.mark.asyncio
-async def test_notification_payload_and_dispatch_fallback(monkeypatch):
+async def test_like_broadcasts_are_coalesced_per_target(monkeypatch):
+    broadcasted = []
+
+    async def fake_broadcast(message: dict):
+        broadcasted.append(message)
+        if message["data"]["like_count"] == 0:
+            raise RuntimeError("socket closed")
+
+    monkeypatch.setattr("app.websocket.handlers.manager.broadcast", fake_broadcast)
+    coalescer = handlers.LikeBroadcastCoalescer(window_seconds=0.01)
+
+    for like_count in range(1, 201):
+        await coalescer.submit(handlers.build_like_message(1, None, like_count, "created"))
+    await coalescer.submit(handlers.build_like_message(None, 4, 0, "removed"))
+    await coalescer.submit(handlers.build_like_message(None, 5, 7, "created"))
+    assert broadcasted == []
+
+    await asyncio.sleep(0.05)
+    assert [
+        (msg["data"]["thread_id"], msg["data"]["comment_id"], msg["data"]["like_count"])
+        for msg in broadcasted
+    ] == [(1, None, 200), (None, 4, 0), (None, 5, 7)]
+
+    # The next event opens a new window.
+    await coalescer.submit(handlers.build_like_message(1, None, 201))
+    await asyncio.sleep(0.05)
+    assert broadcasted[-1]["data"]["like_count"] == 201
+
+def test_notification_payload():
     notification = SimpleNamespace(
         id=99,
         user_id=7,
@@ -182,23 +198,3 @@ async def test_notification_payload_and_dispatch_fallback(monkeypatch):
     payload = build_notification_payload(notification)
     assert payload["event"] == WSEvents.NEW_NOTIFICATION
     assert payload["data"]["user_id"] == 7
-
-    sent = []
-
-    async def raise_publish(_channel: str, _message: dict):
-        raise RuntimeError("redis down")
-
-    async def fake_send_notification_to_user(user_id: int, data: dict):
-        sent.append((user_id, data))
-
-    monkeypatch.setattr(
-        "app.websocket.notifications_handler.redis_client.publish",
-        raise_publish,
-    )
-    monkeypatch.setattr(
-        "app.websocket.notifications_handler.manager.send_notification_to_user",
-        fake_send_notification_to_user,
-    )
-
-    await dispatch_notification_event(notification)
-    assert sent[0][0] == 7